@@ -0,0 +1,54 @@
+"""
+Loading large generated root files: RootBST.load_roots_from_file against
+the chunked bulk loader, in-process and with a pool of worker processes.
+Every root repeats (the lexicon is cycled) and every 100th line is invalid.
+
+    python -m Benchmarks.bench_bulk_load
+"""
+from __future__ import annotations
+import itertools
+import os
+import tempfile
+
+from Benchmarks.common import best_of, print_table, synthetic_roots
+from Data_Structures.bulk_loader import load_roots
+from Data_Structures.root_tree import AVLRootTree
+
+LINE_COUNTS = [100_000, 1_000_000]
+POOL_WORKERS = 4
+
+
+def write_lexicon(path: str, count: int) -> None:
+    roots = itertools.cycle(synthetic_roots(20000))
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write("not-a-root\n" if i % 100 == 99 else next(roots) + "\n")
+
+
+def run() -> None:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "roots.txt")
+        for count in LINE_COUNTS:
+            write_lexicon(path, count)
+            line_by_line = best_of(lambda: AVLRootTree().load_roots_from_file(path), 3)
+            chunked = best_of(lambda: load_roots(AVLRootTree(), path, workers=1), 3)
+            pooled = best_of(lambda: load_roots(AVLRootTree(), path, workers=POOL_WORKERS), 3)
+            report = load_roots(AVLRootTree(), path)
+            rows.append([
+                count,
+                f"{os.path.getsize(path) / (1 << 20):.1f}",
+                f"{line_by_line * 1e3:.0f}",
+                f"{chunked * 1e3:.0f}",
+                f"{pooled * 1e3:.0f}",
+                f"{report.accepted}/{report.duplicates}/{len(report.rejected)}",
+            ])
+
+    print(f"{os.cpu_count()} CPU(s); pool of {POOL_WORKERS} workers")
+    print_table(
+        ["lines", "MiB", "from_file ms", "chunked ms", "pool ms", "accepted/dup/rejected"], rows
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,59 @@
+"""
+Per-family latency: the previous generate_family (one generate_one per
+pattern: tree search + contains + derive + add_derived_word each time)
+against the single-pass version.
+
+    python -m Benchmarks.bench_generate_family
+"""
+from __future__ import annotations
+
+from Benchmarks.common import best_of, print_table, synthetic_patterns, synthetic_roots
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Engine.generator import MorphologicalGenerator
+
+PATTERN_COUNTS = [28, 200, 2000]
+ROOT_COUNT = 5000
+FAMILIES = 50
+
+
+def legacy_generate_family(tree, table, raw_root):
+    if tree.search(raw_root) is None:
+        return []
+    results = []
+    for pattern in table.iter_patterns():
+        if tree.search(raw_root) is None or not table.contains(pattern):
+            continue
+        word = table.derive(raw_root, pattern)
+        tree.add_derived_word(raw_root, word)
+        results.append(word)
+    return results
+
+
+def run() -> None:
+    roots = synthetic_roots(ROOT_COUNT)
+    sample = roots[:: ROOT_COUNT // FAMILIES]
+    rows = []
+    for count in PATTERN_COUNTS:
+        tree = AVLRootTree()
+        tree.bulk_load(roots)
+        table = PatternHashTable()
+        for p in synthetic_patterns(count):
+            table.insert(p)
+        gen = MorphologicalGenerator(tree, table)
+
+        legacy = best_of(lambda: [legacy_generate_family(tree, table, r) for r in sample], 3)
+        single = best_of(lambda: [gen.generate_family(r) for r in sample], 3)
+        rows.append([
+            count,
+            f"{legacy / len(sample) * 1e3:.3f}",
+            f"{single / len(sample) * 1e3:.3f}",
+            f"{legacy / single:.1f}x",
+        ])
+
+    print(f"{ROOT_COUNT} roots, {len(sample)} families per run")
+    print_table(["patterns", "legacy ms/family", "single-pass ms/family", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run()
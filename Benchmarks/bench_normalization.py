@@ -0,0 +1,79 @@
+"""
+Normalization over a large token stream: the original replace/join
+implementation, the str.translate fast path, and the LRU-cached entry
+points (Zipf-distributed tokens, as in running text).
+
+    python -m Benchmarks.bench_normalization
+"""
+from __future__ import annotations
+import random
+
+from Benchmarks.common import best_of, print_table, synthetic_patterns, synthetic_roots
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.normalization import (
+    ALEF_VARIANTS,
+    DIACRITICS,
+    TATWEEL,
+    clear_normalization_caches,
+    normalization_cache_info,
+    normalize_common,
+)
+
+TOKENS = 200_000
+VOCABULARY = 20_000
+HARAKAT = ["َ", "ُ", "ِ", "ْ", "ّ", ""]
+
+
+def legacy_common(text):
+    if not text:
+        return ""
+    text = text.replace(" ", "").replace("\t", "").replace("\n", "")
+    text = text.replace(TATWEEL, "")
+    text = "".join(ALEF_VARIANTS.get(ch, ch) for ch in text)
+    return "".join(ch for ch in text if ch not in DIACRITICS)
+
+
+def token_stream():
+    random.seed(11)
+    table = PatternHashTable()
+    for p in synthetic_patterns(100):
+        table.insert(p)
+    patterns = list(table.iter_patterns())
+    roots = synthetic_roots(VOCABULARY // len(patterns) + 1)
+    vocabulary = []
+    for root in roots:
+        for p in patterns:
+            word = table.derive(root, p)
+            vocabulary.append("".join(ch + random.choice(HARAKAT) for ch in word))
+    vocabulary = vocabulary[:VOCABULARY]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return random.choices(vocabulary, weights=weights, k=TOKENS)
+
+
+def run() -> None:
+    stream = token_stream()
+    translate_only = normalize_common.__wrapped__
+    assert all(legacy_common(t) == translate_only(t) for t in stream[:10000])
+
+    def cached():
+        clear_normalization_caches()
+        for t in stream:
+            normalize_common(t)
+
+    legacy = best_of(lambda: [legacy_common(t) for t in stream], 3)
+    translate = best_of(lambda: [translate_only(t) for t in stream], 3)
+    lru = best_of(cached, 3)
+    info = normalization_cache_info()["normalize_common"]
+
+    rows = [
+        ["replace + join (legacy)", f"{TOKENS / legacy:,.0f}", "1.0x"],
+        ["str.translate", f"{TOKENS / translate:,.0f}", f"{legacy / translate:.1f}x"],
+        ["str.translate + LRU", f"{TOKENS / lru:,.0f}", f"{legacy / lru:.1f}x"],
+    ]
+    print(f"{TOKENS:,} tokens, {VOCABULARY:,}-word Zipf vocabulary")
+    print_table(["implementation", "tokens/s", "speedup"], rows)
+    print(f"cache hits={info['hits']:,} misses={info['misses']:,} size={info['size']}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+"""
+Chained vs open-addressing pattern tables: insert / lookup / remove
+throughput and memory per stored pattern.
+
+    python -m Benchmarks.bench_pattern_tables
+"""
+from __future__ import annotations
+import time
+import tracemalloc
+
+from Benchmarks.common import best_of, print_table, synthetic_patterns
+from Data_Structures.hash_table import PATTERN_TABLE_LAYOUTS, compile_rule, make_pattern_table
+from Data_Structures.normalization import normalize_pattern
+
+SIZES = [100, 1000, 10000]
+
+
+def bytes_per_pattern(layout: str, patterns) -> float:
+    # Keys are normalized up front so only the table's own storage is traced.
+    keys = [normalize_pattern(p) for p in patterns]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = make_pattern_table(layout)
+    for k in keys:
+        table._store(k, compile_rule(k))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(keys)
+
+
+def best_remove(build, patterns, repeat: int = 5) -> float:
+    """Best time to remove every pattern from a freshly built table; the build is not timed."""
+    best = float("inf")
+    for _ in range(repeat):
+        table = build()
+        start = time.perf_counter()
+        for p in patterns:
+            table.remove(p)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run() -> None:
+    rows = []
+    for n in SIZES:
+        patterns = synthetic_patterns(n)
+        for layout in PATTERN_TABLE_LAYOUTS:
+            def build():
+                table = make_pattern_table(layout)
+                for p in patterns:
+                    table.insert(p)
+                return table
+
+            table = build()
+
+            def lookup():
+                for p in patterns:
+                    table.contains(p)
+
+            t_insert = best_of(build)
+            t_lookup = best_of(lookup)
+            t_remove = best_remove(build, patterns)
+            rows.append([
+                n,
+                layout,
+                f"{n / t_insert:,.0f}",
+                f"{n / t_lookup:,.0f}",
+                f"{n / t_remove:,.0f}",
+                f"{bytes_per_pattern(layout, patterns):.0f}",
+            ])
+
+    print_table(
+        ["patterns", "layout", "insert/s", "lookup/s", "remove/s", "bytes/pattern"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,92 @@
+"""
+Local load test for the pre-forked server: starts `server.py --workers N --no-wal`
+for several N, drives /generate_family from parallel client processes for
+a fixed time and reports requests per second. Also checks that a root
+added through one worker is visible from all of them. Needs Flask and
+os.fork (Linux / macOS); scaling is bounded by the machine's core count.
+
+    python -m Benchmarks.bench_prefork
+"""
+from __future__ import annotations
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from Benchmarks.common import print_table
+
+WORKER_COUNTS = [1, 2, 4]
+CLIENTS = 8
+DURATION = 5.0
+PORT = 5123
+ROOTS = ["ك-ت-ب", "د-ر-س", "ح-م-د"]
+
+
+def post(path: str, body: dict) -> dict:
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{PORT}{path}",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def wait_until_up(proc: subprocess.Popen) -> None:
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/stats", timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def client(n: int) -> int:
+    done = 0
+    end = time.time() + DURATION
+    while time.time() < end:
+        post("/generate_family", {"root": ROOTS[(n + done) % len(ROOTS)]})
+        done += 1
+    return done
+
+
+def check_propagation(workers: int) -> bool:
+    assert post("/add_root", {"root": "غ-ف-ر"})["status"] == "ok"
+    # Connections land on arbitrary workers; ask enough times to reach all.
+    return all(post("/generate", {"root": "غ-ف-ر", "pattern": "فاعل"})["ok"] for _ in range(workers * 10))
+
+
+def run() -> None:
+    rows = []
+    base = None
+    for workers in WORKER_COUNTS:
+        proc = subprocess.Popen(
+            [sys.executable, "server.py", "--workers", str(workers), "--no-wal", "--port", str(PORT)],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(proc)
+            with multiprocessing.Pool(CLIENTS) as pool:
+                total = sum(pool.map(client, range(CLIENTS)))
+            propagated = check_propagation(workers)
+        finally:
+            proc.terminate()
+            proc.wait()
+        rate = total / DURATION
+        base = base or rate
+        rows.append([workers, total, f"{rate:.0f}", f"{rate / base:.2f}x", "yes" if propagated else "NO"])
+
+    print(f"{CLIENTS} client processes, {DURATION:.0f}s per run, {os.cpu_count()} CPUs")
+    print_table(["workers", "requests", "req/s", "scaling", "add_root seen by all"], rows)
+
+
+if __name__ == "__main__":
+    run()
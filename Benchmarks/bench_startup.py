@@ -0,0 +1,57 @@
+"""
+Startup cost: parsing the text files (validate + normalize every line)
+against restoring the binary snapshot, for growing root counts.
+
+    python -m Benchmarks.bench_startup
+"""
+from __future__ import annotations
+import os
+import tempfile
+
+from Benchmarks.common import best_of, print_table, synthetic_patterns, synthetic_roots
+from Data_Structures.binary_snapshot import TextBase, load_snapshot, save_snapshot
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+
+ROOT_COUNTS = [1000, 5000, 20000]
+PATTERN_COUNT = 200
+
+
+def load_text(roots_path: str, patterns_path: str) -> None:
+    tree, table = AVLRootTree(), PatternHashTable()
+    tree.load_roots_from_file(roots_path)
+    table.load_patterns_from_file(patterns_path)
+
+
+def load_binary(path: str, sources) -> None:
+    assert load_snapshot(path, AVLRootTree(), PatternHashTable(), sources)
+
+
+def run() -> None:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        roots_path = os.path.join(tmp, "roots.txt")
+        patterns_path = os.path.join(tmp, "patterns.txt")
+        snapshot_path = os.path.join(tmp, "engine.snap")
+        sources = (roots_path, patterns_path)
+        with open(patterns_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(synthetic_patterns(PATTERN_COUNT)))
+
+        for count in ROOT_COUNTS:
+            with open(roots_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(synthetic_roots(count)))
+            tree, table = AVLRootTree(), PatternHashTable()
+            tree.load_roots_from_file(roots_path)
+            table.load_patterns_from_file(patterns_path)
+            size = save_snapshot(snapshot_path, tree, table, TextBase.read(*sources))
+
+            text = best_of(lambda: load_text(roots_path, patterns_path), 3)
+            binary = best_of(lambda: load_binary(snapshot_path, sources), 3)
+            rows.append([count, f"{size / 1024:.0f}", f"{text * 1e3:.1f}", f"{binary * 1e3:.1f}", f"{text / binary:.1f}x"])
+
+    print(f"{PATTERN_COUNT} patterns")
+    print_table(["roots", "snapshot KiB", "text ms", "snapshot ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,66 @@
+"""
+validate() latency against the number of stored patterns: the full
+derive-and-compare scan over every pattern versus the length-bucketed
+trie walk with early pruning.
+
+    python -m Benchmarks.bench_validate
+"""
+from __future__ import annotations
+
+from Benchmarks.common import best_of, print_table, synthetic_patterns, synthetic_roots
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.normalization import normalize_common
+from Data_Structures.root_tree import AVLRootTree
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+PATTERN_COUNTS = [28, 250, 2500, 20000]
+QUERIES = 200
+
+
+def scan_validate(tree, gen, raw_root, raw_word):
+    node = tree.search(raw_root)
+    if node is None:
+        return None
+    normalized_word = normalize_common(raw_word)
+    for pattern, word in gen.derive_all(node.root):
+        if normalize_common(word) == normalized_word:
+            return pattern
+    return None
+
+
+def run() -> None:
+    roots = synthetic_roots(200)
+    rows = []
+    for count in PATTERN_COUNTS:
+        tree = AVLRootTree()
+        tree.bulk_load(roots)
+        table = PatternHashTable()
+        for p in synthetic_patterns(count):
+            table.insert(p)
+        gen = MorphologicalGenerator(tree, table)
+        val = MorphologicalValidator(gen, tree, table)
+
+        patterns = list(table.iter_patterns())
+        queries = []
+        for i in range(QUERIES):
+            root = roots[i % len(roots)]
+            word = table.derive(root, patterns[(i * 7919) % len(patterns)])
+            # Half hits, half misses (the word checked against the wrong root).
+            queries.append((root if i % 2 else roots[(i + 1) % len(roots)], word))
+
+        scan = best_of(lambda: [scan_validate(tree, gen, r, w) for r, w in queries], 3)
+        trie = best_of(lambda: [val.validate(r, w) for r, w in queries], 3)
+        rows.append([
+            count,
+            f"{scan / QUERIES * 1e6:,.1f}",
+            f"{trie / QUERIES * 1e6:,.1f}",
+            f"{scan / trie:.1f}x",
+        ])
+
+    print(f"{QUERIES} validations per run (half hits, half misses)")
+    print_table(["patterns", "scan us/validate", "trie us/validate", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+"""
+Request-path cost of the write-ahead log: a paced stream of 1000 stored
+generations per second (each one a derived-word record), timed per call,
+without a log and with each fsync policy.
+
+    python -m Benchmarks.bench_wal
+"""
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+import time
+
+from Benchmarks.common import print_table
+from Data_Structures.binary_snapshot import load_or_build
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Data_Structures.write_ahead_log import FSYNC_POLICIES, open_log
+from Engine.generator import MorphologicalGenerator
+
+RATE = 1000  # writes per second
+SECONDS = 2
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def run_once(policy) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = (os.path.join(tmp, "roots.txt"), os.path.join(tmp, "patterns.txt"))
+        shutil.copy(os.path.join("Data", "roots.txt"), sources[0])
+        shutil.copy(os.path.join("Data", "patterns.txt"), sources[1])
+        snapshot = os.path.join(tmp, "engine.snap")
+        tree, table = AVLRootTree(), PatternHashTable()
+        base, _ = load_or_build(tree, table, *sources, snapshot)
+        log = open_log(os.path.join(tmp, "wal"), tree, table, snapshot, base, fsync=policy) if policy else None
+
+        gen = MorphologicalGenerator(tree, table)
+        roots = tree.list_roots()
+        patterns = list(table.iter_patterns())
+        latencies = []
+        start = time.perf_counter()
+        for i in range(RATE * SECONDS):
+            # Pace the stream instead of running flat out.
+            delay = start + i / RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            t0 = time.perf_counter()
+            gen.generate_one(roots[i % len(roots)], patterns[i % len(patterns)])
+            latencies.append(time.perf_counter() - t0)
+        if log is not None:
+            log.close()
+        return latencies
+
+
+def run() -> None:
+    rows = []
+    for policy in (None, *FSYNC_POLICIES):
+        latencies = run_once(policy)
+        rows.append([
+            policy or "no log",
+            f"{percentile(latencies, 0.5) * 1e6:.1f}",
+            f"{percentile(latencies, 0.99) * 1e6:.1f}",
+            f"{max(latencies) * 1e6:.0f}",
+        ])
+    print(f"{RATE} stored generations/s for {SECONDS}s")
+    print_table(["fsync", "p50 us", "p99 us", "max us"], rows)
+
+
+if __name__ == "__main__":
+    run()
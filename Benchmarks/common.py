@@ -0,0 +1,49 @@
+"""
+Shared helpers for the benchmark scripts.
+Run any benchmark from the project root, e.g.:
+    python -m Benchmarks.bench_pattern_tables
+"""
+from __future__ import annotations
+import itertools
+import time
+from typing import Callable, List
+
+ROOT_LETTERS = "ءبتثجحخدذرزسشصضطظعغفقكلمنهوي"
+PATTERN_AFFIXES = ["", "ا", "م", "ت", "ن", "ي", "و", "س", "ه", "ست", "مت", "ان"]
+
+
+def synthetic_roots(count: int) -> List[str]:
+    """Dashed triliteral roots in sorted order (the worst case for a plain BST)."""
+    combos = itertools.product(ROOT_LETTERS, repeat=3)
+    return ["-".join(c) for c in itertools.islice(combos, count)]
+
+
+def synthetic_patterns(count: int) -> List[str]:
+    """Valid patterns built by wrapping affixes around ف/ع/ل."""
+    patterns = []
+    for pre, mid1, mid2, post in itertools.product(PATTERN_AFFIXES, repeat=4):
+        p = f"{pre}ف{mid1}ع{mid2}ل{post}"
+        if len(p) >= 4:
+            patterns.append(p)
+            if len(patterns) == count:
+                break
+    return patterns
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best wall-clock time (seconds) over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)
+    ]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,474 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from Data_Structures.bulk_loader import load_patterns, load_roots, parse_pattern_chunk, parse_root_chunk, read_chunks
+from Data_Structures.hash_table import PatternHashTable, RuleTemplate, compile_rule
+from Data_Structures.linked_list import DerivedWordList
+from Data_Structures.root_tree import RootBST, pack_root
+
+# Layout (little-endian):
+#   header   magic, format version, source count, payload length, payload crc32,
+#            write-ahead log generation (segments below it are included)
+#   sources  per text file of its text base: size, mtime_ns, crc32
+#   payload  counts (roots, patterns, roots with derived words, usage entries)
+#            roots     u32 packed codes, in tree order, then the same roots
+#                      as one UTF-8 string (3 letters each, u32 byte length)
+#            patterns  pattern, rule, format string, slots, segments
+#            derived   root index, word count, (word, count) newest first
+#                      then u32 positions of those words in ranking order
+#            usage     (pattern, count)
+#            delta     roots added and removed since the text base (each
+#                      as one string, like the roots), then patterns added
+#                      and removed (u32 count, strings)
+# Strings are u32 length + UTF-8. The payload is read straight from an mmap;
+# nothing in it is re-validated, so the crc32 is what guards it.
+MAGIC = b"MORPHSNP"
+FORMAT_VERSION = 4
+
+_HEADER = struct.Struct("<8sHHQIQ")
+_SOURCE = struct.Struct("<QqI")
+_COUNTS = struct.Struct("<IIII")
+_U32 = struct.Struct("<I")
+_U32_PAIR = struct.Struct("<II")
+
+Fingerprint = Tuple[int, int, int]  # size, mtime_ns, crc32
+
+
+def _file_crc(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def fingerprint(path: str) -> Fingerprint:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, _file_crc(path)
+
+
+def fsync_directory(path: str) -> None:
+    """Make a rename, creation or removal in directory `path` durable (skipped where directories can't be opened)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _is_fresh(path: str, saved: Fingerprint) -> bool:
+    """Same size and mtime, or (touched but unchanged) same checksum."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    size, mtime_ns, crc = saved
+    if st.st_size != size:
+        return False
+    return st.st_mtime_ns == mtime_ns or _file_crc(path) == crc
+
+
+# ---------------------------
+# Text base
+# ---------------------------
+
+@dataclass
+class TextBase:
+    """
+    What the text files held when they were last applied to the engine:
+    their fingerprints (taken before reading them), compact roots and
+    normalized patterns. A snapshot stores how the engine differs from its
+    base, so a rebuild from edited files can put the runtime changes back.
+    """
+    sources: Tuple[str, ...]
+    fingerprints: List[Fingerprint]
+    roots: Set[str]
+    patterns: Set[str]
+
+    @classmethod
+    def read(cls, roots_path: str, patterns_path: str) -> "TextBase":
+        """Parse both files, validated as at startup, without loading them anywhere."""
+        sources = (roots_path, patterns_path)
+        fingerprints = [fingerprint(source) for source in sources]
+        roots: Set[str] = set()
+        for chunk in read_chunks(roots_path):
+            roots.update(parse_root_chunk(*chunk)[0])
+        patterns: Set[str] = set()
+        for chunk in read_chunks(patterns_path):
+            patterns.update(pattern for pattern, _ in parse_pattern_chunk(*chunk)[0])
+        return cls(sources, fingerprints, roots, patterns)
+
+    def advance(
+        self,
+        add_roots: Iterable[str] = (),
+        remove_roots: Iterable[str] = (),
+        add_patterns: Iterable[str] = (),
+        remove_patterns: Iterable[str] = (),
+    ) -> None:
+        """Take in edits of the files (compact roots, normalized patterns); idempotent."""
+        self.roots.update(add_roots)
+        self.roots.difference_update(remove_roots)
+        self.patterns.update(add_patterns)
+        self.patterns.difference_update(remove_patterns)
+
+
+# ---------------------------
+# Writing
+# ---------------------------
+
+class _Writer:
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+
+    def raw(self, data: bytes) -> None:
+        self.parts.append(data)
+
+    def u32(self, value: int) -> None:
+        self.parts.append(_U32.pack(value))
+
+    def text(self, value: str) -> None:
+        data = value.encode("utf-8")
+        self.parts.append(_U32.pack(len(data)))
+        self.parts.append(data)
+
+    def roots(self, compacts: List[str]) -> None:
+        letters = "".join(compacts).encode("utf-8")
+        self.u32(len(letters))
+        self.raw(letters)
+
+    def texts(self, values: List[str]) -> None:
+        self.u32(len(values))
+        for value in values:
+            self.text(value)
+
+
+def save_snapshot(
+    path: str,
+    root_tree: RootBST,
+    pattern_table: PatternHashTable,
+    base: Optional[TextBase] = None,
+    log_generation: int = 0,
+) -> int:
+    """
+    Write the whole engine state (roots, compiled patterns, derived words
+    with their counts, pattern usage) to `path`, with its text `base`
+    (fingerprints and the difference from it) and the first write-ahead log
+    segment it does not include. Written to a temporary file, synced and
+    renamed, then the directory is synced: a reader never sees half a
+    snapshot, and once this returns the log segments it covers can go.
+    Returns the byte size.
+    """
+    compacts = list(root_tree.inorder())
+    templates = list(pattern_table.iter_templates())
+    usage = root_tree.stats()["pattern_usage"]
+    if base is None:
+        fingerprints: List[Fingerprint] = []
+        delta: Tuple[List[str], ...] = ([], [], [], [])
+    else:
+        fingerprints = base.fingerprints
+        roots, patterns = set(compacts), {pattern for pattern, _ in templates}
+        delta = (
+            sorted(roots - base.roots),
+            sorted(base.roots - roots),
+            sorted(patterns - base.patterns),
+            sorted(base.patterns - patterns),
+        )
+
+    body = _Writer()
+    derived: List[Tuple[int, List[Tuple[str, int]], List[int]]] = []
+    for i, compact in enumerate(compacts):
+        words = root_tree.search_compact(compact).derived
+        if len(words):
+            derived.append((i, words.to_items(), words.bucket_order()))
+    body.raw(_COUNTS.pack(len(compacts), len(templates), len(derived), len(usage)))
+    codes = array("I", (pack_root(c) for c in compacts))
+    if sys.byteorder == "big":
+        codes.byteswap()
+    body.raw(codes.tobytes())
+    body.roots(compacts)
+
+    for pattern, template in templates:
+        body.text(pattern)
+        body.text(template.rule)
+        body.text(template.format_string)
+        body.raw(bytes([len(template.slots), *template.slots]))
+        for segment in template.segments:
+            body.text(segment)
+
+    for i, items, order in derived:
+        body.raw(_U32_PAIR.pack(i, len(items)))
+        for word, count in items:
+            body.text(word)
+            body.u32(count)
+        ranks = array("I", order)
+        if sys.byteorder == "big":
+            ranks.byteswap()
+        body.raw(ranks.tobytes())
+
+    for pattern, count in usage.items():
+        body.text(pattern)
+        body.u32(count)
+
+    added_roots, removed_roots, added_patterns, removed_patterns = delta
+    body.roots(added_roots)
+    body.roots(removed_roots)
+    body.texts(added_patterns)
+    body.texts(removed_patterns)
+
+    payload = b"".join(body.parts)
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(fingerprints), len(payload), zlib.crc32(payload), log_generation
+    )
+    source_records = b"".join(_SOURCE.pack(*saved) for saved in fingerprints)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header + source_records + payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_directory(os.path.dirname(path) or ".")
+    return len(header) + len(source_records) + len(payload)
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+
+class _Reader:
+    def __init__(self, buf: memoryview, pos: int) -> None:
+        self.buf = buf
+        self.pos = pos
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.buf, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def u32(self) -> int:
+        value = _U32.unpack_from(self.buf, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def text(self) -> str:
+        n = _U32.unpack_from(self.buf, self.pos)[0]
+        start = self.pos + 4
+        self.pos = start + n
+        return str(self.buf[start:self.pos], "utf-8")
+
+    def take(self, n: int) -> memoryview:
+        start = self.pos
+        self.pos += n
+        return self.buf[start:self.pos]
+
+    def roots(self) -> List[str]:
+        letters = str(self.take(self.u32()), "utf-8")
+        return [letters[i:i + 3] for i in range(0, len(letters), 3)]
+
+    def texts(self) -> List[str]:
+        return [self.text() for _ in range(self.u32())]
+
+
+def _read_payload(
+    buf: memoryview, sources: Sequence[str], fresh: bool
+) -> Optional[Tuple[_Reader, List[Fingerprint], int]]:
+    """
+    Reader positioned on the payload, the saved fingerprints and the log
+    generation; None if damaged, or (when `fresh`) stale.
+    """
+    if len(buf) < _HEADER.size:
+        return None
+    magic, version, source_count, length, crc, generation = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != FORMAT_VERSION or source_count != len(sources):
+        return None
+    pos = _HEADER.size
+    fingerprints = []
+    for source in sources:
+        saved = _SOURCE.unpack_from(buf, pos)
+        if fresh and not _is_fresh(source, saved):
+            return None
+        fingerprints.append(saved)
+        pos += _SOURCE.size
+    if len(buf) - pos != length or zlib.crc32(buf[pos:]) != crc:
+        return None
+    return _Reader(buf, pos), fingerprints, generation
+
+
+def snapshot_log_generation(path: str) -> int:
+    """The log generation recorded in a snapshot's header; 0 if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return 0
+    if len(header) < _HEADER.size:
+        return 0
+    magic, version, _, _, _, generation = _HEADER.unpack(header)
+    return generation if magic == MAGIC and version == FORMAT_VERSION else 0
+
+
+def load_snapshot(
+    path: str,
+    root_tree: RootBST,
+    pattern_table: PatternHashTable,
+    sources: Sequence[str] = (),
+) -> Optional[TextBase]:
+    """
+    Restore a snapshot written by save_snapshot into an empty tree and
+    table, and return its text base. Returns None, leaving both untouched,
+    when the file is missing, damaged, from another format version, or
+    older than any of `sources`.
+    """
+    loaded = _load(path, sources, fresh=True)
+    if loaded is None:
+        return None
+
+    fingerprints, _, ((compacts, codes), templates, derived, usage, delta) = loaded
+    pattern_table.restore(templates)
+    root_tree.restore(compacts, codes, derived, usage)
+    added_roots, removed_roots, added_patterns, removed_patterns = delta
+    # The base is the state without what was added since, with what was removed.
+    base = TextBase(tuple(sources), fingerprints, set(compacts), {pattern for pattern, _ in templates})
+    base.advance(removed_roots, added_roots, removed_patterns, added_patterns)
+    return base
+
+
+def _load(path: str, sources: Sequence[str], fresh: bool):
+    """(fingerprints, log generation, decoded state), or None."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _read(mm, sources, fresh)
+
+
+def _read(mm: mmap.mmap, sources: Sequence[str], fresh: bool):
+    # Every view into the map must be gone before it is closed.
+    with memoryview(mm) as buf:
+        found = _read_payload(buf, sources, fresh)
+        if found is None:
+            return None
+        reader, fingerprints, generation = found
+        return fingerprints, generation, _decode(reader)
+
+
+def _decode(reader: _Reader):
+    root_count, pattern_count, derived_count, usage_count = reader.unpack(_COUNTS)
+    codes = array("I")
+    codes.frombytes(reader.take(root_count * 4))
+    if sys.byteorder == "big":
+        codes.byteswap()
+    compacts = reader.roots()
+
+    templates: List[Tuple[str, RuleTemplate]] = []
+    for _ in range(pattern_count):
+        pattern, rule, format_string = reader.text(), reader.text(), reader.text()
+        slot_count = reader.take(1)[0]
+        slots = tuple(reader.take(slot_count))
+        segments = tuple(reader.text() for _ in range(slot_count + 1))
+        templates.append((pattern, RuleTemplate(rule, segments, slots, format_string)))
+
+    derived: Dict[int, DerivedWordList] = {}
+    for _ in range(derived_count):
+        index, word_count = reader.unpack(_U32_PAIR)
+        items = [(reader.text(), reader.u32()) for _ in range(word_count)]
+        order = array("I")
+        order.frombytes(reader.take(word_count * 4))
+        if sys.byteorder == "big":
+            order.byteswap()
+        derived[index] = DerivedWordList.from_items(items, order)
+
+    usage = {reader.text(): reader.u32() for _ in range(usage_count)}
+    delta = reader.roots(), reader.roots(), reader.texts(), reader.texts()
+    return (compacts, codes), templates, derived, usage, delta
+
+
+def _carry_over(state, base: TextBase, root_tree: RootBST, pattern_table: PatternHashTable) -> None:
+    """
+    Load `base` (the edited text files) into an empty tree and table with a
+    stale snapshot's runtime changes on top: roots and patterns added or
+    removed since its own base, its pattern rules, the derived words of the
+    roots that remain, and pattern usage.
+    """
+    (old_compacts, _), old_templates, old_derived, usage, delta = state
+    added_roots, removed_roots, added_patterns, removed_patterns = delta
+    old = dict(old_templates)
+    templates = {pattern: old[pattern] if pattern in old else compile_rule(pattern) for pattern in base.patterns}
+    templates.update((pattern, old[pattern]) for pattern in added_patterns)
+    for pattern in removed_patterns:
+        templates.pop(pattern, None)
+
+    compacts = sorted(base.roots.union(added_roots).difference(removed_roots))
+    words = {old_compacts[i]: items for i, items in old_derived.items()}
+    derived = {i: words[compact] for i, compact in enumerate(compacts) if compact in words}
+    pattern_table.restore(sorted(templates.items()))
+    root_tree.restore(compacts, [pack_root(compact) for compact in compacts], derived, usage)
+
+
+def load_or_build(
+    root_tree: RootBST,
+    pattern_table: PatternHashTable,
+    roots_path: str,
+    patterns_path: str,
+    snapshot_path: str,
+    save: bool = True,
+) -> Tuple[TextBase, bool]:
+    """
+    Startup helper: restore from `snapshot_path` when it is current for the
+    two text files. Otherwise parse them (with the bulk loader); if the
+    snapshot is only stale, its runtime changes and counts are carried over
+    onto the new text, and a fresh snapshot is written (unless `save` is
+    False: the caller then writes it later with refresh_snapshot). Returns
+    the text base, and True when the snapshot was used as is.
+    """
+    sources = (roots_path, patterns_path)
+    base = load_snapshot(snapshot_path, root_tree, pattern_table, sources)
+    if base is not None:
+        return base, True
+    stale = _load(snapshot_path, sources, fresh=False)
+    if stale is None:
+        fingerprints = [fingerprint(source) for source in sources]
+        load_roots(root_tree, roots_path)
+        load_patterns(pattern_table, patterns_path)
+        base = TextBase(sources, fingerprints, set(root_tree.inorder()), set(pattern_table.iter_patterns()))
+    else:
+        base = TextBase.read(roots_path, patterns_path)
+        _carry_over(stale[2], base, root_tree, pattern_table)
+    if save:
+        refresh_snapshot(snapshot_path, root_tree, pattern_table, base)
+    return base, False
+
+
+def refresh_snapshot(
+    snapshot_path: str,
+    root_tree: RootBST,
+    pattern_table: PatternHashTable,
+    base: TextBase,
+) -> bool:
+    """
+    Rewrite `snapshot_path` from the loaded data, keeping the log generation
+    the old file records: log segments after it still replay on top (older
+    ones were removed when it was written). False when it can't be written.
+    """
+    try:
+        save_snapshot(
+            snapshot_path, root_tree, pattern_table, base,
+            log_generation=snapshot_log_generation(snapshot_path),
+        )
+    except OSError:
+        return False  # read-only checkout: keep serving from the text files
+    return True
@@ -0,0 +1,206 @@
+from __future__ import annotations
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from Data_Structures.hash_table import PatternHashTable, RuleTemplate, compile_rule, parse_pattern
+from Data_Structures.normalization import parse_root
+from Data_Structures.root_tree import RootBST
+
+# Bytes read per chunk (extended to the end of the line). One chunk is one task.
+DEFAULT_CHUNK_BYTES = 1 << 20
+# Chunks in flight per worker: enough to keep the pool busy, bounded memory.
+CHUNKS_PER_WORKER = 2
+
+Reject = Tuple[int, str, str]  # line number (1-based), text, reason
+
+
+@dataclass
+class LoadReport:
+    """
+    Outcome of a bulk load: `accepted` new entries, `duplicates` (repeated
+    in the file or already loaded) and every `rejected` line as
+    (line number, text, reason). Blank lines are ignored.
+    """
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: List[Reject] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": [{"line": n, "text": text, "reason": reason} for n, text, reason in self.rejected],
+        }
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+
+def read_chunks(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[Tuple[int, bytes]]:
+    """(number of the chunk's first line, whole lines as raw bytes), in file order."""
+    line = 1
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                return
+            if not chunk.endswith(b"\n"):
+                chunk += f.readline()
+            yield line, chunk
+            line += chunk.count(b"\n")
+
+
+def _lines(first_line: int, chunk: bytes) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """(line number, stripped text, decoding error) for every non-blank line."""
+    text = chunk.decode("utf-8", errors="replace")
+    for n, line in enumerate(text.split("\n"), first_line):
+        line = line.strip()
+        if line:
+            yield n, line, "Invalid UTF-8." if "\ufffd" in line else None
+
+
+# ---------------------------
+# Workers (module level, so a process pool can run them)
+# ---------------------------
+
+# Each distinct line of a chunk is parsed once; the results are the chunk's
+# distinct valid entries, how many valid lines there were, and every rejected
+# line (repeats included, each with its own number).
+
+def parse_root_chunk(first_line: int, chunk: bytes) -> Tuple[List[str], int, List[Reject]]:
+    """Distinct compact roots of the valid lines, in order, their line count, and the rejected lines."""
+    parsed: Dict[str, Tuple[Optional[str], Optional[str]]] = {}  # line -> (compact, error)
+    compacts: List[str] = []
+    valid = 0
+    rejected: List[Reject] = []
+    for n, line, error in _lines(first_line, chunk):
+        result = parsed.get(line)
+        if result is None:
+            root = parse_root(line)
+            result = parsed[line] = (root.compact, error or root.error)
+            if result[1] is None:
+                compacts.append(root.compact)
+        if result[1] is None:
+            valid += 1
+        else:
+            rejected.append((n, line, result[1]))
+    return compacts, valid, rejected
+
+
+def parse_pattern_chunk(first_line: int, chunk: bytes) -> Tuple[List[Tuple[str, RuleTemplate]], int, List[Reject]]:
+    """Distinct (normalized pattern, compiled rule) of the valid lines, in order, their line count, and the rejected lines."""
+    parsed: Dict[str, Optional[str]] = {}  # line -> error
+    entries: List[Tuple[str, RuleTemplate]] = []
+    valid = 0
+    rejected: List[Reject] = []
+    for n, line, error in _lines(first_line, chunk):
+        if line not in parsed:
+            normalized, reason = parse_pattern(line)
+            parsed[line] = error or reason
+            if parsed[line] is None:
+                entries.append((normalized, compile_rule(normalized)))
+        if parsed[line] is None:
+            valid += 1
+        else:
+            rejected.append((n, line, parsed[line]))
+    return entries, valid, rejected
+
+
+def _parsed_chunks(worker: Callable, path: str, workers: Optional[int], chunk_bytes: int) -> Iterator[tuple]:
+    """
+    Run `worker` over the file's chunks, yielding results in file order. A
+    file of one chunk, or `workers` <= 1, is parsed in this process;
+    otherwise by a pool of forked processes with a bounded number of
+    chunks in flight, so the file is never held in memory at once.
+    """
+    chunks = read_chunks(path, chunk_bytes)
+    head = list(itertools.islice(chunks, 2))
+    workers = workers or os.cpu_count() or 1
+    if len(head) < 2 or workers <= 1:
+        for chunk in itertools.chain(head, chunks):
+            yield worker(*chunk)
+        return
+
+    # Forked like the pre-fork server: nothing is re-imported in the workers.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = deque(pool.submit(worker, *chunk) for chunk in head)
+        for chunk in chunks:
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield pending.popleft().result()
+            pending.append(pool.submit(worker, *chunk))
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_rejects(path: str, rejected: List[Reject]) -> None:
+    # Tab-separated: line number, reason, text.
+    with open(path, "w", encoding="utf-8") as f:
+        for n, text, reason in rejected:
+            f.write(f"{n}\t{reason}\t{text}\n")
+
+
+# ---------------------------
+# Loaders
+# ---------------------------
+
+def load_roots(
+    root_tree: RootBST,
+    path: str,
+    workers: Optional[int] = None,
+    rejects_path: Optional[str] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> LoadReport:
+    """
+    Load a roots file (one dashed root per line) into `root_tree`: lines
+    are validated and normalized in parallel chunks (`workers` processes,
+    default one per CPU), deduped, and merged in with one rebuild. Rejected
+    lines are reported, and also written to `rejects_path` when given.
+    """
+    report = LoadReport()
+    fresh = set()
+    total = 0
+    for compacts, valid, rejected in _parsed_chunks(parse_root_chunk, path, workers, chunk_bytes):
+        total += valid
+        fresh.update(compacts)
+        report.rejected.extend(rejected)
+    report.accepted = len(root_tree.insert_compacts(fresh))
+    report.duplicates = total - report.accepted
+    if rejects_path is not None:
+        _write_rejects(rejects_path, report.rejected)
+    return report
+
+
+def load_patterns(
+    pattern_table: PatternHashTable,
+    path: str,
+    workers: Optional[int] = None,
+    rejects_path: Optional[str] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> LoadReport:
+    """
+    Load a patterns file (one pattern per line, used as its own rule) into
+    `pattern_table`, like load_roots: parallel validation and rule
+    compilation, dedupe (the first occurrence wins), then one reserve and
+    one batch insert.
+    """
+    report = LoadReport()
+    entries = {}
+    total = 0
+    for parsed, valid, rejected in _parsed_chunks(parse_pattern_chunk, path, workers, chunk_bytes):
+        total += valid
+        for pattern, template in parsed:
+            entries.setdefault(pattern, template)
+        report.rejected.extend(rejected)
+    report.accepted = pattern_table.insert_templates(entries.items())
+    report.duplicates = total - report.accepted
+    if rejects_path is not None:
+        _write_rejects(rejects_path, report.rejected)
+    return report
@@ -1,40 +1,134 @@
 from __future__ import annotations
+import itertools
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Iterator, Tuple, Union
 
 from Data_Structures.normalization import (
+    BulkInsertError,
+    RootInput,
     normalize_pattern,
-    extract_root_letters,
-    validate_dashed_root,
+    parse_root,
     is_arabic_letter,
 )
 
 
 SHADDA = "\u0651"
 
+DEFAULT_CAPACITY = 37
+DEFAULT_MAX_LOAD_FACTOR = 0.75
+DEFAULT_MIN_LOAD_FACTOR = 0.1
+# Buckets migrated from the old table on every mutation while rehashing.
+REHASH_STEP = 4
+
+_HASH_BASE = 131
+_HASH_MOD = (1 << 61) - 1
+
+
+def _next_prime(n: int) -> int:
+    candidate = max(2, n)
+    while True:
+        if all(candidate % d for d in range(2, int(candidate ** 0.5) + 1)):
+            return candidate
+        candidate += 1
+
+
+# Root-letter placeholders in a rule, in root order (slot 0, 1, 2).
+SLOT_LETTERS = "فعل"
+
+
+@dataclass(frozen=True)
+class RuleTemplate:
+    """
+    A rule compiled once into literal segments and root-letter slots:
+    مفعول -> segments ("م", "", "و", ""), slots (0, 1, 2).
+    Filling it with a compact root is a single str.format call.
+    """
+    rule: str
+    segments: Tuple[str, ...]
+    slots: Tuple[int, ...]
+    format_string: str
+
+    def fill(self, compact_root: str) -> str:
+        return self.format_string.format(*compact_root)
+
+
+def compile_rule(rule: str) -> RuleTemplate:
+    segments: List[str] = []
+    slots: List[int] = []
+    literal: List[str] = []
+    for ch in rule:
+        slot = SLOT_LETTERS.find(ch)
+        if slot < 0:
+            literal.append(ch)
+            continue
+        segments.append("".join(literal))
+        slots.append(slot)
+        literal = []
+    segments.append("".join(literal))
+
+    escaped = [seg.replace("{", "{{").replace("}", "}}") for seg in segments]
+    format_string = "".join(
+        f"{seg}{{{slot}}}" for seg, slot in zip(escaped, slots)
+    ) + escaped[-1]
+    return RuleTemplate(rule, tuple(segments), tuple(slots), format_string)
+
+
+def parse_pattern(pattern: object) -> Tuple[Optional[str], Optional[str]]:
+    """(normalized pattern, None) when valid, else (None, why not)."""
+    if not isinstance(pattern, str):
+        return None, "Pattern must be text."
+    normalized = normalize_pattern(pattern)
+    if not normalized:
+        return None, "Pattern is empty."
+    # ✅ min length = 4 (rejects فعل)
+    if len(normalized) < 4:
+        return None, "Pattern must have at least 4 letters."
+    # Arabic letters or shadda only
+    for ch in normalized:
+        if ch == SHADDA:
+            continue
+        if not is_arabic_letter(ch):
+            return None, "Only Arabic letters are allowed."
+    if "ف" not in normalized or "ع" not in normalized or "ل" not in normalized:
+        return None, "Pattern must contain ف, ع and ل."
+    return normalized, None
+
 
 @dataclass
 class PatternRuleNode:
     pattern: str
     rule: str
     next: Optional["PatternRuleNode"] = None
+    key_hash: int = 0
+    template: Optional[RuleTemplate] = None
 
 
 class PatternRuleChain:
     def __init__(self) -> None:
         self.head: Optional[PatternRuleNode] = None
 
-    def insert(self, pattern: str, rule: str) -> bool:
+    def insert(
+        self,
+        pattern: str,
+        rule: str,
+        key_hash: int = 0,
+        template: Optional[RuleTemplate] = None,
+    ) -> bool:
         current = self.head
         while current:
             if current.pattern == pattern:
                 return False
             current = current.next
-        node = PatternRuleNode(pattern, rule)
+        node = PatternRuleNode(pattern, rule, key_hash=key_hash, template=template)
         node.next = self.head
         self.head = node
         return True
 
+    def push(self, node: PatternRuleNode) -> None:
+        """Link an existing node in front (no duplicate check, used by rehash)."""
+        node.next = self.head
+        self.head = node
+
     def find_node(self, pattern: str) -> Optional[PatternRuleNode]:
         current = self.head
         while current:
@@ -46,11 +140,12 @@ class PatternRuleChain:
     def find(self, pattern: str) -> bool:
         return self.find_node(pattern) is not None
 
-    def update(self, pattern: str, rule: str) -> bool:
+    def update(self, pattern: str, rule: str, template: Optional[RuleTemplate] = None) -> bool:
         node = self.find_node(pattern)
         if node is None:
             return False
         node.rule = rule
+        node.template = template
         return True
 
     def remove(self, pattern: str) -> bool:
@@ -68,47 +163,112 @@ class PatternRuleChain:
         return False
 
 
-class PatternHashTable:
+class PatternTableListener:
     """
-    Hash table for patterns (pattern + rule).
-    Chaining with linked lists.
-    Fixed table size (37).
+    Receives structural changes of a PatternHashTable as (normalized pattern,
+    compiled template) pairs. The defaults do nothing.
     """
 
-    def __init__(self) -> None:
-        self._capacity = 37
+    def on_patterns_inserted(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        pass
+
+    def on_pattern_updated(self, pattern: str, old: RuleTemplate, new: RuleTemplate) -> None:
+        pass
+
+    def on_patterns_removed(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        pass
+
+
+class PatternTable:
+    """
+    Pattern table (pattern + rule), independent of how entries are stored:
+    validation, rule compilation, listeners, versioning and derivation all
+    go through the storage primitives each layout implements
+    (PatternHashTable, OpenAddressingPatternTable).
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        max_load_factor: float = DEFAULT_MAX_LOAD_FACTOR,
+        min_load_factor: float = DEFAULT_MIN_LOAD_FACTOR,
+        expected_size: int = 0,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity must be positive.")
+        if not 0 <= min_load_factor < max_load_factor:
+            raise ValueError("Load factors must satisfy 0 <= min < max.")
+        self._max_load_factor = max_load_factor
+        self._min_load_factor = min_load_factor
+        self._capacity = max(capacity, self._capacity_for(expected_size))
+        # Shrinking never goes below the initial (or reserved) capacity.
+        self._min_capacity = self._capacity
         self._size = 0
-        self._buckets: List[PatternRuleChain] = [
-            PatternRuleChain() for _ in range(self._capacity)
-        ]
+        self._listeners: List[PatternTableListener] = []
+        # Bumped by every insert / update / remove (resizes don't count).
+        self._version = 0
+        self._init_storage()
 
     def _normalize_and_validate(self, pattern: object) -> Optional[str]:
-        if not isinstance(pattern, str):
-            return None
-        normalized = normalize_pattern(pattern)
-        if not normalized:
-            return None
-        # ✅ min length = 4 (rejects فعل)
-        if len(normalized) < 4:
-            return None
-        # Arabic letters or shadda only
-        for ch in normalized:
-            if ch == SHADDA:
-                continue
-            if not is_arabic_letter(ch):
-                return None
-        if "ف" not in normalized or "ع" not in normalized or "ل" not in normalized:
-            return None
-        return normalized
+        return parse_pattern(pattern)[0]
 
-    def _hash(self, key: str) -> int:
-        base = 131
-        mod = self._capacity
+    def _hash_value(self, key: str) -> int:
         value = 0
         for ch in key:
-            value = (value * base + ord(ch)) % mod
+            value = (value * _HASH_BASE + ord(ch)) % _HASH_MOD
         return value
 
+    # ---------- Resizing ----------
+
+    def capacity(self) -> int:
+        return self._capacity
+
+    def load_factor(self) -> float:
+        return self._size / self._capacity
+
+    def is_rehashing(self) -> bool:
+        return False
+
+    # ---------- Storage (each layout implements these) ----------
+
+    def _init_storage(self) -> None:
+        raise NotImplementedError
+
+    def _capacity_for(self, count: int) -> int:
+        raise NotImplementedError
+
+    def reserve(self, expected_size: int) -> None:
+        """
+        Pre-size the table so `expected_size` patterns fit without growing.
+        The reserved capacity also becomes the floor for shrinking.
+        """
+        raise NotImplementedError
+
+    def _lookup(self, normalized: str) -> Optional[RuleTemplate]:
+        raise NotImplementedError
+
+    def _store(self, normalized: str, template: RuleTemplate) -> bool:
+        raise NotImplementedError
+
+    def _replace(self, normalized: str, template: RuleTemplate) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, normalized: str) -> bool:
+        raise NotImplementedError
+
+    def _iter_entries(self) -> Iterator[Tuple[str, RuleTemplate]]:
+        raise NotImplementedError
+
+    # ---------- Listeners ----------
+
+    def add_listener(self, listener: PatternTableListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: PatternTableListener) -> None:
+        self._listeners.remove(listener)
+
+    # ---------- Core Operations ----------
+
     def insert(self, pattern: object, rule: Optional[str] = None) -> bool:
         normalized = self._normalize_and_validate(pattern)
         if normalized is None:
@@ -118,19 +278,78 @@ class PatternHashTable:
         if normalized_rule is None:
             raise ValueError("Invalid rule format.")
 
-        idx = self._hash(normalized)
-        inserted = self._buckets[idx].insert(normalized, normalized_rule)
-        if not inserted:
+        template = compile_rule(normalized_rule)
+        if not self._store(normalized, template):
             raise ValueError("Pattern already exists.")
-        self._size += 1
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_patterns_inserted([(normalized, template)])
         return True
 
+    def insert_many(self, items: Iterable[Union[str, Tuple[str, str]]]) -> int:
+        """
+        All-or-nothing bulk insert of patterns or (pattern, rule) pairs.
+        Everything is validated first; any invalid, existing or repeated
+        pattern raises BulkInsertError listing them all, with the table
+        untouched. Otherwise the table is reserved once (no growth while
+        filling), and listeners get one batch notification.
+        """
+        errors = []
+        entries: List[Tuple[str, RuleTemplate]] = []
+        seen: Dict[str, int] = {}
+        for i, item in enumerate(items):
+            pattern, rule = item if isinstance(item, tuple) else (item, None)
+            normalized = self._normalize_and_validate(pattern)
+            normalized_rule = self._normalize_and_validate(rule or normalized)
+            if normalized is None:
+                errors.append((i, item, "Invalid pattern format."))
+            elif normalized_rule is None:
+                errors.append((i, item, "Invalid rule format."))
+            elif self._lookup(normalized) is not None:
+                errors.append((i, item, "Pattern already exists."))
+            elif normalized in seen:
+                errors.append((i, item, f"Duplicate of item {seen[normalized]}."))
+            else:
+                seen[normalized] = i
+                entries.append((normalized, compile_rule(normalized_rule)))
+        if errors:
+            raise BulkInsertError(errors)
+        return self._store_many(entries)
+
+    def restore(self, entries: List[Tuple[str, RuleTemplate]]) -> int:
+        """
+        Load trusted (normalized pattern, compiled template) pairs into an
+        empty table (see binary_snapshot). Nothing is validated or compiled.
+        """
+        if self._size:
+            raise ValueError("restore needs an empty table.")
+        return self._store_many(entries)
+
+    def insert_templates(self, entries: Iterable[Tuple[str, RuleTemplate]]) -> int:
+        """
+        Trusted bulk insert (see bulk_loader): (normalized pattern, compiled
+        template) pairs, validated and deduped by the caller. Patterns already
+        in the table are skipped. Returns how many were inserted.
+        """
+        return self._store_many([entry for entry in entries if self._lookup(entry[0]) is None])
+
+    def _store_many(self, entries: List[Tuple[str, RuleTemplate]]) -> int:
+        # Reserved once, so no growth while filling; one batch notification.
+        if not entries:
+            return 0
+        self.reserve(self._size + len(entries))
+        for normalized, template in entries:
+            self._store(normalized, template)
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_patterns_inserted(entries)
+        return len(entries)
+
     def contains(self, pattern: object) -> bool:
         normalized = self._normalize_and_validate(pattern)
         if normalized is None:
             return False
-        idx = self._hash(normalized)
-        return self._buckets[idx].find(normalized)
+        return self._lookup(normalized) is not None
 
     def update(self, pattern: object, new_rule: str) -> bool:
         normalized = self._normalize_and_validate(pattern)
@@ -139,79 +358,387 @@ class PatternHashTable:
             raise ValueError("Invalid pattern format.")
         if normalized_rule is None:
             raise ValueError("Invalid rule format.")
-        idx = self._hash(normalized)
-        updated = self._buckets[idx].update(normalized, normalized_rule)
-        if not updated:
+        old = self._lookup(normalized) if self._listeners else None
+        template = compile_rule(normalized_rule)
+        if not self._replace(normalized, template):
             raise ValueError("Pattern not found.")
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_pattern_updated(normalized, old, template)
         return True
 
     def remove(self, pattern: object) -> bool:
         normalized = self._normalize_and_validate(pattern)
         if normalized is None:
             raise ValueError("Invalid pattern format.")
-        idx = self._hash(normalized)
-        removed = self._buckets[idx].remove(normalized)
-        if not removed:
+        old = self._lookup(normalized) if self._listeners else None
+        if not self._delete(normalized):
             raise ValueError("Pattern not found.")
-        self._size -= 1
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_patterns_removed([(normalized, old)])
         return True
 
     def get_rule(self, pattern: object) -> Optional[str]:
+        template = self.get_template(pattern)
+        return None if template is None else template.rule
+
+    def get_template(self, pattern: object) -> Optional[RuleTemplate]:
         normalized = self._normalize_and_validate(pattern)
         if normalized is None:
             return None
-        idx = self._hash(normalized)
-        node = self._buckets[idx].find_node(normalized)
-        return None if node is None else node.rule
+        return self._lookup(normalized)
 
     def iter_patterns(self):
-        for chain in self._buckets:
-            current = chain.head
-            while current:
-                yield current.pattern
-                current = current.next
+        for pattern, _ in self._iter_entries():
+            yield pattern
+
+    def iter_templates(self) -> Iterator[Tuple[str, RuleTemplate]]:
+        """(normalized pattern, compiled rule) pairs, straight from storage."""
+        return self._iter_entries()
 
     def size(self) -> int:
         return self._size
 
+    def version(self) -> int:
+        """Monotonic counter of content changes, for cache validation."""
+        return self._version
+
     def load_patterns_from_file(self, file_path: str) -> int:
-        count = 0
         with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                raw = line.strip()
-                if not raw:
-                    continue
-                try:
-                    self.insert(raw)
-                    count += 1
-                except ValueError:
-                    continue
+            lines = [raw for raw in (line.strip() for line in f) if raw]
+        self.reserve(self._size + len(lines))
+
+        count = 0
+        for raw in lines:
+            try:
+                self.insert(raw)
+                count += 1
+            except ValueError:
+                continue
         return count
 
-    def derive(self, raw_root: str, pattern: object) -> Optional[str]:
-        rule = self.get_rule(pattern)
-        if rule is None:
+    def derive(self, raw_root: RootInput, pattern: object) -> Optional[str]:
+        parsed = parse_root(raw_root)
+        template = self.get_template(pattern)
+        if template is None or not parsed.ok:
             return None
-        return derive_from_normalized_pattern(raw_root, rule)
+        return template.fill(parsed.compact)
 
+    def derive_compact(self, compact_root: str, pattern: object) -> Optional[str]:
+        """Derive from an already-resolved compact root (e.g. RootNode.root)."""
+        template = self.get_template(pattern)
+        return None if template is None else template.fill(compact_root)
+
+
+class PatternHashTable(PatternTable):
+    """
+    Hash table for patterns (pattern + rule).
+    Chaining with linked lists.
+    Grows when size / capacity exceeds `max_load_factor` and shrinks below
+    `min_load_factor`. Rehashing is incremental: the old bucket array is kept
+    next to the new one and every mutation migrates REHASH_STEP buckets, so a
+    single insert never pays for the whole table.
+    """
+
+    def _init_storage(self) -> None:
+        self._buckets: List[PatternRuleChain] = [
+            PatternRuleChain() for _ in range(self._capacity)
+        ]
+        # Old bucket array while an incremental rehash is in progress.
+        self._old_buckets: Optional[List[PatternRuleChain]] = None
+        self._rehash_index = 0
+
+    def _find_node(self, normalized: str) -> Optional[PatternRuleNode]:
+        key_hash = self._hash_value(normalized)
+        if self._old_buckets is not None:
+            old = self._old_buckets
+            node = old[key_hash % len(old)].find_node(normalized)
+            if node is not None:
+                return node
+        return self._buckets[key_hash % self._capacity].find_node(normalized)
+
+    # ---------- Resizing ----------
+
+    def is_rehashing(self) -> bool:
+        return self._old_buckets is not None
+
+    def _capacity_for(self, count: int) -> int:
+        # Leave headroom so the table lands halfway to the growth threshold.
+        return _next_prime(int(count / (self._max_load_factor / 2)) + 1)
+
+    def reserve(self, expected_size: int) -> None:
+        target = self._capacity_for(expected_size)
+        self._min_capacity = max(self._min_capacity, target)
+        if target <= self._capacity:
+            return
+        self._finish_rehash()
+        self._start_rehash(target)
+        self._finish_rehash()
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        self._old_buckets = self._buckets
+        self._capacity = new_capacity
+        self._buckets = [PatternRuleChain() for _ in range(new_capacity)]
+        self._rehash_index = 0
+
+    def _rehash_step(self, steps: int = REHASH_STEP) -> None:
+        old = self._old_buckets
+        if old is None:
+            return
+        stop = min(len(old), self._rehash_index + steps)
+        for i in range(self._rehash_index, stop):
+            current = old[i].head
+            old[i].head = None
+            while current:
+                nxt = current.next
+                self._buckets[current.key_hash % self._capacity].push(current)
+                current = nxt
+        self._rehash_index = stop
+        if stop == len(old):
+            self._old_buckets = None
+            self._rehash_index = 0
+
+    def _finish_rehash(self) -> None:
+        if self._old_buckets is not None:
+            self._rehash_step(len(self._old_buckets))
+
+    def _after_mutation(self) -> None:
+        if self._old_buckets is not None:
+            self._rehash_step()
+            return
+        if self._size > self._capacity * self._max_load_factor:
+            self._start_rehash(_next_prime(2 * self._capacity + 1))
+            self._rehash_step()
+        elif (
+            self._capacity > self._min_capacity
+            and self._size < self._capacity * self._min_load_factor
+        ):
+            self._start_rehash(max(self._min_capacity, self._capacity_for(self._size)))
+            self._rehash_step()
+
+    # ---------- Storage primitives (normalized keys) ----------
+
+    def _lookup(self, normalized: str) -> Optional[RuleTemplate]:
+        node = self._find_node(normalized)
+        return None if node is None else node.template
+
+    def _store(self, normalized: str, template: RuleTemplate) -> bool:
+        if self._find_node(normalized) is not None:
+            return False
+        key_hash = self._hash_value(normalized)
+        self._buckets[key_hash % self._capacity].insert(
+            normalized, template.rule, key_hash, template
+        )
+        self._size += 1
+        self._after_mutation()
+        return True
+
+    def _replace(self, normalized: str, template: RuleTemplate) -> bool:
+        node = self._find_node(normalized)
+        if node is None:
+            return False
+        node.rule = template.rule
+        node.template = template
+        self._after_mutation()
+        return True
+
+    def _delete(self, normalized: str) -> bool:
+        key_hash = self._hash_value(normalized)
+        removed = self._buckets[key_hash % self._capacity].remove(normalized)
+        if not removed and self._old_buckets is not None:
+            old = self._old_buckets
+            removed = old[key_hash % len(old)].remove(normalized)
+        if not removed:
+            return False
+        self._size -= 1
+        self._after_mutation()
+        return True
+
+    def _iter_entries(self) -> Iterator[Tuple[str, RuleTemplate]]:
+        for node in self._iter_nodes():
+            yield node.pattern, node.template
+
+    def _iter_nodes(self) -> Iterator[PatternRuleNode]:
+        buckets = self._buckets
+        if self._old_buckets is not None:
+            buckets = itertools.chain(self._old_buckets, self._buckets)
+        for chain in buckets:
+            current = chain.head
+            while current:
+                yield current
+                current = current.next
+
+
+# ---------------------------
+# Open addressing variant
+# ---------------------------
+
+# Marks a deleted slot: probing continues past it, inserts may reuse it.
+_TOMBSTONE = "\x00"
+
+
+def _next_power_of_two(n: int) -> int:
+    return 1 << max(0, n - 1).bit_length()
+
+
+class OpenAddressingPatternTable(PatternTable):
+    """
+    Array-backed PatternTable: keys, compiled rules and cached hashes live in three
+    parallel flat lists indexed by slot, with linear probing and tombstone
+    deletes. No per-pattern node object, no pointer chasing.
+    Capacity is a power of two (slot = hash & mask). Resizing is a single
+    flat-array rebuild (which also drops tombstones) triggered when
+    size + tombstones passes `max_load_factor`.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        max_load_factor: float = 0.6,
+        min_load_factor: float = DEFAULT_MIN_LOAD_FACTOR,
+        expected_size: int = 0,
+    ) -> None:
+        super().__init__(
+            capacity=_next_power_of_two(capacity),
+            max_load_factor=max_load_factor,
+            min_load_factor=min_load_factor,
+            expected_size=expected_size,
+        )
+
+    def _init_storage(self) -> None:
+        self._keys: List[Optional[str]] = [None] * self._capacity
+        self._templates: List[Optional[RuleTemplate]] = [None] * self._capacity
+        self._hashes: List[int] = [0] * self._capacity
+        self._tombstones = 0
+
+    def _capacity_for(self, count: int) -> int:
+        return _next_power_of_two(int(count / (self._max_load_factor / 2)) + 1)
+
+    def _slot(self, normalized: str, key_hash: int) -> int:
+        keys = self._keys
+        hashes = self._hashes
+        mask = self._capacity - 1
+        i = key_hash & mask
+        while True:
+            key = keys[i]
+            if key is None:
+                return -1
+            if hashes[i] == key_hash and key == normalized:
+                return i
+            i = (i + 1) & mask
+
+    # ---------- Resizing ----------
+
+    def reserve(self, expected_size: int) -> None:
+        target = self._capacity_for(expected_size)
+        self._min_capacity = max(self._min_capacity, target)
+        if target > self._capacity:
+            self._resize(target)
+
+    def _resize(self, new_capacity: int) -> None:
+        entries = [
+            (key, template, key_hash)
+            for key, template, key_hash in zip(self._keys, self._templates, self._hashes)
+            if key is not None and key != _TOMBSTONE
+        ]
+        self._capacity = new_capacity
+        self._init_storage()
+        mask = new_capacity - 1
+        keys, templates, hashes = self._keys, self._templates, self._hashes
+        for key, template, key_hash in entries:
+            i = key_hash & mask
+            while keys[i] is not None:
+                i = (i + 1) & mask
+            keys[i] = key
+            templates[i] = template
+            hashes[i] = key_hash
+
+    def _after_mutation(self) -> None:
+        if self._size + self._tombstones > self._capacity * self._max_load_factor:
+            # Grow if live entries alone are crowded, otherwise just purge tombstones.
+            if self._size > self._capacity * self._max_load_factor / 2:
+                self._resize(self._capacity * 2)
+            else:
+                self._resize(self._capacity)
+        elif (
+            self._capacity > self._min_capacity
+            and self._size < self._capacity * self._min_load_factor
+        ):
+            self._resize(max(self._min_capacity, self._capacity_for(self._size)))
+
+    # ---------- Storage primitives (normalized keys) ----------
+
+    def _lookup(self, normalized: str) -> Optional[RuleTemplate]:
+        i = self._slot(normalized, self._hash_value(normalized))
+        return None if i < 0 else self._templates[i]
+
+    def _store(self, normalized: str, template: RuleTemplate) -> bool:
+        key_hash = self._hash_value(normalized)
+        keys = self._keys
+        mask = self._capacity - 1
+        i = key_hash & mask
+        free = -1
+        while keys[i] is not None:
+            key = keys[i]
+            if key == _TOMBSTONE:
+                if free < 0:
+                    free = i
+            elif self._hashes[i] == key_hash and key == normalized:
+                return False
+            i = (i + 1) & mask
+        if free >= 0:
+            i = free
+            self._tombstones -= 1
+        keys[i] = normalized
+        self._templates[i] = template
+        self._hashes[i] = key_hash
+        self._size += 1
+        self._after_mutation()
+        return True
+
+    def _replace(self, normalized: str, template: RuleTemplate) -> bool:
+        i = self._slot(normalized, self._hash_value(normalized))
+        if i < 0:
+            return False
+        self._templates[i] = template
+        return True
+
+    def _delete(self, normalized: str) -> bool:
+        i = self._slot(normalized, self._hash_value(normalized))
+        if i < 0:
+            return False
+        self._keys[i] = _TOMBSTONE
+        self._templates[i] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._after_mutation()
+        return True
+
+    def _iter_entries(self) -> Iterator[Tuple[str, RuleTemplate]]:
+        for key, template in zip(self._keys, self._templates):
+            if key is not None and key != _TOMBSTONE:
+                yield key, template
+
+
+PATTERN_TABLE_LAYOUTS = {
+    "chained": PatternHashTable,
+    "open_addressing": OpenAddressingPatternTable,
+}
+
+
+def make_pattern_table(layout: str = "chained", **kwargs) -> PatternTable:
+    """Build a pattern table with the requested storage layout."""
+    try:
+        table_cls = PATTERN_TABLE_LAYOUTS[layout]
+    except KeyError:
+        raise ValueError(f"Unknown pattern table layout: {layout}") from None
+    return table_cls(**kwargs)
 
-def derive_from_normalized_pattern(raw_root: str, normalized_pattern: str) -> Optional[str]:
-    if not validate_dashed_root(raw_root):
-        return None
 
-    letters = extract_root_letters(raw_root)
-    if letters is None:
+def derive_from_normalized_pattern(raw_root: RootInput, normalized_pattern: str) -> Optional[str]:
+    """Derive from a pattern that is not stored (stored ones reuse their template)."""
+    parsed = parse_root(raw_root)
+    if not parsed.ok:
         return None
-    f, a, l = letters
-
-    result = []
-    for ch in normalized_pattern:
-        if ch == "ف":
-            result.append(f)
-        elif ch == "ع":
-            result.append(a)
-        elif ch == "ل":
-            result.append(l)
-        else:
-            result.append(ch)
-    return "".join(result)
\ No newline at end of file
+    return compile_rule(normalized_pattern).fill(parsed.compact)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Optional, List, Tuple
 
 
 @dataclass
@@ -10,37 +10,100 @@ class DerivedWordNode:
     next: Optional["DerivedWordNode"] = None
 
 
+class _FrequencyBucket:
+    """All words sharing one count, in the order they reached it."""
+
+    __slots__ = ("count", "words", "prev", "next")
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.words: Dict[str, None] = {}
+        self.prev: Optional[_FrequencyBucket] = None
+        self.next: Optional[_FrequencyBucket] = None
+
+
 class DerivedWordList:
     """
     Linked list to store derived words for a root.
     Ensures uniqueness and tracks frequency.
+
+    A dict over the nodes makes add/contains O(1). A doubly linked list of
+    frequency buckets (ascending count) is updated on every add in O(1),
+    so top_k walks only the k most frequent words, never a full sort.
     """
 
     def __init__(self) -> None:
         self.head: Optional[DerivedWordNode] = None
         self._size: int = 0
+        self._total: int = 0
+        self._nodes: Dict[str, DerivedWordNode] = {}
+        self._buckets: Dict[int, _FrequencyBucket] = {}
+        self._lowest: Optional[_FrequencyBucket] = None
+        self._highest: Optional[_FrequencyBucket] = None
+
+    @classmethod
+    def from_items(
+        cls,
+        items: Iterable[Tuple[str, int]],
+        order: Optional[Iterable[int]] = None,
+    ) -> "DerivedWordList":
+        """
+        Rebuild a list from `to_items()` output (newest first) without
+        replaying every add. With `order` (from `bucket_order()`), words
+        tied on a count keep the order they reached it, so `top_k` ranks
+        exactly as before; without it, first-seen order.
+        """
+        words = cls()
+        items = list(items)
+        oldest_first = items[::-1]
+        prev: Optional[_FrequencyBucket] = None
+        for count in sorted({count for _, count in oldest_first}):
+            prev = words._bucket_after(prev, count)
+        for word, count in oldest_first:
+            node = DerivedWordNode(word, count, words.head)
+            words.head = words._nodes[word] = node
+            words._size += 1
+            words._total += count
+        ranked = oldest_first if order is None else [items[i] for i in order]
+        for word, count in ranked:
+            words._buckets[count].words[word] = None
+        return words
+
+    def bucket_order(self) -> List[int]:
+        """
+        Positions in `to_items()` of every word, lowest count first and,
+        within a count, in the order the words reached it.
+        """
+        position = {word: i for i, (word, _) in enumerate(self.to_items())}
+        order: List[int] = []
+        bucket = self._lowest
+        while bucket is not None:
+            order.extend(position[word] for word in bucket.words)
+            bucket = bucket.next
+        return order
 
     def add(self, word: str) -> bool:
-        current = self.head
-        while current:
-            if current.word == word:
-                current.count += 1
-                return False
-            current = current.next
+        self._total += 1
+        node = self._nodes.get(word)
+        if node is not None:
+            node.count += 1
+            self._promote(word, node.count - 1)
+            return False
 
         node = DerivedWordNode(word)
         node.next = self.head
         self.head = node
+        self._nodes[word] = node
         self._size += 1
+        self._bucket_after(None, 1).words[word] = None
         return True
 
     def contains(self, word: str) -> bool:
-        current = self.head
-        while current:
-            if current.word == word:
-                return True
-            current = current.next
-        return False
+        return word in self._nodes
+
+    def count(self, word: str) -> int:
+        node = self._nodes.get(word)
+        return 0 if node is None else node.count
 
     def to_list(self) -> List[str]:
         words: List[str] = []
@@ -58,5 +121,59 @@ class DerivedWordList:
             current = current.next
         return items
 
+    def top_k(self, k: int) -> List[Tuple[str, int]]:
+        """The k most frequent (word, count) pairs, highest count first."""
+        items: List[Tuple[str, int]] = []
+        bucket = self._highest
+        while bucket is not None and len(items) < k:
+            for word in bucket.words:
+                if len(items) == k:
+                    break
+                items.append((word, bucket.count))
+            bucket = bucket.prev
+        return items
+
+    def total_count(self) -> int:
+        """Sum of all frequencies (every add, duplicates included)."""
+        return self._total
+
     def __len__(self) -> int:
-        return self._size
\ No newline at end of file
+        return self._size
+
+    # ---------- Frequency buckets ----------
+
+    def _bucket_after(self, prev: Optional[_FrequencyBucket], count: int) -> _FrequencyBucket:
+        """Bucket for `count`, linked right after `prev` (None = front) if new."""
+        bucket = self._buckets.get(count)
+        if bucket is not None:
+            return bucket
+        bucket = self._buckets[count] = _FrequencyBucket(count)
+        bucket.prev = prev
+        bucket.next = self._lowest if prev is None else prev.next
+        if bucket.prev is None:
+            self._lowest = bucket
+        else:
+            bucket.prev.next = bucket
+        if bucket.next is None:
+            self._highest = bucket
+        else:
+            bucket.next.prev = bucket
+        return bucket
+
+    def _promote(self, word: str, old_count: int) -> None:
+        bucket = self._buckets[old_count]
+        del bucket.words[word]
+        self._bucket_after(bucket, old_count + 1).words[word] = None
+        if not bucket.words:
+            self._unlink(bucket)
+
+    def _unlink(self, bucket: _FrequencyBucket) -> None:
+        del self._buckets[bucket.count]
+        if bucket.prev is None:
+            self._lowest = bucket.next
+        else:
+            bucket.prev.next = bucket.next
+        if bucket.next is None:
+            self._highest = bucket.prev
+        else:
+            bucket.next.prev = bucket.prev
@@ -1,4 +1,7 @@
 from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 
 DIACRITICS = set([
     "\u064b",  # Tanwin Fath
@@ -21,38 +24,70 @@ ALEF_VARIANTS = {
 
 TATWEEL = "\u0640"
 
+# Single-pass str.translate tables: every rule above is a per-character
+# delete or replace, so one table per function gives identical output.
+_BASE_TABLE = {ord(ch): None for ch in (" ", "\t", "\n", TATWEEL)}
+_BASE_TABLE.update({ord(k): v for k, v in ALEF_VARIANTS.items()})
+_COMMON_TABLE = {**_BASE_TABLE, **{ord(ch): None for ch in DIACRITICS}}
+_ROOT_TABLE = {**_COMMON_TABLE, ord("-"): None}
+_PATTERN_TABLE = {**_BASE_TABLE, **{ord(ch): None for ch in DIACRITICS_NO_SHADDA}}
 
-def _normalize_base(text: str) -> str:
-    if not text:
-        return ""
-    text = text.replace(" ", "").replace("\t", "").replace("\n", "")
-    text = text.replace(TATWEEL, "")
-    text = "".join(ALEF_VARIANTS.get(ch, ch) for ch in text)
-    return text
+# Entries kept per normalization function (LRU eviction beyond that).
+NORMALIZATION_CACHE_SIZE = 4096
 
 
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_common(text: str) -> str:
     """Normalize Arabic text and remove ALL diacritics (including shadda)."""
-    text = _normalize_base(text)
-    text = "".join(ch for ch in text if ch not in DIACRITICS)
-    return text
+    if not text:
+        return ""
+    return text.translate(_COMMON_TABLE)
 
 
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_root(raw_root: str) -> str:
     """Normalize root and remove dashes."""
-    normalized = normalize_common(raw_root)
-    return "".join(ch for ch in normalized if ch != "-")
+    if not raw_root:
+        return ""
+    return raw_root.translate(_ROOT_TABLE)
 
 
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_pattern(pattern: str) -> str:
     """
     Normalize pattern:
     - remove harakat (diacritics) but KEEP shadda
     - normalize Alef variants
     """
-    text = _normalize_base(pattern)
-    text = "".join(ch for ch in text if ch not in DIACRITICS_NO_SHADDA)
-    return text
+    if not pattern:
+        return ""
+    return pattern.translate(_PATTERN_TABLE)
+
+
+_CACHED = {
+    "normalize_common": normalize_common,
+    "normalize_root": normalize_root,
+    "normalize_pattern": normalize_pattern,
+}
+
+
+def normalization_cache_info() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters and fill level of each normalization cache."""
+    info = {}
+    for name, fn in _CACHED.items():
+        stats = fn.cache_info()
+        info[name] = {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "size": stats.currsize,
+            "max_size": stats.maxsize,
+        }
+    return info
+
+
+def clear_normalization_caches() -> None:
+    for fn in _CACHED.values():
+        fn.cache_clear()
 
 
 def extract_root_letters(raw_root: str):
@@ -66,23 +101,75 @@ def is_arabic_letter(ch: str) -> bool:
     return "\u0621" <= ch <= "\u064A"
 
 
-def validate_dashed_root(raw_root: str) -> bool:
-    if not isinstance(raw_root, str):
-        return False
+@dataclass(frozen=True)
+class ParsedRoot:
+    """
+    A root parsed once: the input as given, its compact letters ("" when
+    invalid) and the validation error (None when valid). Immutable and
+    hashable, so it can be passed through every layer and used as a key.
+    """
+    raw: str
+    compact: str
+    error: Optional[str] = None
 
-    normalized = normalize_common(raw_root)
-    if normalized.count("-") != 2:
-        return False
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def dashed(self) -> str:
+        return "-".join(self.compact)
+
+
+RootInput = Union[str, ParsedRoot]
 
-    parts = normalized.split("-")
-    if len(parts) != 3 or not all(parts):
-        return False
 
-    letters = "".join(parts)
-    if len(letters) != 3:
-        return False
+class BulkInsertError(ValueError):
+    """
+    A bulk insert rejected as a whole: `errors` holds (index, item, message)
+    for every offending item, and nothing was applied.
+    """
 
-    if not all(is_arabic_letter(ch) for ch in letters):
-        return False
+    def __init__(self, errors: List[Tuple[int, object, str]]) -> None:
+        super().__init__(f"{len(errors)} invalid item(s); nothing was inserted.")
+        self.errors = errors
 
-    return True
\ No newline at end of file
+
+def parse_root(raw_root: RootInput) -> ParsedRoot:
+    """Parse a dashed root (ك-ت-ب) once; ParsedRoot inputs pass through."""
+    if isinstance(raw_root, ParsedRoot):
+        return raw_root
+    if not isinstance(raw_root, str):
+        return ParsedRoot("", "", "Root must contain letters.")
+    return _parse_root(raw_root)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _parse_root(raw_root: str) -> ParsedRoot:
+    normalized = normalize_common(raw_root)
+    letters_only = normalized.replace("-", "")
+
+    if not letters_only:
+        error = "Root must contain letters."
+    elif not all(is_arabic_letter(ch) for ch in letters_only):
+        error = "Only Arabic letters are allowed."
+    elif len(letters_only) != 3:
+        error = "Root must have exactly 3 letters."
+    elif normalized.count("-") != 2:
+        error = "Root must contain exactly two dashes (example: ك-ت-ب)."
+    else:
+        parts = normalized.split("-")
+        if not all(parts):
+            error = "Missing letter between dashes."
+        elif not all(len(part) == 1 for part in parts):
+            error = "Each part must be a single letter."
+        else:
+            return ParsedRoot(raw_root, letters_only)
+    return ParsedRoot(raw_root, "", error)
+
+
+_CACHED["parse_root"] = _parse_root
+
+
+def validate_dashed_root(raw_root: RootInput) -> bool:
+    return parse_root(raw_root).ok
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from Data_Structures.hash_table import PatternHashTable, PatternTableListener, RuleTemplate, SHADDA
+from Data_Structures.normalization import is_arabic_letter
+
+# A trie edge is either a literal letter or a root-letter slot (0=ف, 1=ع, 2=ل).
+Symbol = Union[str, int]
+
+
+def skeleton(template: RuleTemplate) -> List[Symbol]:
+    """
+    Template as compared against normalize_common(word): literal letters
+    (shadda dropped, since word normalization drops it too) and slot indexes.
+    """
+    symbols: List[Symbol] = []
+    for segment, slot in zip(template.segments, template.slots):
+        symbols.extend(ch for ch in segment if ch != SHADDA)
+        symbols.append(slot)
+    symbols.extend(ch for ch in template.segments[-1] if ch != SHADDA)
+    return symbols
+
+
+@dataclass
+class PatternTrieNode:
+    literals: Dict[str, "PatternTrieNode"] = field(default_factory=dict)
+    slots: Dict[int, "PatternTrieNode"] = field(default_factory=dict)
+    patterns: List[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.literals or self.slots or self.patterns)
+
+
+class PatternTrie(PatternTableListener):
+    """
+    Trie over the skeletons of every stored pattern, where ف/ع/ل are wildcard
+    slots. Matching a word walks it once and only follows edges that agree
+    with the next letter, so the cost depends on the word length and the
+    number of patterns that fit, not on how many roots or patterns exist.
+    Skeletons are bucketed by length (one trie per length), so a word never
+    touches patterns of another length.
+    Kept in sync with the pattern table through its listener hooks, unless
+    `follow` is False (e.g. over an immutable snapshot).
+    """
+
+    def __init__(self, pattern_table: PatternHashTable, follow: bool = True) -> None:
+        self._by_length: Dict[int, PatternTrieNode] = {}
+        self._size = 0
+        for pattern, template in pattern_table.iter_templates():
+            self._add(pattern, template)
+        if follow:
+            pattern_table.add_listener(self)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ---------- Matching ----------
+
+    def match(self, normalized_word: str) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (pattern, compact root) for every pattern whose skeleton fits
+        the word, binding each slot to one letter consistently.
+        """
+        n = len(normalized_word)
+        start = self._by_length.get(n)
+        if start is None:
+            return
+        stack: List[Tuple[PatternTrieNode, int, Tuple[Optional[str], ...]]] = [
+            (start, 0, (None, None, None))
+        ]
+        while stack:
+            node, i, bound = stack.pop()
+            if i == n:
+                if node.patterns and None not in bound:
+                    compact = "".join(bound)
+                    for pattern in node.patterns:
+                        yield pattern, compact
+                continue
+
+            ch = normalized_word[i]
+            child = node.literals.get(ch)
+            if child is not None:
+                stack.append((child, i + 1, bound))
+            if not node.slots or not is_arabic_letter(ch):
+                continue
+            for slot, child in node.slots.items():
+                letter = bound[slot]
+                if letter is None:
+                    stack.append((child, i + 1, bound[:slot] + (ch,) + bound[slot + 1:]))
+                elif letter == ch:
+                    stack.append((child, i + 1, bound))
+
+    def match_root(self, normalized_word: str, compact_root: str) -> Iterator[str]:
+        """
+        Yield the patterns that derive `normalized_word` from `compact_root`.
+        Slot edges only match the root's own letter, so a subtree is dropped
+        at the first mismatching character.
+        """
+        n = len(normalized_word)
+        start = self._by_length.get(n)
+        if start is None:
+            return
+        stack: List[Tuple[PatternTrieNode, int]] = [(start, 0)]
+        while stack:
+            node, i = stack.pop()
+            if i == n:
+                yield from node.patterns
+                continue
+            ch = normalized_word[i]
+            child = node.literals.get(ch)
+            if child is not None:
+                stack.append((child, i + 1))
+            for slot, child in node.slots.items():
+                if compact_root[slot] == ch:
+                    stack.append((child, i + 1))
+
+    def lengths(self) -> List[int]:
+        return sorted(self._by_length)
+
+    # ---------- Maintenance ----------
+
+    def _add(self, pattern: str, template: RuleTemplate) -> None:
+        symbols = skeleton(template)
+        node = self._by_length.get(len(symbols))
+        if node is None:
+            node = self._by_length[len(symbols)] = PatternTrieNode()
+        for symbol in symbols:
+            edges = node.slots if isinstance(symbol, int) else node.literals
+            child = edges.get(symbol)
+            if child is None:
+                child = edges[symbol] = PatternTrieNode()
+            node = child
+        node.patterns.append(pattern)
+        self._size += 1
+
+    def _discard(self, pattern: str, template: RuleTemplate) -> None:
+        symbols = skeleton(template)
+        start = node = self._by_length.get(len(symbols))
+        if node is None:
+            return
+        path: List[Tuple[PatternTrieNode, Symbol]] = []
+        for symbol in symbols:
+            edges = node.slots if isinstance(symbol, int) else node.literals
+            child = edges.get(symbol)
+            if child is None:
+                return
+            path.append((node, symbol))
+            node = child
+        if pattern not in node.patterns:
+            return
+        node.patterns.remove(pattern)
+        self._size -= 1
+
+        # Prune now-empty branches bottom-up.
+        for parent, symbol in reversed(path):
+            edges = parent.slots if isinstance(symbol, int) else parent.literals
+            if not edges[symbol].is_empty():
+                break
+            del edges[symbol]
+        if start.is_empty():
+            del self._by_length[len(symbols)]
+
+    def on_patterns_inserted(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        for pattern, template in entries:
+            self._add(pattern, template)
+
+    def on_pattern_updated(self, pattern: str, old: RuleTemplate, new: RuleTemplate) -> None:
+        self._discard(pattern, old)
+        self._add(pattern, new)
+
+    def on_patterns_removed(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        for pattern, template in entries:
+            self._discard(pattern, template)
@@ -1,9 +1,23 @@
 from __future__ import annotations
+import heapq
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional, List, Generator, Dict
+from typing import Optional, List, Generator, Dict, Iterable, Iterator, Tuple, Union
 
 from Data_Structures.linked_list import DerivedWordList
-from Data_Structures.normalization import normalize_root, normalize_common
+from Data_Structures.normalization import BulkInsertError, ParsedRoot, RootInput, normalize_root, parse_root
+
+
+ARABIC_FIRST = "\u0621"
+ARABIC_LAST = "\u064A"
+# Letter codes 0..ALPHABET_SIZE-1 used to pack a root into one integer.
+ALPHABET_SIZE = ord(ARABIC_LAST) - ord(ARABIC_FIRST) + 1
+PACKED_ROOT_SLOTS = ALPHABET_SIZE ** 3
+# Root insertions/deletions remembered for `changes_since` deltas.
+CHANGELOG_SIZE = 4096
+# Batches larger than this fraction of the tree are merged and rebuilt
+# instead of inserted one root at a time.
+REBUILD_FRACTION = 8
 
 
 def is_arabic_letter(ch: str) -> bool:
@@ -11,57 +25,68 @@ def is_arabic_letter(ch: str) -> bool:
     Arabic letters are mainly in: \u0621 - \u064A
     Includes Alef Maksura (ى = \u0649).
     """
-    return "\u0621" <= ch <= "\u064A"
-
-
-def validate_dashed_root_with_reason(raw_root: str) -> Optional[str]:
-    normalized = normalize_common(raw_root)
+    return ARABIC_FIRST <= ch <= ARABIC_LAST
 
-    letters_only = normalized.replace("-", "")
-    if not letters_only:
-        return "Root must contain letters."
-    if not all(is_arabic_letter(ch) for ch in letters_only):
-        return "Only Arabic letters are allowed."
-    if len(letters_only) != 3:
-        return "Root must have exactly 3 letters."
 
-    if normalized.count("-") != 2:
-        return "Root must contain exactly two dashes (example: ك-ت-ب)."
+def validate_dashed_root_with_reason(raw_root: RootInput) -> Optional[str]:
+    return parse_root(raw_root).error
 
-    parts = normalized.split("-")
-    if not all(parts):
-        return "Missing letter between dashes."
-    if not all(len(part) == 1 for part in parts):
-        return "Each part must be a single letter."
 
-    return None
-
-
-def validate_dashed_root(raw_root: str) -> bool:
+def validate_dashed_root(raw_root: RootInput) -> bool:
     return validate_dashed_root_with_reason(raw_root) is None
 
 
-def to_compact_root(raw_root: str) -> str:
+def to_compact_root(raw_root: RootInput) -> str:
     """
     Convert a dashed root to compact form: ك-ت-ب -> كتب
     """
-    compact = normalize_root(raw_root)
+    if isinstance(raw_root, ParsedRoot):
+        compact = raw_root.compact
+    else:
+        compact = normalize_root(raw_root)
     if len(compact) != 3:
         raise ValueError(f"Expected 3 letters, got {len(compact)}")
     return compact
 
 
-def format_dashed(compact_root: str) -> str:
-    """
-    Convert compact root to dashed form: كتب -> ك-ت-ب
-    """
+def _check_compact(compact_root: str) -> None:
     if len(compact_root) != 3:
         raise ValueError(f"Root must be exactly 3 letters, got {len(compact_root)}")
     if not all(is_arabic_letter(ch) for ch in compact_root):
         raise ValueError("Root must contain only Arabic letters.")
+
+
+def format_dashed(compact_root: Union[str, int]) -> str:
+    """
+    Convert compact root (or its packed code) to dashed form: كتب -> ك-ت-ب
+    """
+    if isinstance(compact_root, int):
+        compact_root = unpack_root(compact_root)
+    _check_compact(compact_root)
     return "-".join(compact_root)
 
 
+def pack_root(compact_root: str) -> int:
+    """
+    Pack a compact root into one integer in [0, PACKED_ROOT_SLOTS):
+    each letter becomes a base-ALPHABET_SIZE digit.
+    """
+    _check_compact(compact_root)
+    base = ord(ARABIC_FIRST)
+    a, b, c = (ord(ch) - base for ch in compact_root)
+    return (a * ALPHABET_SIZE + b) * ALPHABET_SIZE + c
+
+
+def unpack_root(code: int) -> str:
+    """Inverse of pack_root: 1234 -> compact root."""
+    if not 0 <= code < PACKED_ROOT_SLOTS:
+        raise ValueError(f"Packed root out of range: {code}")
+    code, c = divmod(code, ALPHABET_SIZE)
+    a, b = divmod(code, ALPHABET_SIZE)
+    base = ord(ARABIC_FIRST)
+    return chr(base + a) + chr(base + b) + chr(base + c)
+
+
 # ---------------------------
 # BST Node
 # ---------------------------
@@ -72,6 +97,89 @@ class RootNode:
     derived: DerivedWordList
     left: Optional["RootNode"] = None
     right: Optional["RootNode"] = None
+    height: int = 1
+    size: int = 1  # nodes in this subtree, for rank / select
+
+
+def _node_height(node: Optional[RootNode]) -> int:
+    return node.height if node is not None else 0
+
+
+def _node_size(node: Optional[RootNode]) -> int:
+    return node.size if node is not None else 0
+
+
+# ---------------------------
+# Direct-address root index
+# ---------------------------
+
+class PackedRootIndex:
+    """
+    Dense array of PACKED_ROOT_SLOTS entries indexed by pack_root(compact):
+    membership and node lookup are one integer computation and one list
+    access, with no string comparisons. RootBST keeps it in sync and still
+    owns ordered traversal.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: List[Optional[RootNode]] = [None] * PACKED_ROOT_SLOTS
+
+    @staticmethod
+    def _code(compact: str) -> int:
+        """pack_root without raising: -1 for anything that is not a root."""
+        if len(compact) != 3:
+            return -1
+        base = ord(ARABIC_FIRST)
+        a = ord(compact[0]) - base
+        b = ord(compact[1]) - base
+        c = ord(compact[2]) - base
+        if not (0 <= a < ALPHABET_SIZE and 0 <= b < ALPHABET_SIZE and 0 <= c < ALPHABET_SIZE):
+            return -1
+        return (a * ALPHABET_SIZE + b) * ALPHABET_SIZE + c
+
+    def get(self, compact: str) -> Optional[RootNode]:
+        code = self._code(compact)
+        return None if code < 0 else self._nodes[code]
+
+    def get_packed(self, code: int) -> Optional[RootNode]:
+        return self._nodes[code] if 0 <= code < PACKED_ROOT_SLOTS else None
+
+    def contains(self, compact: str) -> bool:
+        return self.get(compact) is not None
+
+    def set(self, node: RootNode) -> None:
+        self._nodes[pack_root(node.root)] = node
+
+    def set_packed(self, code: int, node: RootNode) -> None:
+        """`set` for a code already known to be pack_root(node.root)."""
+        self._nodes[code] = node
+
+    def discard(self, compact: str) -> None:
+        code = self._code(compact)
+        if code >= 0:
+            self._nodes[code] = None
+
+
+# ---------------------------
+# Change listeners
+# ---------------------------
+
+class RootTreeListener:
+    """
+    Receives structural changes of a RootBST as lists of compact roots.
+    Subclass and override what you need; the defaults do nothing.
+    Derived-word records are a hot path, so they only reach listeners
+    registered with `add_derived_listener`.
+    """
+
+    def on_roots_inserted(self, compacts: List[str]) -> None:
+        pass
+
+    def on_roots_deleted(self, compacts: List[str]) -> None:
+        pass
+
+    def on_derived_recorded(self, compact: str, word: str, pattern: Optional[str]) -> None:
+        pass
 
 
 # ---------------------------
@@ -82,90 +190,179 @@ class RootBST:
     """
     Binary Search Tree storing Arabic roots in compact form.
     Unicode ordering is used by Python string comparison.
+
+    Insert/delete are iterative and record the visited path, then retrace it
+    bottom-up through `_rebalance` (subclasses hook balancing in there).
+
+    Derived-word aggregates (distinct words, total frequency, per-pattern
+    usage) are kept as running counters, updated by `record_derived` and
+    `delete`, so `count_total_derivatives` and `stats` never walk the tree.
     """
 
     def __init__(self) -> None:
         self.root: Optional[RootNode] = None
         self._size: int = 0
+        self._listeners: List[RootTreeListener] = []
+        self._derived_listeners: List[RootTreeListener] = []
+        self._packed = PackedRootIndex()
+        self._total_derived: int = 0
+        self._total_frequency: int = 0
+        # Cumulative: a pattern's uses are not forgotten when a root is deleted.
+        self._pattern_usage: Dict[str, int] = {}
+        # Bumped once per structural mutation; the changelog keeps
+        # (version, inserted?, compact) for the last CHANGELOG_SIZE changes.
+        self._version: int = 0
+        self._changelog: deque = deque()
+        self._changelog_floor: int = 0
+
+    # ---------- Listeners ----------
+
+    def add_listener(self, listener: RootTreeListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: RootTreeListener) -> None:
+        self._listeners.remove(listener)
+
+    def add_derived_listener(self, listener: RootTreeListener) -> None:
+        self._derived_listeners.append(listener)
+
+    def remove_derived_listener(self, listener: RootTreeListener) -> None:
+        self._derived_listeners.remove(listener)
 
     # ---------- Core Operations ----------
 
-    def insert(self, raw_root: str) -> RootNode:
-        error = validate_dashed_root_with_reason(raw_root)
-        if error:
-            raise ValueError(error)
+    def insert(self, raw_root: RootInput) -> RootNode:
+        parsed = parse_root(raw_root)
+        if parsed.error:
+            raise ValueError(parsed.error)
 
-        compact = to_compact_root(raw_root)
+        compact = parsed.compact
+        node = self._attach(compact)
+        self._record_change([compact], True)
+        for listener in self._listeners:
+            listener.on_roots_inserted([compact])
+        return node
 
+    def _attach(self, compact: str) -> RootNode:
+        """Insert one compact root (no change record or notification)."""
         if self.root is None:
             self.root = RootNode(root=compact, derived=DerivedWordList())
+            self._packed.set(self.root)
             self._size += 1
             return self.root
 
+        path: List[RootNode] = []
         current = self.root
         while True:
+            path.append(current)
             if compact == current.root:
                 raise ValueError("Root already exists.")
             elif compact < current.root:
                 if current.left is None:
-                    current.left = RootNode(root=compact, derived=DerivedWordList())
-                    self._size += 1
-                    return current.left
+                    node = current.left = RootNode(root=compact, derived=DerivedWordList())
+                    break
                 current = current.left
             else:
                 if current.right is None:
-                    current.right = RootNode(root=compact, derived=DerivedWordList())
-                    self._size += 1
-                    return current.right
+                    node = current.right = RootNode(root=compact, derived=DerivedWordList())
+                    break
                 current = current.right
 
-    def search(self, raw_root: str) -> Optional[RootNode]:
-        if not validate_dashed_root(raw_root):
+        self._packed.set(node)
+        self._size += 1
+        self._retrace(path)
+        return node
+
+    def search(self, raw_root: RootInput) -> Optional[RootNode]:
+        parsed = parse_root(raw_root)
+        if parsed.error:
             return None
+        return self.search_compact(parsed.compact)
 
-        compact = to_compact_root(raw_root)
-        current = self.root
-        while current:
-            if compact == current.root:
-                return current
-            elif compact < current.root:
-                current = current.left
-            else:
-                current = current.right
-        return None
+    def search_compact(self, compact: str) -> Optional[RootNode]:
+        """Lookup by an already-normalized compact root: O(1) via the packed index."""
+        return self._packed.get(compact)
+
+    def contains_packed(self, code: int) -> bool:
+        return self._packed.get_packed(code) is not None
 
-    def delete(self, raw_root: str) -> bool:
-        error = validate_dashed_root_with_reason(raw_root)
-        if error:
+    def delete(self, raw_root: RootInput) -> bool:
+        parsed = parse_root(raw_root)
+        if parsed.error:
             return False
 
-        compact = to_compact_root(raw_root)
-        self.root, deleted = self._delete_recursive(self.root, compact)
-        if deleted:
-            self._size -= 1
-        return deleted
+        compact = parsed.compact
 
-    def _delete_recursive(self, node: Optional[RootNode], compact: str):
-        if node is None:
-            return None, False
-
-        if compact < node.root:
-            node.left, deleted = self._delete_recursive(node.left, compact)
-            return node, deleted
-        elif compact > node.root:
-            node.right, deleted = self._delete_recursive(node.right, compact)
-            return node, deleted
-        else:
-            if node.left is None:
-                return node.right, True
-            if node.right is None:
-                return node.left, True
+        path: List[RootNode] = []
+        current = self.root
+        while current is not None and current.root != compact:
+            path.append(current)
+            current = current.left if compact < current.root else current.right
+        if current is None:
+            return False
 
-            successor = self._min_node(node.right)
-            node.root = successor.root
-            node.derived = successor.derived
-            node.right, _ = self._delete_recursive(node.right, successor.root)
-            return node, True
+        self._packed.discard(compact)
+        self._total_derived -= len(current.derived)
+        self._total_frequency -= current.derived.total_count()
+        if current.left is not None and current.right is not None:
+            # Two children: pull the in-order successor up, then unlink it.
+            path.append(current)
+            successor = current.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            current.root = successor.root
+            current.derived = successor.derived
+            self._packed.set(current)
+            current = successor
+
+        child = current.left if current.left is not None else current.right
+        self._replace_child(path[-1] if path else None, current, child)
+        self._size -= 1
+        self._retrace(path)
+        self._record_change([compact], False)
+        for listener in self._listeners:
+            listener.on_roots_deleted([compact])
+        return True
+
+    # ---------- Versioning ----------
+
+    def version(self) -> int:
+        """Monotonic counter of structural changes, for cache validation."""
+        return self._version
+
+    def _record_change(self, compacts: List[str], inserted: bool) -> None:
+        self._version += 1
+        log = self._changelog
+        if len(compacts) > CHANGELOG_SIZE:
+            # The batch alone overflows the log: only "now" stays answerable.
+            log.clear()
+            self._changelog_floor = self._version
+            return
+        for compact in compacts:
+            log.append((self._version, inserted, compact))
+        while len(log) > CHANGELOG_SIZE:
+            self._changelog_floor = log.popleft()[0]
+
+    def changes_since(self, version: int) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        (added, removed) compact roots between `version` and now, netted so a
+        root inserted then deleted shows up in neither. None when the
+        changelog no longer reaches back that far (or `version` is unknown):
+        the caller has to reload the full list.
+        """
+        if not self._changelog_floor <= version <= self._version:
+            return None
+        first: Dict[str, bool] = {}
+        last: Dict[str, bool] = {}
+        for entry_version, inserted, compact in reversed(self._changelog):
+            if entry_version <= version:
+                break
+            first[compact] = inserted
+            last.setdefault(compact, inserted)
+        added = sorted(c for c, ins in last.items() if ins and first[c])
+        removed = sorted(c for c, ins in last.items() if not ins and not first[c])
+        return added, removed
 
     def _min_node(self, node: RootNode) -> RootNode:
         current = node
@@ -173,11 +370,66 @@ class RootBST:
             current = current.left
         return current
 
-    def add_derived_word(self, raw_root: str, derived_word: str) -> bool:
+    def _replace_child(
+        self,
+        parent: Optional[RootNode],
+        old: RootNode,
+        new: Optional[RootNode],
+    ) -> None:
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _retrace(self, path: List[RootNode]) -> None:
+        """Refresh the nodes on `path` bottom-up, re-linking any rotated subtree."""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                self._replace_child(path[i - 1] if i > 0 else None, node, subtree)
+
+    def _update(self, node: RootNode) -> None:
+        node.height = 1 + max(_node_height(node.left), _node_height(node.right))
+        node.size = 1 + _node_size(node.left) + _node_size(node.right)
+
+    def _rebalance(self, node: RootNode) -> RootNode:
+        """Plain BST: only refresh cached metadata, never rotate."""
+        self._update(node)
+        return node
+
+    def add_derived_word(
+        self,
+        raw_root: RootInput,
+        derived_word: str,
+        pattern: Optional[str] = None,
+    ) -> bool:
         node = self.search(raw_root)
         if node is None:
             return False
-        return node.derived.add(derived_word)
+        return self.record_derived(node, derived_word, pattern)
+
+    def record_derived(self, node: RootNode, derived_word: str, pattern: Optional[str] = None) -> bool:
+        """
+        Add a derived word to `node` and update the running aggregates.
+        Every writer of derived words goes through here.
+        The node is resolved again by its root, so a node from a snapshot
+        works too, and a record for a root deleted since is dropped.
+        """
+        node = self._packed.get(node.root)
+        if node is None:
+            return False
+        is_new = node.derived.add(derived_word)
+        if is_new:
+            self._total_derived += 1
+        self._total_frequency += 1
+        if pattern is not None:
+            self._pattern_usage[pattern] = self._pattern_usage.get(pattern, 0) + 1
+        for listener in self._derived_listeners:
+            listener.on_derived_recorded(node.root, derived_word, pattern)
+        return is_new
 
     # ---------- Input Helpers ----------
 
@@ -190,61 +442,275 @@ class RootBST:
         return self._size > size_before
 
     def load_roots_from_file(self, file_path: str) -> int:
-        count = 0
         with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                raw = line.strip()
-                if not raw:
-                    continue
-                try:
-                    size_before = self._size
-                    self.insert(raw)
-                    if self._size > size_before:
-                        count += 1
-                except ValueError:
-                    continue
-        return count
+            return self.bulk_load(line.strip() for line in f)
+
+    def restore(
+        self,
+        compacts: List[str],
+        codes: Iterable[int],
+        derived: Dict[int, DerivedWordList],
+        pattern_usage: Dict[str, int],
+    ) -> int:
+        """
+        Load trusted state into an empty tree (see binary_snapshot):
+        `compacts` are already normalized, sorted and unique, `codes` their
+        pack_root values, and `derived` maps an index into `compacts` to that
+        root's words. Nothing is validated or re-packed.
+        """
+        if self._size:
+            raise ValueError("restore needs an empty tree.")
+        nodes = [RootNode(root=compact, derived=DerivedWordList()) for compact in compacts]
+        for code, node in zip(codes, nodes):
+            self._packed.set_packed(code, node)
+        for i, words in derived.items():
+            nodes[i].derived = words
+            self._total_derived += len(words)
+            self._total_frequency += words.total_count()
+        self._pattern_usage = dict(pattern_usage)
+        self.root = self._build_balanced(nodes, 0, len(nodes))
+        self._size = len(nodes)
+        self._record_change(compacts, True)
+        for listener in self._listeners:
+            listener.on_roots_inserted(compacts)
+        return len(nodes)
+
+    def bulk_load(self, raw_roots: Iterable[str]) -> int:
+        """
+        Insert many roots at once: invalid entries are skipped, the rest are
+        sorted and deduped, and added together (see _merge_new). Existing
+        nodes (and their derived words) are kept. Returns how many new roots
+        were added.
+        """
+        fresh = set()
+        for raw in raw_roots:
+            if not raw:
+                continue
+            parsed = parse_root(raw)
+            if parsed.ok:
+                fresh.add(parsed.compact)
+        return len(self.insert_compacts(fresh))
+
+    def insert_compacts(self, compacts: Iterable[str]) -> List[str]:
+        """
+        Trusted counterpart of bulk_load (see bulk_loader): `compacts` are
+        already normalized and validated. Repeats and roots already present
+        are skipped; the rest go in together (see _merge_new). Returns the
+        inserted compact roots, in order.
+        """
+        new = sorted({compact for compact in compacts if not self._packed.contains(compact)})
+        return self._merge_new(new)
+
+    def insert_many(self, raw_roots: Iterable[RootInput]) -> List[str]:
+        """
+        All-or-nothing bulk insert. Every item is validated first; any
+        invalid, already present or repeated root raises BulkInsertError
+        listing them all, with the tree untouched. Otherwise the roots go in
+        together (see _merge_new) with one listener notification. Returns
+        the inserted compact roots, in order.
+        """
+        errors = []
+        fresh: Dict[str, int] = {}
+        for i, raw in enumerate(raw_roots):
+            parsed = parse_root(raw)
+            if parsed.error:
+                errors.append((i, raw, parsed.error))
+            elif self._packed.contains(parsed.compact):
+                errors.append((i, raw, "Root already exists."))
+            elif parsed.compact in fresh:
+                errors.append((i, raw, f"Duplicate of item {fresh[parsed.compact]}."))
+            else:
+                fresh[parsed.compact] = i
+        if errors:
+            raise BulkInsertError(errors)
+        return self._merge_new(sorted(fresh))
+
+    def delete_many(self, raw_roots: Iterable[RootInput]) -> List[str]:
+        """
+        Delete many roots with one rebuild and one listener notification.
+        Invalid or absent roots are skipped; the remaining nodes (and their
+        derived words) are kept as they are. Returns the deleted compact
+        roots, in order.
+        """
+        doomed = set()
+        for raw in raw_roots:
+            parsed = parse_root(raw)
+            if parsed.ok and self._packed.contains(parsed.compact):
+                doomed.add(parsed.compact)
+        if not doomed:
+            return []
+        kept = []
+        for node in self._iter_nodes():
+            if node.root in doomed:
+                self._packed.discard(node.root)
+                self._total_derived -= len(node.derived)
+                self._total_frequency -= node.derived.total_count()
+            else:
+                kept.append(node)
+        self.root = self._build_balanced(kept, 0, len(kept))
+        self._size = len(kept)
+        removed = sorted(doomed)
+        self._record_change(removed, False)
+        for listener in self._listeners:
+            listener.on_roots_deleted(removed)
+        return removed
+
+    def _merge_new(self, compacts: List[str]) -> List[str]:
+        """
+        Add sorted, absent compact roots with one notification: a batch
+        small next to the tree goes in one root at a time, O(k log n); a
+        larger one is merged and rebuilt, O(n + k).
+        """
+        if not compacts:
+            return []
+        if len(compacts) * REBUILD_FRACTION <= self._size:
+            for compact in compacts:
+                self._attach(compact)
+        else:
+            existing = list(self._iter_nodes())
+            added = [RootNode(root=compact, derived=DerivedWordList()) for compact in compacts]
+            for node in added:
+                self._packed.set(node)
+            merged = list(heapq.merge(existing, added, key=lambda node: node.root))
+            self.root = self._build_balanced(merged, 0, len(merged))
+            self._size = len(merged)
+        self._record_change(compacts, True)
+        for listener in self._listeners:
+            listener.on_roots_inserted(compacts)
+        return compacts
+
+    def _build_balanced(self, nodes: List[RootNode], lo: int, hi: int) -> Optional[RootNode]:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.left = self._build_balanced(nodes, lo, mid)
+        node.right = self._build_balanced(nodes, mid + 1, hi)
+        self._update(node)
+        return node
 
     # ---------- Batch Operations ----------
 
     def get_all_derivatives(self) -> Dict[str, List[str]]:
-        result = {}
+        return {format_dashed(node.root): node.derived.to_list() for node in self._iter_nodes()}
 
-        def _collect(node: Optional[RootNode]):
-            if node is None:
-                return
-            _collect(node.left)
-            result[format_dashed(node.root)] = node.derived.to_list()
-            _collect(node.right)
+    def count_total_derivatives(self) -> int:
+        return self._total_derived
+
+    def total_frequency(self) -> int:
+        return self._total_frequency
+
+    def pattern_usage(self, pattern: str) -> int:
+        return self._pattern_usage.get(pattern, 0)
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of the running aggregates; cheap enough to poll."""
+        return {
+            "roots": self._size,
+            "height": self.height(),
+            "balance": (
+                _node_height(self.root.left) - _node_height(self.root.right)
+                if self.root is not None else 0
+            ),
+            "derived_words": self._total_derived,
+            "total_frequency": self._total_frequency,
+            "pattern_usage": dict(self._pattern_usage),
+        }
 
-        _collect(self.root)
-        return result
+    # ---------- Traversal / Utility ----------
 
-    def count_total_derivatives(self) -> int:
-        total = 0
+    def _iter_nodes(self) -> Iterator[RootNode]:
+        stack: List[RootNode] = []
+        current = self.root
+        while stack or current is not None:
+            while current is not None:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield current
+            current = current.right
 
-        def _count(node: Optional[RootNode]):
-            nonlocal total
-            if node is None:
-                return
-            total += len(node.derived)
-            _count(node.left)
-            _count(node.right)
+    def inorder(self) -> Generator[str, None, None]:
+        for node in self._iter_nodes():
+            yield node.root
 
-        _count(self.root)
-        return total
+    # ---------- Ordered Queries ----------
 
-    # ---------- Traversal / Utility ----------
+    @staticmethod
+    def _bound(value: RootInput) -> str:
+        """Query bound in compact form; partial roots (a prefix) are allowed."""
+        if isinstance(value, ParsedRoot):
+            return value.compact
+        return normalize_root(value)
 
-    def inorder(self) -> Generator[str, None, None]:
-        def _inorder(node: Optional[RootNode]):
-            if node is None:
+    def _iter_range(self, lo: Optional[str], hi: Optional[str]) -> Iterator[RootNode]:
+        """
+        In-order nodes with lo <= root <= hi (None = unbounded). Subtrees
+        left of `lo` are never pushed, so this visits O(height + k) nodes.
+        """
+        stack: List[RootNode] = []
+        current = self.root
+        while stack or current is not None:
+            while current is not None:
+                if lo is not None and current.root < lo:
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            if not stack:
                 return
-            yield from _inorder(node.left)
+            current = stack.pop()
+            if hi is not None and current.root > hi:
+                return
+            yield current
+            current = current.right
+
+    def roots_between(
+        self,
+        lo: Optional[RootInput] = None,
+        hi: Optional[RootInput] = None,
+    ) -> Iterator[str]:
+        """Compact roots in [lo, hi], in order; either bound may be omitted."""
+        lo = None if lo is None else self._bound(lo)
+        hi = None if hi is None else self._bound(hi)
+        for node in self._iter_range(lo, hi):
+            yield node.root
+
+    def roots_with_prefix(self, prefix: str) -> Iterator[str]:
+        """Compact roots starting with `prefix` (e.g. one letter), in order."""
+        prefix = self._bound(prefix)
+        for node in self._iter_range(prefix, prefix + "\U0010FFFF"):
             yield node.root
-            yield from _inorder(node.right)
 
-        yield from _inorder(self.root)
+    def rank(self, raw_root: RootInput) -> int:
+        """Number of roots strictly smaller than `raw_root` (need not exist)."""
+        compact = self._bound(raw_root)
+        rank = 0
+        node = self.root
+        while node is not None:
+            if compact <= node.root:
+                if compact == node.root:
+                    return rank + _node_size(node.left)
+                node = node.left
+            else:
+                rank += _node_size(node.left) + 1
+                node = node.right
+        return rank
+
+    def select(self, index: int) -> str:
+        """The compact root at position `index` (0-based) in sorted order."""
+        if not 0 <= index < self._size:
+            raise IndexError(f"Root index out of range: {index}")
+        node = self.root
+        while True:
+            left = _node_size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.root
+            else:
+                index -= left + 1
+                node = node.right
 
     def list_roots(self, dashed: bool = True) -> List[str]:
         roots = list(self.inorder())
@@ -256,9 +722,45 @@ class RootBST:
         return self._size
 
     def height(self) -> int:
-        def _height(node: Optional[RootNode]) -> int:
-            if node is None:
-                return 0
-            return 1 + max(_height(node.left), _height(node.right))
+        return _node_height(self.root)
+
+
+# ---------------------------
+# AVL variant
+# ---------------------------
+
+class AVLRootTree(RootBST):
+    """
+    Self-balancing (AVL) variant of RootBST with the same public API.
+    Subtree heights never differ by more than one, so search/insert/delete
+    stay O(log n) even when roots arrive in sorted order.
+    """
 
-        return _height(self.root)
\ No newline at end of file
+    def _rebalance(self, node: RootNode) -> RootNode:
+        self._update(node)
+        balance = _node_height(node.left) - _node_height(node.right)
+        if balance > 1:
+            if _node_height(node.left.left) < _node_height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if _node_height(node.right.right) < _node_height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rotate_left(self, node: RootNode) -> RootNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: RootNode) -> RootNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
@@ -0,0 +1,407 @@
+from __future__ import annotations
+import heapq
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from Data_Structures.hash_table import PatternHashTable, PatternTableListener, RuleTemplate
+from Data_Structures.normalization import ParsedRoot, RootInput, normalize_pattern, normalize_root, parse_root
+from Data_Structures.pattern_trie import PatternTrie
+from Data_Structures.root_tree import (
+    ALPHABET_SIZE, REBUILD_FRACTION, PackedRootIndex, RootBST, RootTreeListener, format_dashed, pack_root,
+)
+
+
+# ---------------------------
+# Persistent AVL nodes
+# ---------------------------
+
+@dataclass(frozen=True)
+class PersistentRootNode:
+    root: str  # compact root
+    left: Optional["PersistentRootNode"] = None
+    right: Optional["PersistentRootNode"] = None
+    height: int = 1
+    size: int = 1
+
+
+def _height(node: Optional[PersistentRootNode]) -> int:
+    return node.height if node is not None else 0
+
+
+def _size(node: Optional[PersistentRootNode]) -> int:
+    return node.size if node is not None else 0
+
+
+def _make(root: str, left: Optional[PersistentRootNode], right: Optional[PersistentRootNode]) -> PersistentRootNode:
+    return PersistentRootNode(
+        root, left, right,
+        1 + max(_height(left), _height(right)),
+        1 + _size(left) + _size(right),
+    )
+
+
+def _balance(root: str, left: Optional[PersistentRootNode], right: Optional[PersistentRootNode]) -> PersistentRootNode:
+    """New node for (left, root, right), rotated back into AVL shape."""
+    diff = _height(left) - _height(right)
+    if diff > 1:
+        if _height(left.left) < _height(left.right):
+            pivot = left.right
+            return _make(pivot.root, _make(left.root, left.left, pivot.left), _make(root, pivot.right, right))
+        return _make(left.root, left.left, _make(root, left.right, right))
+    if diff < -1:
+        if _height(right.right) < _height(right.left):
+            pivot = right.left
+            return _make(pivot.root, _make(root, left, pivot.left), _make(right.root, pivot.right, right.right))
+        return _make(right.root, _make(root, left, right.left), right.right)
+    return _make(root, left, right)
+
+
+# The tree is always AVL-balanced, so recursion depth stays ~1.44 log2(n).
+
+def _insert(node: Optional[PersistentRootNode], compact: str) -> PersistentRootNode:
+    if node is None:
+        return PersistentRootNode(compact)
+    if compact < node.root:
+        return _balance(node.root, _insert(node.left, compact), node.right)
+    if compact > node.root:
+        return _balance(node.root, node.left, _insert(node.right, compact))
+    return node
+
+
+def _delete(node: Optional[PersistentRootNode], compact: str) -> Optional[PersistentRootNode]:
+    if node is None:
+        return None
+    if compact < node.root:
+        return _balance(node.root, _delete(node.left, compact), node.right)
+    if compact > node.root:
+        return _balance(node.root, node.left, _delete(node.right, compact))
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    successor = node.right
+    while successor.left is not None:
+        successor = successor.left
+    return _balance(successor.root, node.left, _delete(node.right, successor.root))
+
+
+def _from_sorted(compacts: List[str], lo: int, hi: int) -> Optional[PersistentRootNode]:
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    return _make(compacts[mid], _from_sorted(compacts, lo, mid), _from_sorted(compacts, mid + 1, hi))
+
+
+# ---------------------------
+# Copy-on-write packed index
+# ---------------------------
+
+@dataclass(frozen=True)
+class SnapshotRoot:
+    """What a snapshot lookup returns: the compact root, shared by every version."""
+    root: str
+
+
+class PackedRootPages:
+    """
+    PackedRootIndex for snapshots. The packed code splits into a page (the
+    first two letters) and a slot (the last one); a new version copies the
+    page table and only the pages it touches, so lookups stay one integer
+    computation and two list accesses.
+    """
+
+    __slots__ = ("_pages",)
+
+    def __init__(self, pages: Optional[List[Optional[List[Optional[SnapshotRoot]]]]] = None) -> None:
+        self._pages = pages if pages is not None else [None] * (ALPHABET_SIZE * ALPHABET_SIZE)
+
+    def get(self, compact: str) -> Optional[SnapshotRoot]:
+        code = PackedRootIndex._code(compact)
+        if code < 0:
+            return None
+        page = self._pages[code // ALPHABET_SIZE]
+        return None if page is None else page[code % ALPHABET_SIZE]
+
+    def with_changes(self, inserted: Iterable[str] = (), deleted: Iterable[str] = ()) -> "PackedRootPages":
+        pages = self._pages[:]
+        copied: Set[int] = set()
+
+        def put(compact: str, entry: Optional[SnapshotRoot]) -> None:
+            page, slot = divmod(pack_root(compact), ALPHABET_SIZE)
+            if page not in copied:
+                copied.add(page)
+                pages[page] = pages[page][:] if pages[page] is not None else [None] * ALPHABET_SIZE
+            pages[page][slot] = entry
+
+        for compact in inserted:
+            put(compact, SnapshotRoot(compact))
+        for compact in deleted:
+            put(compact, None)
+        return PackedRootPages(pages)
+
+
+# ---------------------------
+# Snapshots
+# ---------------------------
+
+class RootSnapshot:
+    """
+    Immutable set of roots at one version. Read API mirrors RootBST
+    (search, roots_between, rank, ...). Mutating returns a new snapshot that
+    shares every untouched subtree: O(log n) new nodes per root. Lookups
+    go through a copy-on-write packed index, O(1) like the live tree's.
+    Entries carry no derived words; recording resolves the live node by root.
+    """
+
+    __slots__ = ("_root", "_version", "_packed")
+
+    def __init__(self, root: Optional[PersistentRootNode], version: int, packed: PackedRootPages) -> None:
+        self._root = root
+        self._version = version
+        self._packed = packed
+
+    @classmethod
+    def from_sorted(cls, compacts: List[str], version: int) -> "RootSnapshot":
+        return cls(_from_sorted(compacts, 0, len(compacts)), version, PackedRootPages().with_changes(compacts))
+
+    # ---------- Lookups ----------
+
+    def search(self, raw_root: RootInput) -> Optional[SnapshotRoot]:
+        parsed = parse_root(raw_root)
+        if parsed.error:
+            return None
+        return self.search_compact(parsed.compact)
+
+    def search_compact(self, compact: str) -> Optional[SnapshotRoot]:
+        return self._packed.get(compact)
+
+    def size(self) -> int:
+        return _size(self._root)
+
+    def height(self) -> int:
+        return _height(self._root)
+
+    def version(self) -> int:
+        return self._version
+
+    # ---------- Ordered queries ----------
+
+    @staticmethod
+    def _bound(value: RootInput) -> str:
+        """Query bound in compact form; partial roots (a prefix) are allowed."""
+        if isinstance(value, ParsedRoot):
+            return value.compact
+        return normalize_root(value)
+
+    def roots_between(self, lo: Optional[RootInput] = None, hi: Optional[RootInput] = None) -> Iterator[str]:
+        lo = None if lo is None else self._bound(lo)
+        hi = None if hi is None else self._bound(hi)
+        stack: List[PersistentRootNode] = []
+        current = self._root
+        while stack or current is not None:
+            while current is not None:
+                if lo is not None and current.root < lo:
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            if not stack:
+                return
+            current = stack.pop()
+            if hi is not None and current.root > hi:
+                return
+            yield current.root
+            current = current.right
+
+    def inorder(self) -> Iterator[str]:
+        return self.roots_between()
+
+    def list_roots(self, dashed: bool = True) -> List[str]:
+        roots = list(self.inorder())
+        return [format_dashed(r) for r in roots] if dashed else roots
+
+    def rank(self, raw_root: RootInput) -> int:
+        compact = self._bound(raw_root)
+        rank = 0
+        node = self._root
+        while node is not None:
+            if compact <= node.root:
+                if compact == node.root:
+                    return rank + _size(node.left)
+                node = node.left
+            else:
+                rank += _size(node.left) + 1
+                node = node.right
+        return rank
+
+    def select(self, index: int) -> str:
+        if not 0 <= index < self.size():
+            raise IndexError(f"Root index out of range: {index}")
+        node = self._root
+        while True:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.root
+            else:
+                index -= left + 1
+                node = node.right
+
+    # ---------- Next versions ----------
+
+    def with_inserted(self, compacts: List[str], version: int) -> "RootSnapshot":
+        packed = self._packed.with_changes(inserted=compacts)
+        if len(compacts) * REBUILD_FRACTION > self.size():
+            merged = list(heapq.merge(self.inorder(), sorted(compacts)))
+            return RootSnapshot(_from_sorted(merged, 0, len(merged)), version, packed)
+        root = self._root
+        for compact in compacts:
+            root = _insert(root, compact)
+        return RootSnapshot(root, version, packed)
+
+    def with_deleted(self, compacts: List[str], version: int) -> "RootSnapshot":
+        root = self._root
+        for compact in compacts:
+            root = _delete(root, compact)
+        return RootSnapshot(root, version, self._packed.with_changes(deleted=compacts))
+
+
+class PatternSnapshot:
+    """
+    Frozen pattern -> compiled rule mapping at one version. Mirrors the
+    PatternHashTable read API, so a generator or validator can use it as
+    its table. Changes copy the mapping (patterns are few and rarely change).
+    """
+
+    __slots__ = ("_templates", "_version", "_trie")
+
+    def __init__(self, templates: Mapping[str, RuleTemplate], version: int) -> None:
+        self._templates = MappingProxyType(dict(templates))
+        self._version = version
+        self._trie: Optional[PatternTrie] = None
+
+    def get_template(self, pattern: object) -> Optional[RuleTemplate]:
+        if not isinstance(pattern, str):
+            return None
+        return self._templates.get(normalize_pattern(pattern))
+
+    def get_rule(self, pattern: object) -> Optional[str]:
+        template = self.get_template(pattern)
+        return None if template is None else template.rule
+
+    def contains(self, pattern: object) -> bool:
+        return self.get_template(pattern) is not None
+
+    def derive_compact(self, compact_root: str, pattern: object) -> Optional[str]:
+        template = self.get_template(pattern)
+        return None if template is None else template.fill(compact_root)
+
+    def iter_patterns(self) -> Iterator[str]:
+        return iter(self._templates)
+
+    def iter_templates(self) -> Iterator[Tuple[str, RuleTemplate]]:
+        return iter(self._templates.items())
+
+    def size(self) -> int:
+        return len(self._templates)
+
+    def version(self) -> int:
+        return self._version
+
+    def trie(self) -> PatternTrie:
+        """Skeleton trie over this pattern set, built on first use."""
+        if self._trie is None:
+            self._trie = PatternTrie(self, follow=False)
+        return self._trie
+
+    def with_changes(
+        self,
+        version: int,
+        upserts: Iterable[Tuple[str, RuleTemplate]] = (),
+        removed: Iterable[str] = (),
+    ) -> "PatternSnapshot":
+        templates: Dict[str, RuleTemplate] = dict(self._templates)
+        templates.update(upserts)
+        for pattern in removed:
+            templates.pop(pattern, None)
+        return PatternSnapshot(templates, version)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    roots: RootSnapshot
+    patterns: PatternSnapshot
+
+
+class SnapshotPublisher(RootTreeListener, PatternTableListener):
+    """
+    Publishes an immutable Snapshot of a live RootBST + PatternHashTable.
+    Registered as a listener on both, it derives the next snapshot from the
+    previous one on every change and swaps it in with one assignment, so
+    readers call `current()` with no lock and keep a consistent view for as
+    long as they hold it. Mutations must come from a single writer.
+
+    Inside `batch()`, snapshots are only staged, and the last one is
+    published when the block ends: several mutations reach readers at once.
+    """
+
+    def __init__(self, root_tree: RootBST, pattern_table: PatternHashTable) -> None:
+        self._tree = root_tree
+        self._table = pattern_table
+        self._current = Snapshot(
+            RootSnapshot.from_sorted(list(root_tree.inorder()), root_tree.version()),
+            PatternSnapshot(dict(pattern_table.iter_templates()), pattern_table.version()),
+        )
+        self._staged: Optional[Snapshot] = None
+        root_tree.add_listener(self)
+        pattern_table.add_listener(self)
+
+    def current(self) -> Snapshot:
+        return self._current
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        if self._staged is not None:  # nested: the outer block publishes
+            yield
+            return
+        self._staged = self._current
+        try:
+            yield
+        finally:
+            self._current, self._staged = self._staged, None
+
+    def _latest(self) -> Snapshot:
+        return self._current if self._staged is None else self._staged
+
+    def _publish(self, snapshot: Snapshot) -> None:
+        if self._staged is None:
+            self._current = snapshot
+        else:
+            self._staged = snapshot
+
+    def on_roots_inserted(self, compacts: List[str]) -> None:
+        latest = self._latest()
+        roots = latest.roots.with_inserted(compacts, self._tree.version())
+        self._publish(Snapshot(roots, latest.patterns))
+
+    def on_roots_deleted(self, compacts: List[str]) -> None:
+        latest = self._latest()
+        roots = latest.roots.with_deleted(compacts, self._tree.version())
+        self._publish(Snapshot(roots, latest.patterns))
+
+    def on_patterns_inserted(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        self._publish_patterns(upserts=entries)
+
+    def on_pattern_updated(self, pattern: str, old: RuleTemplate, new: RuleTemplate) -> None:
+        self._publish_patterns(upserts=[(pattern, new)])
+
+    def on_patterns_removed(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        self._publish_patterns(removed=[pattern for pattern, _ in entries])
+
+    def _publish_patterns(self, upserts=(), removed=()) -> None:
+        latest = self._latest()
+        patterns = latest.patterns.with_changes(self._table.version(), upserts, removed)
+        self._publish(Snapshot(latest.roots, patterns))
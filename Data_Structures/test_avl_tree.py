@@ -0,0 +1,215 @@
+import itertools
+import random
+
+from Data_Structures.root_tree import AVLRootTree, RootBST, format_dashed
+
+ROOTS_PATH = "Data/roots.txt"
+LETTERS = "بتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def sorted_roots(count: int):
+    combos = itertools.product(LETTERS, repeat=3)
+    return ["-".join(c) for c in itertools.islice(combos, count)]
+
+
+def check_avl(node):
+    if node is None:
+        return 0
+    left = check_avl(node.left)
+    right = check_avl(node.right)
+    assert abs(left - right) <= 1
+    assert node.height == 1 + max(left, right)
+    assert node.size == 1 + (node.left.size if node.left else 0) + (node.right.size if node.right else 0)
+    return node.height
+
+
+# ============================================================================
+# TEST 1: Sorted insertion stays balanced
+# ============================================================================
+
+def test_sorted_insert_is_balanced():
+    tree = AVLRootTree()
+    roots = sorted_roots(2000)
+    for r in roots:
+        tree.insert(r)
+
+    assert tree.size() == 2000
+    assert tree.height() <= 15  # 1.44 * log2(2000)
+    check_avl(tree.root)
+    assert tree.list_roots(dashed=True) == sorted(roots, key=lambda r: r.replace("-", ""))
+
+
+# ============================================================================
+# TEST 2: Delete keeps balance and derived words
+# ============================================================================
+
+def test_delete_rebalances():
+    tree = AVLRootTree()
+    roots = sorted_roots(500)
+    for r in roots:
+        tree.insert(r)
+    tree.add_derived_word(roots[-1], "كلمة")
+
+    random.seed(7)
+    removed = random.sample(roots[:-1], 300)
+    for r in removed:
+        assert tree.delete(r)
+        check_avl(tree.root)
+    assert not tree.delete(removed[0])
+
+    assert tree.size() == 200
+    assert tree.search(removed[0]) is None
+    assert tree.search(roots[-1]).derived.contains("كلمة")
+
+
+# ============================================================================
+# TEST 3: Bulk load builds a perfectly balanced tree
+# ============================================================================
+
+def test_bulk_load_dedupes_and_balances():
+    tree = AVLRootTree()
+    tree.insert("ك-ت-ب")
+    tree.add_derived_word("ك-ت-ب", "كاتب")
+
+    roots = sorted_roots(1023)
+    added = tree.bulk_load(roots + roots[:10] + ["ك-ت-ب", "كتب", "", "a-b-c"])
+
+    assert added == 1023
+    assert tree.size() == 1024
+    assert tree.height() == 11
+    check_avl(tree.root)
+    assert tree.search("ك-ت-ب").derived.contains("كاتب")
+
+    tree.insert("ي-ي-ي")
+    check_avl(tree.root)
+
+
+def test_load_roots_from_file_matches_plain_bst():
+    avl = AVLRootTree()
+    plain = RootBST()
+    with open(ROOTS_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                plain.insert(line.strip())
+            except ValueError:
+                continue
+
+    assert avl.load_roots_from_file(ROOTS_PATH) == plain.size()
+    assert avl.list_roots() == plain.list_roots()
+    assert format_dashed(avl.root.root) in avl.list_roots()
+
+
+# ============================================================================
+# TEST 4: Running aggregates match a full recount
+# ============================================================================
+
+def test_aggregates_follow_mutations():
+    from Data_Structures.hash_table import PatternHashTable
+    from Engine.generator import MorphologicalGenerator
+
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file("Data/roots.txt")
+    table.load_patterns_from_file("Data/patterns.txt")
+    gen = MorphologicalGenerator(tree, table)
+
+    def recount():
+        nodes = list(tree._iter_nodes())
+        return (
+            sum(len(n.derived) for n in nodes),
+            sum(n.derived.total_count() for n in nodes),
+        )
+
+    roots = tree.list_roots()
+    for root in roots[:5]:
+        gen.generate_family(root)
+    gen.generate_one(roots[0], "مفعول")
+    tree.add_derived_word(roots[1], "كلمة")
+
+    stats = tree.stats()
+    assert (stats["derived_words"], stats["total_frequency"]) == recount()
+    assert stats["pattern_usage"]["مفعول"] == 6
+    assert stats["roots"] == tree.size() and stats["height"] == tree.height()
+    assert tree.count_total_derivatives() == stats["derived_words"]
+
+    for root in roots[:3]:
+        tree.delete(root)
+    assert (tree.count_total_derivatives(), tree.total_frequency()) == recount()
+    assert tree.pattern_usage("مفعول") == 6
+
+
+# ============================================================================
+# TEST 5: Ordered queries and rank / select
+# ============================================================================
+
+def test_range_rank_and_select():
+    random.seed(14)
+    tree = AVLRootTree()
+    roots = sorted_roots(600)
+    random.shuffle(roots)
+    for r in roots[:500]:
+        tree.insert(r)
+    for r in roots[:100]:
+        tree.delete(r)
+    check_avl(tree.root)
+
+    expected = sorted(r.replace("-", "") for r in roots[100:500])
+    assert list(tree.inorder()) == expected
+    for i, compact in enumerate(expected):
+        assert tree.select(i) == compact
+        assert tree.rank(compact) == i
+    assert tree.rank("ي-ي-ي") == len(expected)
+
+    lo, hi = "ت-ب-ب", "ج-ب-ب"
+    assert list(tree.roots_between(lo, hi)) == [r for r in expected if "تبب" <= r <= "جبب"]
+    assert list(tree.roots_between(hi=lo)) == [r for r in expected if r <= "تبب"]
+    assert list(tree.roots_with_prefix("ث")) == [r for r in expected if r.startswith("ث")]
+    assert list(tree.roots_with_prefix("ثب")) == [r for r in expected if r.startswith("ثب")]
+
+
+def test_skewed_plain_bst_traversal_is_iterative():
+    tree = RootBST()
+    roots = sorted_roots(1500)
+    for r in roots:
+        tree.insert(r)
+    assert tree.height() == 1500
+    assert len(list(tree.inorder())) == 1500
+    assert tree.select(1499) == roots[-1].replace("-", "")
+    assert tree.rank(roots[700]) == 700
+    assert len(tree.get_all_derivatives()) == 1500
+
+
+# ============================================================================
+# TEST 6: Versions and change deltas
+# ============================================================================
+
+def test_changes_since_nets_out_mutations(monkeypatch):
+    import Data_Structures.root_tree as root_tree
+
+    tree = AVLRootTree()
+    assert tree.version() == 0
+    tree.bulk_load(["ك-ت-ب", "د-ر-س"])
+    v1 = tree.version()
+    assert v1 == 1
+
+    tree.insert("ح-م-د")
+    tree.insert("غ-ف-ر")
+    tree.delete("غ-ف-ر")
+    tree.delete("ك-ت-ب")
+    tree.insert("ك-ت-ب")
+    tree.delete("د-ر-س")
+    assert not tree.delete("د-ر-س")  # no-op: no version bump
+    assert tree.version() == v1 + 6
+
+    assert tree.changes_since(v1) == (["حمد"], ["درس"])
+    assert tree.changes_since(0) == (["حمد", "كتب"], [])
+    assert tree.changes_since(tree.version()) == ([], [])
+    assert tree.changes_since(tree.version() + 1) is None
+
+    monkeypatch.setattr(root_tree, "CHANGELOG_SIZE", 3)
+    for r in sorted_roots(5):
+        tree.insert(r)
+    assert tree.changes_since(v1) is None
+    assert tree.changes_since(tree.version() - 2) == (
+        [r.replace("-", "") for r in sorted_roots(5)[3:]], []
+    )
@@ -0,0 +1,58 @@
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def build():
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table.load_patterns_from_file(PATTERNS_PATH)
+    gen = MorphologicalGenerator(tree, table)
+    return tree, table, gen, MorphologicalValidator(gen, tree, table)
+
+
+# ============================================================================
+# TEST 1: Batches match one-by-one calls, in input order
+# ============================================================================
+
+def test_generate_batch_matches_generate_one():
+    tree, table, gen, _ = build()
+    roots = tree.list_roots()[:4] + ["غ-ف-ر", None, ["ك"]]
+    patterns = list(table.iter_patterns())[:5] + ["مفعال", None]
+    items = [(r, p) for p in patterns for r in roots]
+
+    batch = list(gen.generate_batch(items, store=False))
+    assert batch == [gen.generate_one(r, p, store=False) for r, p in items]
+    assert [b["root"] for b in batch] == [r for r, _ in items]
+    assert {b["error"] for b in batch} == {None, "ROOT_NOT_FOUND", "PATTERN_NOT_FOUND"}
+
+    before = tree.total_frequency()
+    list(gen.generate_batch(items[:3]))
+    assert tree.total_frequency() == before + 3
+
+
+def test_validate_batch_matches_validate():
+    tree, _, gen, val = build()
+    items = [
+        ("ك-ت-ب", "مكتوب"),
+        ("ك-ت-ب", "مدروس"),
+        ("د-ر-س", "مدروس"),
+        ("غ-ف-ر", "غافر"),
+        ("ك-ت-ب", None),
+        (None, "كاتب"),
+    ]
+    expected = [
+        {"result": "OUI", "pattern": "مفعول"},
+        {"result": "NON", "pattern": None},
+        {"result": "OUI", "pattern": "مفعول"},
+        {"result": "NON", "pattern": None},
+        {"result": "NON", "pattern": None},
+        {"result": "NON", "pattern": None},
+    ]
+    assert list(val.validate_batch(items)) == expected
+    assert [val.validate(r, w) for r, w in items[:4]] == expected[:4]
@@ -0,0 +1,143 @@
+import os
+import shutil
+
+from Data_Structures.binary_snapshot import TextBase, load_or_build, load_snapshot, refresh_snapshot, save_snapshot
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.linked_list import DerivedWordList
+from Data_Structures.root_tree import AVLRootTree
+from Engine.generator import MorphologicalGenerator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def copy_sources(tmp_path):
+    roots = str(tmp_path / "roots.txt")
+    patterns = str(tmp_path / "patterns.txt")
+    shutil.copy(ROOTS_PATH, roots)
+    shutil.copy(PATTERNS_PATH, patterns)
+    return roots, patterns
+
+
+def build(roots, patterns):
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(roots)
+    table.load_patterns_from_file(patterns)
+    return tree, table
+
+
+# ============================================================================
+# TEST 1: Round trip keeps roots, compiled patterns and frequencies
+# ============================================================================
+
+def test_round_trip(tmp_path):
+    sources = copy_sources(tmp_path)
+    tree, table = build(*sources)
+    table.insert("تفاعيل", "تفعيلة")
+    gen = MorphologicalGenerator(tree, table)
+    for root in tree.list_roots()[:10]:
+        gen.generate_family(root)
+    for _ in range(3):
+        gen.generate_one("ك-ت-ب", "مفعول")
+
+    path = str(tmp_path / "engine.snap")
+    base = TextBase.read(*sources)
+    save_snapshot(path, tree, table, base)
+    tree2, table2 = AVLRootTree(), PatternHashTable()
+    assert load_snapshot(path, tree2, table2, sources) == base
+
+    assert tree2.stats() == tree.stats()
+    assert tree2.get_all_derivatives() == tree.get_all_derivatives()
+    assert sorted(table2.iter_templates()) == sorted(table.iter_templates())
+    assert table2.derive("ك-ت-ب", "تفاعيل") == "تكتيبة"
+    node = tree2.search("ك-ت-ب")
+    assert node.derived.to_items() == tree.search("ك-ت-ب").derived.to_items()
+    assert node.derived.top_k(1) == [("مكتوب", 3)]
+
+    # Restored structures keep working as usual.
+    tree2.insert("غ-ف-ر")
+    assert MorphologicalGenerator(tree2, table2).generate_one("غ-ف-ر", "فاعل")["word"] == "غافر"
+
+
+# ============================================================================
+# TEST 2: Stale or damaged snapshots fall back to the text files
+# ============================================================================
+
+def test_stale_or_damaged_snapshot_is_rejected(tmp_path):
+    sources = copy_sources(tmp_path)
+    roots_path = sources[0]
+    path = str(tmp_path / "engine.snap")
+    tree, table = build(*sources)
+    save_snapshot(path, tree, table, TextBase.read(*sources))
+
+    # Touched but unchanged: the checksum still matches.
+    os.utime(roots_path, ns=(0, 0))
+    assert load_snapshot(path, AVLRootTree(), PatternHashTable(), sources)
+
+    with open(roots_path, "a", encoding="utf-8") as f:
+        f.write("\nغ-ف-ر\n")
+    tree2, table2 = AVLRootTree(), PatternHashTable()
+    assert not load_snapshot(path, tree2, table2, sources)
+    assert tree2.size() == 0 and table2.size() == 0
+
+    # Without `save` nothing is written until refresh_snapshot.
+    tree3, table3 = AVLRootTree(), PatternHashTable()
+    base, current = load_or_build(tree3, table3, *sources, path, save=False)
+    assert not current and tree3.search("غ-ف-ر") is not None
+    assert not load_snapshot(path, AVLRootTree(), PatternHashTable(), sources)
+    assert refresh_snapshot(path, tree3, table3, base)
+    assert load_snapshot(path, AVLRootTree(), PatternHashTable(), sources)
+
+    with open(roots_path, "a", encoding="utf-8") as f:
+        f.write("غ-ف-ل\n")
+    assert not load_or_build(tree2, table2, *sources, path)[1]
+    assert tree2.search("غ-ف-ل") is not None
+    assert load_or_build(AVLRootTree(), PatternHashTable(), *sources, path)[1]
+
+    with open(path, "r+b") as f:
+        f.seek(-3, os.SEEK_END)
+        f.write(b"\xff")
+    assert not load_snapshot(path, AVLRootTree(), PatternHashTable(), sources)
+    assert not load_snapshot(str(tmp_path / "missing.snap"), AVLRootTree(), PatternHashTable(), sources)
+
+
+# ============================================================================
+# TEST 3: DerivedWordList.from_items
+# ============================================================================
+
+def test_word_list_from_items():
+    words = DerivedWordList()
+    for word in ["a", "b", "a", "c", "b", "a"]:
+        words.add(word)
+    restored = DerivedWordList.from_items(words.to_items())
+    assert restored.to_items() == words.to_items()
+    assert restored.top_k(3) == [("a", 3), ("b", 2), ("c", 1)]
+    assert restored.total_count() == 6 and len(restored) == 3
+    restored.add("c")
+    assert restored.top_k(3) == [("a", 3), ("b", 2), ("c", 2)]
+
+
+# ============================================================================
+# TEST 4: Ties rank the same after a restore, and long strings fit
+# ============================================================================
+
+def test_restore_keeps_tie_order_and_long_strings(tmp_path):
+    sources = copy_sources(tmp_path)
+    tree, table = build(*sources)
+    words = tree.search("ك-ت-ب").derived
+    # "b" is seen first but reaches a count of 2 after "a" does.
+    for word in ["b", "a", "a", "b", "c"]:
+        words.add(word)
+    long_word = "ك" * 40000  # 80000 bytes of UTF-8
+    words.add(long_word)
+    assert words.top_k(4) == [("a", 2), ("b", 2), ("c", 1), (long_word, 1)]
+
+    path = str(tmp_path / "engine.snap")
+    save_snapshot(path, tree, table, TextBase.read(*sources))
+    tree2, table2 = AVLRootTree(), PatternHashTable()
+    assert load_snapshot(path, tree2, table2, sources)
+    restored = tree2.search("ك-ت-ب").derived
+    assert restored.top_k(4) == words.top_k(4)
+    assert restored.to_items() == words.to_items()
+    assert DerivedWordList.from_items(words.to_items(), words.bucket_order()).top_k(4) == words.top_k(4)
@@ -0,0 +1,90 @@
+import pytest
+
+from Data_Structures.hash_table import PatternTableListener, make_pattern_table
+from Data_Structures.normalization import BulkInsertError
+from Data_Structures.root_tree import AVLRootTree, RootTreeListener
+
+
+class Recorder(RootTreeListener, PatternTableListener):
+    def __init__(self):
+        self.calls = []
+
+    def on_roots_inserted(self, compacts):
+        self.calls.append(list(compacts))
+
+    def on_patterns_inserted(self, entries):
+        self.calls.append([p for p, _ in entries])
+
+
+# ============================================================================
+# TEST 1: Roots
+# ============================================================================
+
+def test_root_insert_many_is_all_or_nothing():
+    tree = AVLRootTree()
+    tree.insert("ك-ت-ب")
+    recorder = Recorder()
+    tree.add_listener(recorder)
+    version = tree.version()
+
+    with pytest.raises(BulkInsertError) as exc:
+        tree.insert_many(["د-ر-س", "ك-ت-ب", "abc", "د-ر-س", "ح-م-د"])
+    assert [(i, msg) for i, _, msg in exc.value.errors] == [
+        (1, "Root already exists."),
+        (2, "Only Arabic letters are allowed."),
+        (3, "Duplicate of item 0."),
+    ]
+    assert tree.size() == 1 and tree.version() == version and recorder.calls == []
+
+    assert tree.insert_many(["ح-م-د", "د-ر-س", "أ-ك-ل"]) == ["اكل", "حمد", "درس"]
+    assert tree.list_roots(dashed=False) == ["اكل", "حمد", "درس", "كتب"]
+    assert tree.search("ك-ت-ب") is not None
+    assert recorder.calls == [["اكل", "حمد", "درس"]]
+    assert tree.version() == version + 1
+    assert tree.height() == 3
+
+
+def test_small_batches_skip_the_rebuild(monkeypatch):
+    tree = AVLRootTree()
+    tree.load_roots_from_file("Data/roots.txt")
+    size = tree.size()
+    rebuilds = []
+    build = tree._build_balanced
+    monkeypatch.setattr(tree, "_build_balanced", lambda *args: rebuilds.append(1) or build(*args))
+
+    # A batch small next to the tree goes in root by root, still AVL.
+    small = ["ظ-ظ-ب", "ظ-ظ-ت", "ظ-ظ-ث"]
+    assert tree.insert_many(small) == ["ظظب", "ظظت", "ظظث"]
+    assert rebuilds == [] and tree.size() == size + 3
+    assert tree.list_roots(dashed=False) == sorted(tree.list_roots(dashed=False))
+    assert tree.height() <= 1.45 * (tree.size() + 2).bit_length()
+
+    # One as large as the tree is merged and rebuilt.
+    large = [f"ظ-{a}-{b}" for a in "بتثجحخدذرز" for b in "سشصضطظعفقك"]
+    assert len(tree.insert_many(large)) == 100 and rebuilds
+    assert all(tree.search(root) is not None for root in small + large)
+
+
+# ============================================================================
+# TEST 2: Patterns
+# ============================================================================
+
+def test_pattern_insert_many_is_all_or_nothing():
+    for layout in ("chained", "open_addressing"):
+        table = make_pattern_table(layout)
+        table.insert("فاعل")
+        recorder = Recorder()
+        table.add_listener(recorder)
+
+        with pytest.raises(BulkInsertError) as exc:
+            table.insert_many(["مفعول", "فاعل", "فعل", ("تفعيل", "xx"), "مفعول"])
+        assert [i for i, _, _ in exc.value.errors] == [1, 2, 3, 4]
+        assert table.size() == 1 and recorder.calls == []
+
+        patterns = [f"م{a}فع{b}ول" for a in "اتن" for b in "اين"] + [("مفعال", "مفعول")]
+        capacity = table.capacity()
+        assert table.insert_many(patterns) == 10
+        assert table.size() == 11
+        assert table.derive_compact("كتب", "مفعال") == "مكتوب"
+        assert len(recorder.calls) == 1 and len(recorder.calls[0]) == 10
+        assert table.capacity() >= capacity and not table.is_rehashing()
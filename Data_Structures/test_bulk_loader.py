@@ -0,0 +1,96 @@
+from Data_Structures.bulk_loader import load_patterns, load_roots, read_chunks
+from Data_Structures.hash_table import PatternHashTable, PatternTableListener
+from Data_Structures.root_tree import AVLRootTree
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+class BatchRecorder(PatternTableListener):
+    def __init__(self):
+        self.batches = []
+
+    def on_patterns_inserted(self, entries):
+        self.batches.append(len(entries))
+
+
+def write_lines(path, lines):
+    with open(path, "wb") as f:
+        f.write(b"".join(line.encode("utf-8") if isinstance(line, str) else line for line in lines))
+
+
+# ============================================================================
+# TEST 1: Roots: chunked (in-process or pooled) matches bulk_load
+# ============================================================================
+
+def test_load_roots_report(tmp_path):
+    path = str(tmp_path / "roots.txt")
+    with open(ROOTS_PATH, encoding="utf-8") as f:
+        valid = [line.strip() for line in f if line.strip()]
+    extra = ["ك-ت-ب\n", "\n", "كتب\n", "ك-ت-ب-ب\r\n", b"\xff\xfe-\x00\n", "غ-ف-ر\r\n", "غ-ف-ر"]
+    write_lines(path, [root + "\n" for root in valid] + extra)
+    first_extra = len(valid) + 1
+    expected_rejects = [
+        (first_extra + 2, "كتب", "Root must contain exactly two dashes (example: ك-ت-ب)."),
+        (first_extra + 3, "ك-ت-ب-ب", "Root must have exactly 3 letters."),
+        (first_extra + 4, "��-\x00", "Invalid UTF-8."),
+    ]
+
+    # load_roots_from_file would stop at the undecodable line.
+    reference = AVLRootTree()
+    reference.bulk_load(valid + ["غ-ف-ر"])
+    # Tiny chunks: many chunks, line numbers carried across them.
+    assert len(list(read_chunks(path, 32))) > 10
+    for workers in (1, 2):
+        tree = AVLRootTree()
+        report = load_roots(tree, path, workers=workers, chunk_bytes=32)
+        assert report.accepted == reference.size() == len(valid) + 1
+        assert report.duplicates == 2
+        assert report.rejected == expected_rejects
+        assert list(tree.inorder()) == list(reference.inorder())
+
+    # Roots already loaded count as duplicates; rejects go to the sidecar.
+    sidecar = str(tmp_path / "rejects.tsv")
+    report = load_roots(tree, path, rejects_path=sidecar)
+    assert report.accepted == 0 and report.duplicates == len(valid) + 3
+    with open(sidecar, encoding="utf-8") as f:
+        assert f.readline() == f"{first_extra + 2}\tRoot must contain exactly two dashes (example: ك-ت-ب).\tكتب\n"
+        assert len(f.readlines()) == 2
+    assert report.as_dict()["rejected"][1] == {
+        "line": first_extra + 3, "text": "ك-ت-ب-ب", "reason": "Root must have exactly 3 letters.",
+    }
+
+
+# ============================================================================
+# TEST 2: Patterns: reasons, dedupe after normalization, one batch insert
+# ============================================================================
+
+def test_load_patterns_report(tmp_path):
+    path = str(tmp_path / "patterns.txt")
+    with open(PATTERNS_PATH, encoding="utf-8") as f:
+        valid = [line.strip() for line in f if line.strip()]
+    write_lines(path, [p + "\n" for p in valid] + ["فَاعِل\n", "فعل\n", "فاعل1\n", "مكتوب\n", "فاعل\n"])
+
+    reference = PatternHashTable()
+    reference.load_patterns_from_file(path)
+    table = PatternHashTable()
+    recorder = BatchRecorder()
+    table.add_listener(recorder)
+    report = load_patterns(table, path, workers=2, chunk_bytes=32)
+
+    assert report.accepted == len(valid) == table.size()
+    assert sorted(table.iter_templates()) == sorted(reference.iter_templates())
+    assert recorder.batches == [len(valid)]
+    assert report.duplicates == 2  # فَاعِل normalizes to فاعل
+    n = len(valid)
+    assert report.rejected == [
+        (n + 2, "فعل", "Pattern must have at least 4 letters."),
+        (n + 3, "فاعل1", "Only Arabic letters are allowed."),
+        (n + 4, "مكتوب", "Pattern must contain ف, ع and ل."),
+    ]
+    assert table.derive("ك-ت-ب", "مفعول") == "مكتوب"
+
+    # An empty file loads nothing.
+    empty = str(tmp_path / "empty.txt")
+    write_lines(empty, [])
+    assert load_patterns(PatternHashTable(), empty).as_dict() == {"accepted": 0, "duplicates": 0, "rejected": []}
@@ -0,0 +1,211 @@
+import itertools
+import sys
+import threading
+import time
+
+import pytest
+
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Data_Structures.word_index import DerivedWordIndex
+from Engine.concurrency import ConcurrentEngine, ReadWriteLock
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+THREADS = 8
+ROUNDS = 150
+
+
+def build(**kwargs):
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table.load_patterns_from_file(PATTERNS_PATH)
+    index = DerivedWordIndex(tree, table)
+    return ConcurrentEngine(tree, table, index, **kwargs)
+
+
+def run_threads(target, count=THREADS):
+    errors = []
+
+    def wrapped(n):
+        try:
+            target(n)
+        except BaseException as exc:  # surfaced in the main thread
+            errors.append(exc)
+
+    threads = [threading.Thread(target=wrapped, args=(n,)) for n in range(count)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # switch threads often to shake out races
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors, errors
+
+
+# ============================================================================
+# TEST 1: Read/write lock
+# ============================================================================
+
+def test_rw_lock_excludes_writers():
+    lock = ReadWriteLock()
+    state = {"readers": 0, "writing": False, "max_readers": 0}
+    guard = threading.Lock()
+
+    def worker(n):
+        for i in range(300):
+            if (n + i) % 10 == 0:
+                with lock.write():
+                    assert state["readers"] == 0 and not state["writing"]
+                    state["writing"] = True
+                    state["writing"] = False
+            else:
+                with lock.read():
+                    with guard:
+                        assert not state["writing"]
+                        state["readers"] += 1
+                        state["max_readers"] = max(state["max_readers"], state["readers"])
+                    with guard:
+                        state["readers"] -= 1
+
+    run_threads(worker)
+    assert state["readers"] == 0
+
+
+# ============================================================================
+# TEST 2: Stress: generation, validation and mutations from many threads
+# ============================================================================
+
+def test_counts_survive_concurrent_traffic():
+    engine = build(stripes=4, flush_every=16)
+    tree, table = engine.root_tree, engine.pattern_table
+    # The writers toggle X-Y-ي roots; keep the working set clear of those.
+    roots = [r for r in tree.list_roots() if not r.endswith("ي")][:20]
+    patterns = list(table.iter_patterns())
+    recorded = itertools.count()  # itertools.count is atomic under the GIL
+    letters = "بتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+    def worker(n):
+        for i in range(ROUNDS):
+            root = roots[(n * 7 + i) % len(roots)]
+            op = i % 6
+            if op == 0:
+                with engine.writing():
+                    extra = f"{letters[n]}-{letters[i % 28]}-ي"
+                    if tree.search(extra) is None:
+                        tree.insert(extra)
+                    else:
+                        tree.delete(extra)
+            elif op == 1:
+                with engine.reading():
+                    results = engine.generator.generate_family(root)
+                for _ in results:
+                    next(recorded)
+            elif op == 2:
+                with engine.reading():
+                    res = engine.generator.generate_one(root, patterns[i % len(patterns)])
+                assert res["ok"]
+                next(recorded)
+            elif op == 3:
+                with engine.reading():
+                    word = engine.generator.derive_compact(tree.search(root).root, "مفعول")
+                    res = engine.validator.validate(root, word)
+                assert res == {"result": "OUI", "pattern": "مفعول"}
+                next(recorded)
+            elif op == 4:
+                with engine.reading():
+                    assert engine.validator.analyze("مكتوب")
+                listed = list(engine.iter_roots(chunk=50))  # takes the lock per chunk
+                assert listed == sorted(set(listed)) and len(listed) >= len(roots)
+            else:
+                stats = engine.stats()
+                assert stats["derived_words"] <= stats["total_frequency"]
+
+    run_threads(worker)
+
+    engine.recorder.flush()
+    assert engine.recorder.pending() == 0
+    expected = next(recorded)
+    nodes = list(tree._iter_nodes())
+    assert tree.total_frequency() == sum(n.derived.total_count() for n in nodes) == expected
+    assert tree.count_total_derivatives() == sum(len(n.derived) for n in nodes)
+
+
+# ============================================================================
+# TEST 3: Flask endpoints under threads
+# ============================================================================
+
+def test_endpoints_under_threads():
+    pytest.importorskip("flask")
+    import server
+
+    client_roots = server.root_tree.list_roots()[:10]
+
+    def worker(n):
+        client = server.app.test_client()
+        for i in range(40):
+            root = client_roots[(n + i) % len(client_roots)]
+            assert client.post("/generate", json={"root": root, "pattern": "مفعول"}).json["ok"]
+            assert client.post("/generate_family", json={"root": root}).status_code == 200
+            assert client.post("/validate", json={"root": root, "word": "x"}).json["result"] == "NON"
+            body = [{"root": root, "pattern": "فاعل"}, {"bad": 1}]
+            assert client.post("/generate_batch", json=body).status_code == 200
+            assert client.get("/api/roots?limit=5").status_code == 200
+            assert client.get("/api/stats").status_code == 200
+            if i % 10 == 0:
+                extra = f"ي-{'بتثجحخدذ'[n]}-{'بتثجحخدذ'[i // 10]}"
+                client.post("/add_root", json={"root": extra})
+
+    run_threads(worker)
+
+
+# ============================================================================
+# TEST 4: The timed flush merges a quiet recorder
+# ============================================================================
+
+def test_flusher_merges_quiet_stripes():
+    engine = build(snapshots=True, flush_every=1000)
+    tree = engine.root_tree
+    with engine.view() as view:
+        view.generator.generate_one("ك-ت-ب", "مفعول")
+    assert engine.recorder.pending() == 1 and tree.total_frequency() == 0
+
+    engine.start_flusher(0.02)
+    try:
+        deadline = time.monotonic() + 5
+        while engine.recorder.pending() and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        engine.stop_flusher()
+    assert engine.recorder.pending() == 0
+    assert tree.search("ك-ت-ب").derived.top_k(1) == [("مكتوب", 1)]
+
+
+# ============================================================================
+# TEST 5: Snapshot views use the word index only while it matches them
+# ============================================================================
+
+def test_snapshot_views_probe_a_matching_index():
+    engine = build(snapshots=True)
+    index = engine.word_index
+    probes = []
+    find = index.find
+    index.find = lambda compact, word: probes.append(word) or find(compact, word)
+
+    with engine.view() as old:
+        assert old.validator.validate("ك-ت-ب", "مكتوب") == {"result": "OUI", "pattern": "مفعول"}
+    assert probes == ["مكتوب"]
+
+    with engine.writing():
+        engine.pattern_table.insert("تفاعيل", "تفعيلة")
+    # The old snapshot has no such pattern, but the index already does.
+    assert old.validator.validate("ك-ت-ب", "تكتيبة") == {"result": "NON", "pattern": None}
+    assert probes == ["مكتوب"]
+
+    with engine.view() as new:
+        assert new.validator.validate("ك-ت-ب", "تكتيبة") == {"result": "OUI", "pattern": "تفاعيل"}
+    assert probes == ["مكتوب", "تكتيبة"]
@@ -0,0 +1,158 @@
+import itertools
+
+from Data_Structures.hash_table import (
+    OpenAddressingPatternTable,
+    PatternHashTable,
+    PatternTable,
+    make_pattern_table,
+)
+
+PATTERNS_PATH = "Data/patterns.txt"
+AFFIXES = ["", "ا", "م", "ت", "ن", "ي", "و", "س", "ه", "ست", "مت", "ان"]
+
+
+def synthetic_patterns(count: int):
+    combos = itertools.product(AFFIXES, AFFIXES, AFFIXES, AFFIXES)
+    patterns = []
+    for pre, mid1, mid2, post in combos:
+        p = f"{pre}ف{mid1}ع{mid2}ل{post}"
+        if len(p) >= 4:
+            patterns.append(p)
+        if len(patterns) == count:
+            break
+    return patterns
+
+
+# ============================================================================
+# TEST 1: Growth keeps chains short
+# ============================================================================
+
+def test_grows_with_load_factor():
+    table = PatternHashTable()
+    patterns = synthetic_patterns(3000)
+    max_seen_old = 0
+    for p in patterns:
+        table.insert(p)
+        if table.is_rehashing():
+            max_seen_old = max(max_seen_old, len(table._old_buckets))
+        assert table.load_factor() <= 1.0
+
+    assert table.size() == 3000
+    assert table.capacity() > 3000 / 0.75 / 2
+    assert max_seen_old > 0
+    for p in patterns:
+        assert table.contains(p)
+        assert table.get_rule(p) == p
+    assert sorted(table.iter_patterns()) == sorted(patterns)
+
+
+def test_lookups_during_incremental_rehash():
+    table = PatternHashTable(capacity=7)
+    patterns = synthetic_patterns(200)
+    for i, p in enumerate(patterns):
+        table.insert(p)
+        if table.is_rehashing():
+            for q in patterns[: i + 1]:
+                assert table.contains(q)
+            assert len(list(table.iter_patterns())) == i + 1
+
+
+# ============================================================================
+# TEST 2: Shrinking
+# ============================================================================
+
+def test_shrinks_back_to_min_capacity():
+    table = PatternHashTable()
+    patterns = synthetic_patterns(1000)
+    for p in patterns:
+        table.insert(p)
+    grown = table.capacity()
+
+    for p in patterns[:995]:
+        table.remove(p)
+    for _ in range(20):
+        table.update(patterns[-1], patterns[-1])
+
+    assert table.capacity() < grown
+    assert table.capacity() >= 37
+    assert table.size() == 5
+    assert sorted(table.iter_patterns()) == sorted(patterns[995:])
+    # Resizes are not content changes: one version per mutation.
+    assert table.version() == 1000 + 995 + 20
+
+
+# ============================================================================
+# TEST 3: Pre-sizing
+# ============================================================================
+
+def test_expected_size_and_reserve():
+    table = PatternHashTable(expected_size=5000)
+    start = table.capacity()
+    for p in synthetic_patterns(5000):
+        table.insert(p)
+    assert table.capacity() == start
+
+    loaded = PatternHashTable()
+    count = loaded.load_patterns_from_file(PATTERNS_PATH)
+    assert count == loaded.size()
+    assert not loaded.is_rehashing()
+    assert loaded.load_factor() <= 0.75
+
+
+def test_rejects_bad_load_factors():
+    for kwargs in ({"capacity": 0}, {"max_load_factor": 0.1, "min_load_factor": 0.2}):
+        try:
+            PatternHashTable(**kwargs)
+        except ValueError:
+            continue
+        assert False, kwargs
+
+
+# ============================================================================
+# TEST 4: Open addressing layout
+# ============================================================================
+
+def test_open_addressing_matches_chained():
+    chained = make_pattern_table("chained")
+    flat = make_pattern_table("open_addressing")
+    assert isinstance(flat, OpenAddressingPatternTable)
+    assert flat.capacity() & (flat.capacity() - 1) == 0
+
+    patterns = synthetic_patterns(2000)
+    for table in (chained, flat):
+        for p in patterns:
+            table.insert(p)
+        for p in patterns[::3]:
+            table.remove(p)
+        for p in patterns[1::3]:
+            table.update(p, "مفعول")
+
+    assert flat.size() == chained.size()
+    assert sorted(flat.iter_patterns()) == sorted(chained.iter_patterns())
+    for p in patterns:
+        assert flat.contains(p) == chained.contains(p)
+        assert flat.get_rule(p) == chained.get_rule(p)
+    assert flat.derive("ك-ت-ب", patterns[1]) == "مكتوب"
+
+
+def test_open_addressing_tombstones_are_reused():
+    table = OpenAddressingPatternTable(capacity=64)
+    patterns = synthetic_patterns(20)
+    for _ in range(50):
+        for p in patterns:
+            table.insert(p)
+        for p in patterns:
+            table.remove(p)
+        assert table.size() == 0
+    assert table.capacity() == 64
+    assert table._tombstones <= table.capacity()
+
+    # Both layouts share the API, not the chained storage.
+    assert isinstance(table, PatternTable) and not isinstance(table, PatternHashTable)
+    assert not hasattr(table, "_find_node") and not hasattr(table, "_buckets")
+
+    try:
+        make_pattern_table("btree")
+    except ValueError:
+        return
+    assert False
@@ -0,0 +1,150 @@
+import shutil
+import time
+
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Data_Structures.word_index import DerivedWordIndex
+from Engine.concurrency import ConcurrentEngine
+from Engine.hot_reload import DataReloader
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def engine_over_copies(tmp_path):
+    roots = str(tmp_path / "roots.txt")
+    patterns = str(tmp_path / "patterns.txt")
+    shutil.copy(ROOTS_PATH, roots)
+    shutil.copy(PATTERNS_PATH, patterns)
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(roots)
+    table.load_patterns_from_file(patterns)
+    engine = ConcurrentEngine(tree, table, DerivedWordIndex(tree, table), snapshots=True)
+    return engine, roots, patterns
+
+
+def rewrite(path, drop=(), add=()):
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and line.strip() not in drop]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines + list(add)) + "\n")
+
+
+# ============================================================================
+# TEST 1: delete_many rebuilds once and keeps the other roots' words
+# ============================================================================
+
+def test_delete_many_keeps_remaining_counts():
+    tree = AVLRootTree()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table = PatternHashTable()
+    table.load_patterns_from_file(PATTERNS_PATH)
+    index = DerivedWordIndex(tree, table)
+    size, version = tree.size(), tree.version()
+    kept = tree.search("ك-ت-ب")
+    for word in ["كاتب", "كاتب", "مكتوب"]:
+        tree.record_derived(kept, word, "فاعل")
+    tree.record_derived(tree.search("ح-م-د"), "حامد", "فاعل")
+
+    assert tree.delete_many(["ح-م-د", "ض-ر-ب", "ح-م-د", "غ-ف-ر", "bad"]) == ["حمد", "ضرب"]
+    assert tree.size() == size - 2 and tree.version() == version + 1
+    assert tree.search("ح-م-د") is None and tree.search("ض-ر-ب") is None
+    assert tree.search("ك-ت-ب") is kept and kept.derived.top_k(1) == [("كاتب", 2)]
+    assert tree.count_total_derivatives() == 2 and tree.total_frequency() == 3
+    assert tree.changes_since(version) == ([], ["حمد", "ضرب"])
+    assert index.lookup("ضارب") == []
+    assert tree.delete_many(["ح-م-د"]) == [] and tree.version() == version + 1
+
+
+# ============================================================================
+# TEST 2: A reload applies only the files' edits, in one published snapshot
+# ============================================================================
+
+def test_reload_applies_diff(tmp_path):
+    engine, roots, patterns = engine_over_copies(tmp_path)
+    tree = engine.root_tree
+    reloader = DataReloader(engine, roots, patterns)
+    assert reloader.check() is None
+
+    with engine.view() as view:
+        view.generator.generate_one("ك-ت-ب", "مفعول")
+    kept = tree.search("ك-ت-ب")
+    before = engine.publisher.current()
+
+    rewrite(roots, drop={"ض-ر-ب", "ح-م-د"}, add=["غ-ف-ر"])
+    rewrite(patterns, drop={"فاعل"}, add=["مفعولة"])
+    assert reloader.check() == {
+        "roots_added": 1, "roots_removed": 2, "patterns_added": 1, "patterns_removed": 1,
+    }
+
+    # Untouched roots keep their nodes and counts.
+    assert tree.search("ك-ت-ب") is kept
+    assert engine.read_frequencies(lambda: kept.derived.top_k(1)) == [("مكتوب", 1)]
+
+    # Old views are unchanged; the next one has every change at once.
+    assert before.roots.search("ض-ر-ب") is not None and before.patterns.contains("فاعل")
+    assert before.roots.version() + 2 == engine.publisher.current().roots.version()
+    with engine.view() as view:
+        assert view.roots.search("ض-ر-ب") is None and view.roots.search("غ-ف-ر") is not None
+        assert not view.patterns.contains("فاعل")
+        assert view.generator.generate_one("غ-ف-ر", "مفعولة")["word"] == "مغفورة"
+        assert view.validator.validate("ض-ر-ب", "ضارب")["result"] == "NON"
+
+    # Nothing changed since: no mutation at all.
+    version = tree.version()
+    assert reloader.reload() == dict.fromkeys(
+        ["roots_added", "roots_removed", "patterns_added", "patterns_removed"], 0
+    )
+    assert tree.version() == version
+
+
+
+def test_reload_keeps_runtime_changes(tmp_path):
+    engine, roots, patterns = engine_over_copies(tmp_path)
+    tree, table = engine.root_tree, engine.pattern_table
+    reloader = DataReloader(engine, roots, patterns)
+    with engine.writing():
+        tree.insert("ظ-ظ-ب")
+        tree.delete("ك-ت-ب")
+        table.insert("مفعولة")
+
+    rewrite(roots, drop={"ض-ر-ب"}, add=["غ-ف-ر"])
+    assert reloader.reload() == {
+        "roots_added": 1, "roots_removed": 1, "patterns_added": 0, "patterns_removed": 0,
+    }
+    # Neither the runtime addition nor the runtime removal is undone.
+    assert tree.search("ظ-ظ-ب") is not None and tree.search("ك-ت-ب") is None
+    assert table.contains("مفعولة")
+    assert tree.search("غ-ف-ر") is not None and tree.search("ض-ر-ب") is None
+
+    # Edits that do touch those roots apply, each diffed from the previous read.
+    rewrite(roots, drop={"ك-ت-ب"}, add=["ظ-ظ-ب"])
+    assert reloader.reload() == dict.fromkeys(
+        ["roots_added", "roots_removed", "patterns_added", "patterns_removed"], 0
+    )
+    rewrite(roots, drop={"ظ-ظ-ب"}, add=["ك-ت-ب"])
+    assert reloader.reload() == {
+        "roots_added": 1, "roots_removed": 1, "patterns_added": 0, "patterns_removed": 0,
+    }
+    assert tree.search("ظ-ظ-ب") is None and tree.search("ك-ت-ب") is not None
+
+
+# ============================================================================
+# TEST 3: The watcher picks up an edit in the background
+# ============================================================================
+
+def test_watcher_polls_files(tmp_path):
+    engine, roots, patterns = engine_over_copies(tmp_path)
+    reloader = DataReloader(engine, roots, patterns)
+    reloader.start(0.02)
+    try:
+        rewrite(roots, add=["غ-ف-ر"])
+        deadline = time.monotonic() + 5
+        while engine.root_tree.search("غ-ف-ر") is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        reloader.stop()
+    assert engine.root_tree.search("غ-ف-ر") is not None
+    with engine.view() as view:
+        assert view.roots.search("غ-ف-ر") is not None
@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+
+from Data_Structures.linked_list import DerivedWordList
+
+
+# ============================================================================
+# TEST 1: Same behaviour as the plain linked list
+# ============================================================================
+
+def test_add_contains_and_order():
+    words = DerivedWordList()
+    assert words.add("كاتب")
+    assert words.add("مكتوب")
+    assert not words.add("كاتب")
+
+    assert len(words) == 2
+    assert words.contains("مكتوب") and not words.contains("كتاب")
+    assert words.to_list() == ["مكتوب", "كاتب"]
+    assert words.to_items() == [("مكتوب", 1), ("كاتب", 2)]
+    assert words.count("كاتب") == 2 and words.count("كتاب") == 0
+    assert words.total_count() == 3
+
+
+# ============================================================================
+# TEST 2: top_k against a full sort
+# ============================================================================
+
+def test_top_k_matches_sorted_counts():
+    random.seed(21)
+    vocabulary = [f"w{i}" for i in range(200)]
+    words = DerivedWordList()
+    reference = Counter()
+    for _ in range(5000):
+        w = random.choice(vocabulary[: random.randint(1, 200)])
+        words.add(w)
+        reference[w] += 1
+
+        top = words.top_k(10)
+        counts = [c for _, c in top]
+        assert counts == sorted(reference.values(), reverse=True)[:10]
+        assert all(reference[w] == c for w, c in top)
+
+    assert words.top_k(0) == []
+    assert len(words.top_k(1000)) == len(reference)
+    assert words.total_count() == 5000
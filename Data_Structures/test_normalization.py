@@ -0,0 +1,122 @@
+import itertools
+import random
+
+from Data_Structures.normalization import (
+    ALEF_VARIANTS,
+    DIACRITICS,
+    DIACRITICS_NO_SHADDA,
+    ParsedRoot,
+    TATWEEL,
+    clear_normalization_caches,
+    normalization_cache_info,
+    normalize_common,
+    normalize_pattern,
+    normalize_root,
+    parse_root,
+)
+
+
+# Reference: the original replace / generator-join implementation.
+def legacy_base(text):
+    if not text:
+        return ""
+    text = text.replace(" ", "").replace("\t", "").replace("\n", "")
+    text = text.replace(TATWEEL, "")
+    return "".join(ALEF_VARIANTS.get(ch, ch) for ch in text)
+
+
+def legacy_common(text):
+    return "".join(ch for ch in legacy_base(text) if ch not in DIACRITICS)
+
+
+def legacy_root(text):
+    return "".join(ch for ch in legacy_common(text) if ch != "-")
+
+
+def legacy_pattern(text):
+    return "".join(ch for ch in legacy_base(text) if ch not in DIACRITICS_NO_SHADDA)
+
+
+# ============================================================================
+# TEST 1: Same output as the original implementation
+# ============================================================================
+
+def test_translate_matches_legacy():
+    alphabet = (
+        [chr(c) for c in range(0x0620, 0x0672)]
+        + list(ALEF_VARIANTS) + [" ", "\t", "\n", "\r", "-", "a", "1", TATWEEL]
+    )
+    random.seed(3)
+    samples = ["", "ك-ت-ب", "فَعّال", " أَكْتُبُ\t", "ـكـتـب"]
+    samples += ["".join(random.choices(alphabet, k=random.randint(1, 12))) for _ in range(3000)]
+    samples += ["".join(p) for p in itertools.product(alphabet[:6] + [" ", "-"], repeat=2)]
+
+    for text in samples:
+        assert normalize_common(text) == legacy_common(text)
+        assert normalize_root(text) == legacy_root(text)
+        assert normalize_pattern(text) == legacy_pattern(text)
+    assert normalize_common(None) == ""
+
+
+# ============================================================================
+# TEST 2: Cache counters
+# ============================================================================
+
+def test_cache_hit_and_miss_counters():
+    clear_normalization_caches()
+    for _ in range(5):
+        normalize_common("كِتَاب")
+    normalize_root("ك-ت-ب")
+
+    info = normalization_cache_info()
+    assert info["normalize_common"]["misses"] == 1
+    assert info["normalize_common"]["hits"] == 4
+    assert info["normalize_root"]["size"] == 1
+    assert info["normalize_pattern"]["size"] == 0
+    assert info["normalize_common"]["max_size"] > 0
+
+
+# ============================================================================
+# TEST 3: Parse-once roots
+# ============================================================================
+
+def test_parse_root_reasons_and_pass_through():
+    parsed = parse_root("أ-كَ-ل")
+    assert parsed == ParsedRoot("أ-كَ-ل", "اكل")
+    assert parsed.ok and parsed.dashed == "ا-ك-ل"
+    assert parse_root(parsed) is parsed
+    assert hash(parsed) == hash(parse_root("أ-كَ-ل"))
+
+    reasons = {
+        "": "Root must contain letters.",
+        None: "Root must contain letters.",
+        "a-b-c": "Only Arabic letters are allowed.",
+        "ك-ت": "Root must have exactly 3 letters.",
+        "كتب": "Root must contain exactly two dashes (example: ك-ت-ب).",
+    }
+    for raw, reason in reasons.items():
+        result = parse_root(raw)
+        assert result.error == reason and not result.ok and result.compact == ""
+
+
+def test_parsed_root_accepted_everywhere():
+    from Data_Structures.hash_table import PatternHashTable
+    from Data_Structures.root_tree import AVLRootTree
+    from Engine.generator import MorphologicalGenerator
+    from Engine.validator import MorphologicalValidator
+
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    table.insert("فاعل")
+    gen = MorphologicalGenerator(tree, table)
+    val = MorphologicalValidator(gen, tree, table)
+
+    root = parse_root("ك-ت-ب")
+    assert tree.insert(root).root == "كتب"
+    assert tree.search(root) is tree.search("ك-ت-ب")
+    assert table.derive(root, "فاعل") == "كاتب"
+    assert gen.generate_one(root, "فاعل")["root"] == "ك-ت-ب"
+    assert gen.generate_family(root)[0]["word"] == "كاتب"
+    assert val.validate(root, "كاتب")["result"] == "OUI"
+    assert tree.delete(root)
+    assert gen.generate_one(root, "فاعل")["error"] == "ROOT_NOT_FOUND"
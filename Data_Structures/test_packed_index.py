@@ -0,0 +1,78 @@
+import random
+
+from Data_Structures.root_tree import (
+    ALPHABET_SIZE,
+    AVLRootTree,
+    PACKED_ROOT_SLOTS,
+    RootBST,
+    format_dashed,
+    pack_root,
+    unpack_root,
+)
+
+LETTERS = [chr(c) for c in range(0x0621, 0x064B)]
+# Letters that survive normalization unchanged (no Alef variants, no tatweel).
+ROOT_LETTERS = [ch for ch in LETTERS if ch not in "أإآـ"]
+
+
+# ============================================================================
+# TEST 1: Packing helpers
+# ============================================================================
+
+def test_pack_unpack_round_trip():
+    assert len(LETTERS) == ALPHABET_SIZE
+    assert pack_root(LETTERS[0] * 3) == 0
+    assert pack_root(LETTERS[-1] * 3) == PACKED_ROOT_SLOTS - 1
+
+    random.seed(5)
+    for _ in range(2000):
+        compact = "".join(random.choices(LETTERS, k=3))
+        code = pack_root(compact)
+        assert unpack_root(code) == compact
+        assert format_dashed(code) == format_dashed(compact)
+
+    for bad in ["كت", "abc", "كتبا"]:
+        try:
+            pack_root(bad)
+        except ValueError:
+            continue
+        assert False, bad
+    try:
+        unpack_root(PACKED_ROOT_SLOTS)
+    except ValueError:
+        return
+    assert False
+
+
+# ============================================================================
+# TEST 2: Index stays in sync with the tree
+# ============================================================================
+
+def tree_walk(tree, compact):
+    current = tree.root
+    while current:
+        if compact == current.root:
+            return current
+        current = current.left if compact < current.root else current.right
+    return None
+
+
+def test_index_matches_tree_walk():
+    random.seed(9)
+    roots = {"-".join(random.choices(ROOT_LETTERS, k=3)) for _ in range(800)}
+    roots = sorted(roots)
+    for tree in (RootBST(), AVLRootTree()):
+        tree.bulk_load(roots[:300])
+        for r in roots[300:]:
+            tree.insert(r)
+        for r in random.sample(roots, 400):
+            tree.delete(r)
+
+        for r in roots:
+            compact = r.replace("-", "")
+            node = tree.search(r)
+            assert node is tree_walk(tree, compact)
+            assert tree.contains_packed(pack_root(compact)) == (node is not None)
+            if node is not None:
+                assert node.root == compact
+        assert tree.search_compact("xyz") is None
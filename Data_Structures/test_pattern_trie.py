@@ -0,0 +1,63 @@
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.pattern_trie import PatternTrie
+from Data_Structures.root_tree import AVLRootTree
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def build():
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table.load_patterns_from_file(PATTERNS_PATH)
+    gen = MorphologicalGenerator(tree, table)
+    return tree, table, gen, MorphologicalValidator(gen, tree, table)
+
+
+# ============================================================================
+# TEST 1: Root-less analysis
+# ============================================================================
+
+def test_analyze_finds_every_generated_word():
+    tree, table, gen, val = build()
+    for root in tree.list_roots()[:15]:
+        for res in gen.generate_family(root):
+            hits = val.analyze(res["word"])
+            assert {"root": root, "pattern": res["pattern"]} in hits
+            for hit in hits:
+                assert val.validate(hit["root"], res["word"])["result"] == "OUI"
+
+
+def test_analyze_rejects_unknown_roots_and_shapes():
+    tree, table, gen, val = build()
+    assert val.analyze("مكتوب") == [{"root": "ك-ت-ب", "pattern": "مفعول"}]
+    assert val.analyze("مزززوب") == []
+    assert val.analyze("كتب") == []
+    assert val.analyze("") == []
+
+
+# ============================================================================
+# TEST 2: Trie maintenance
+# ============================================================================
+
+def test_trie_follows_pattern_mutations():
+    table = PatternHashTable()
+    table.insert("فاعل")
+    trie = PatternTrie(table)
+    assert list(trie.match("كاتب")) == [("فاعل", "كتب")]
+
+    table.insert("تفاعيل")
+    assert list(trie.match("تكاتيب")) == [("تفاعيل", "كتب")]
+    table.update("تفاعيل", "تفعيل")
+    assert list(trie.match("تكاتيب")) == []
+    assert list(trie.match("تكتيب")) == [("تفاعيل", "كتب")]
+    table.remove("تفاعيل")
+    assert list(trie.match("تكتيب")) == []
+    assert len(trie) == 1
+
+    table.remove("فاعل")
+    assert len(trie) == 0
+    assert trie.lengths() == []
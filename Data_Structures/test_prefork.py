@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+
+import pytest
+
+from Data_Structures.root_tree import AVLRootTree
+from Engine.prefork import MutationJournal
+
+ROOTS_PATH = "Data/roots.txt"
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+
+# ============================================================================
+# TEST 1: A write in one process is replayed by the others
+# ============================================================================
+
+def test_journal_replays_across_processes(tmp_path):
+    tree = AVLRootTree()
+    tree.load_roots_from_file(ROOTS_PATH)
+    journal = MutationJournal(str(tmp_path / "mutations.log"), lambda op, args: tree.insert(*args).root)
+
+    worker = multiprocessing.get_context("fork").Process(target=journal.write, args=("add_root", ["غ-ف-ر"]))
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 0
+
+    assert journal.version() == 1
+    assert tree.search("غ-ف-ر") is None
+    assert journal.sync() == 1
+    assert tree.search("غ-ف-ر") is not None
+    assert journal.sync() == 0
+
+    # A rejected mutation publishes nothing.
+    with pytest.raises(ValueError):
+        journal.write("add_root", ["غ-ف-ر"])
+    assert journal.version() == 1
+
+    assert journal.write("add_root", ["ع-ل-م"]) == "علم"
+    assert journal.version() == 2
+    assert journal.sync() == 0
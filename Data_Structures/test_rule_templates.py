@@ -0,0 +1,52 @@
+from Data_Structures.hash_table import (
+    PatternHashTable,
+    compile_rule,
+    derive_from_normalized_pattern,
+    make_pattern_table,
+)
+from Data_Structures.normalization import normalize_root
+
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+# ============================================================================
+# TEST 1: Compilation
+# ============================================================================
+
+def test_compile_rule_segments_and_slots():
+    template = compile_rule("مفعول")
+    assert template.segments == ("م", "", "و", "")
+    assert template.slots == (0, 1, 2)
+    assert template.fill("كتب") == "مكتوب"
+
+    shadda = compile_rule("فعّال")
+    assert shadda.slots == (0, 1, 2)
+    assert shadda.fill("كتب") == "كتّاب"
+
+
+def test_templates_match_legacy_derivation():
+    table = PatternHashTable()
+    table.load_patterns_from_file(PATTERNS_PATH)
+    for root in ["ك-ت-ب", "د-ر-س", "ع-ل-م", "ق-ر-أ"]:
+        for pattern, template in table.iter_templates():
+            expected = derive_from_normalized_pattern(root, pattern)
+            assert table.derive(root, pattern) == expected
+            assert table.derive_compact(normalize_root(root), pattern) == expected
+            assert template.rule == table.get_rule(pattern)
+
+
+# ============================================================================
+# TEST 2: Templates follow updates
+# ============================================================================
+
+def test_update_recompiles_template():
+    for layout in ("chained", "open_addressing"):
+        table = make_pattern_table(layout)
+        table.insert("فاعل")
+        assert table.derive_compact("كتب", "فاعل") == "كاتب"
+
+        table.update("فاعل", "مفعول")
+        assert table.get_template("فاعل").rule == "مفعول"
+        assert table.derive_compact("كتب", "فاعل") == "مكتوب"
+        assert table.derive("ك-ت", "فاعل") is None
+        assert table.derive_compact("كتب", "مفعال") is None
@@ -0,0 +1,175 @@
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+import server  # noqa: E402  (needs Flask)
+
+from Engine.generator import MorphologicalGenerator  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def ndjson(response):
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def walk_pages(client, url, limit):
+    items, after = [], None
+    while True:
+        page = client.get(url, query_string={"limit": limit, **({"after": after} if after else {})}).json
+        items.extend(page["items"])
+        if page["next"] is None:
+            return items
+        after = page["next"]
+
+
+# ============================================================================
+# TEST 1: Cursor pagination, NDJSON listings and limit bounds
+# ============================================================================
+
+def test_listing_pages_and_ndjson(client):
+    roots = client.get("/api/roots").json
+    assert roots == sorted(roots, key=lambda r: r.replace("-", ""))
+    assert walk_pages(client, "/api/roots", 7) == roots
+    patterns = client.get("/api/patterns").json
+    assert walk_pages(client, "/api/patterns", 5) == sorted(patterns)
+
+    # A cursor that is not itself a root resumes at the next one.
+    between = roots[10] + "ا"
+    page = client.get("/api/roots", query_string={"limit": 2, "after": between}).json
+    assert page["items"] == roots[11:13]
+    assert client.get("/api/roots", query_string={"limit": 2, "after": roots[10]}).json["items"] == roots[11:13]
+
+    assert ndjson(client.get("/api/roots?format=ndjson&limit=5")) == roots[:5]
+    assert ndjson(client.get("/api/roots", query_string={"format": "ndjson", "after": roots[-3]})) == roots[-2:]
+    assert ndjson(client.get("/api/patterns?format=ndjson")) == sorted(patterns)
+
+    for url in ("/api/roots", "/api/patterns"):
+        for limit in ("0", "1001", "abc"):
+            response = client.get(url, query_string={"limit": limit})
+            assert response.status_code == 400 and response.json["status"] == "error"
+
+
+# ============================================================================
+# TEST 2: ETags, 304s and the ?since= delta
+# ============================================================================
+
+def test_etags_and_since(client):
+    first = client.get("/api/roots")
+    etag = first.headers["ETag"]
+    token = first.headers["X-Data-Version"]
+    again = client.get("/api/roots", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.get_data() == b""
+    assert client.get("/api/roots", query_string={"since": token}).json["added"] == []
+
+    assert client.post("/add_root", json={"root": "ظ-ظ-ب"}).json["status"] == "ok"
+    with server.engine.writing():
+        server.root_tree.delete("ظ-ظ-ب")
+    assert client.post("/add_root", json={"root": "ظ-ظ-ت"}).json["status"] == "ok"
+    assert client.post("/add_root", json={"root": "ظ-ظ-ث"}).json["status"] == "ok"
+    with server.engine.writing():
+        server.root_tree.delete("ظ-ظ-ث")
+
+    changed = client.get("/api/roots", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert "ظ-ظ-ت" in changed.json
+
+    delta = client.get("/api/roots", query_string={"since": token}).json
+    assert delta["added"] == ["ظ-ظ-ت"] and delta["removed"] == []
+    assert delta["version"] == changed.headers["X-Data-Version"]
+    later = client.get("/api/roots", query_string={"since": delta["version"]}).json
+    assert later["added"] == [] and later["removed"] == []
+
+    epoch = token.split(".")[0]
+    for since in ("bogus", f"{epoch}.999999999", f"{epoch}.-1", "0.1"):
+        response = client.get("/api/roots", query_string={"since": since})
+        assert response.status_code == 410 and response.json["status"] == "error"
+
+    # Patterns and families are tagged by the pattern set's version.
+    etag = client.get("/api/patterns").headers["ETag"]
+    assert client.get("/api/patterns", headers={"If-None-Match": etag}).status_code == 304
+    family = client.post("/generate_family", json={"root": "ك-ت-ب"})
+    family_etag = family.headers["ETag"]
+    cached = client.post("/generate_family", json={"root": "ك-ت-ب"}, headers={"If-None-Match": family_etag})
+    assert cached.status_code == 304
+    other = client.post("/generate_family", json={"root": "د-خ-ل"})
+    assert other.headers["ETag"] != family_etag
+    assert client.post("/add_pattern", json={"pattern": "مفتعلة"}).json["status"] == "ok"
+    assert client.get("/api/patterns", headers={"If-None-Match": etag}).status_code == 200
+    fresh = client.post("/generate_family", json={"root": "ك-ت-ب"}, headers={"If-None-Match": family_etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != family_etag
+
+
+# ============================================================================
+# TEST 3: Batch endpoints: array and NDJSON bodies, bad items in place
+# ============================================================================
+
+def test_batch_endpoints(client):
+    body = [
+        {"root": "ك-ت-ب", "pattern": "فاعل"},
+        {"root": 5, "pattern": "فاعل"},
+        {"root": "ك-ت-ب", "pattern": "مفعول"},
+        {"root": "ظ-ظ-ظ", "pattern": "فاعل"},
+    ]
+    rows = ndjson(client.post("/generate_batch", json=body))
+    assert [row.get("word") for row in rows] == ["كاتب", None, "مكتوب", None]
+    assert rows[1]["error"] == "INVALID_ITEM" and rows[3]["error"] != "INVALID_ITEM"
+
+    lines = "\n".join([
+        json.dumps({"root": "ك-ت-ب", "word": "كاتب"}, ensure_ascii=False),
+        "{not json",
+        "",
+        json.dumps({"root": "ك-ت-ب"}, ensure_ascii=False),
+        json.dumps({"root": "ك-ت-ب", "word": "مكتوب"}, ensure_ascii=False),
+    ])
+    rows = ndjson(client.post("/validate_batch", data=lines.encode("utf-8"), content_type="application/x-ndjson"))
+    assert [row["result"] for row in rows] == ["OUI", "NON", "NON", "OUI"]
+    assert [row.get("error") for row in rows] == [None, "INVALID_ITEM", "INVALID_ITEM", None]
+    assert rows[3]["pattern"] == "مفعول"
+
+    for url in ("/generate_batch", "/validate_batch"):
+        assert client.post(url, data="[1, 2", content_type="application/json").status_code == 400
+        assert ndjson(client.post(url, json=[])) == []
+
+
+def test_batch_streams_lazily(client, monkeypatch):
+    computed = []
+    generate_at = MorphologicalGenerator._generate_at
+
+    def counting(self, *args):
+        computed.append(args[1])
+        return generate_at(self, *args)
+
+    monkeypatch.setattr(MorphologicalGenerator, "_generate_at", counting)
+    body = [{"root": "ك-ت-ب", "pattern": p} for p in ("فاعل", "مفعول", "تفعيل")]
+    response = client.post("/generate_batch", json=body, buffered=False)
+    chunks = iter(response.response)
+    assert json.loads(next(chunks))["word"] == "كاتب"
+    assert len(computed) == 1
+    assert [json.loads(line)["word"] for line in chunks] == ["مكتوب", "تكتيب"]
+    response.close()
+
+
+# ============================================================================
+# TEST 4: Single generation echoes the root as given
+# ============================================================================
+
+def test_generate_echoes_raw_root(client):
+    assert client.post("/generate", json={"pattern": "فاعل"}).json["root"] is None
+    assert client.post("/generate_family", json={}).json[0]["root"] is None
+    assert client.post("/generate", json={"root": "ك-ت-ب", "pattern": "فاعل"}).json["root"] == "ك-ت-ب"
+
+
+# ============================================================================
+# TEST 5: A pre-forked pool needs the log explicitly waived
+# ============================================================================
+
+def test_prefork_refuses_to_start_with_the_log(monkeypatch):
+    monkeypatch.setattr(server, "serve_prefork", lambda *args: pytest.fail("started"))
+    with pytest.raises(ValueError):
+        server.serve(workers=2)
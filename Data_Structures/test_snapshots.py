@@ -0,0 +1,148 @@
+import itertools
+import random
+
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.normalization import parse_root
+from Data_Structures.root_tree import AVLRootTree, format_dashed
+from Data_Structures.snapshots import SnapshotPublisher
+from Data_Structures.word_index import DerivedWordIndex
+from Engine.concurrency import ConcurrentEngine
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+LETTERS = "بتجدرسصطعفقكلمن"
+
+
+def build():
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table.load_patterns_from_file(PATTERNS_PATH)
+    return tree, table
+
+
+def check_avl(node):
+    """Height of a persistent subtree, asserting AVL balance and sizes."""
+    if node is None:
+        return 0
+    left, right = check_avl(node.left), check_avl(node.right)
+    assert abs(left - right) <= 1
+    assert node.height == 1 + max(left, right)
+    assert node.size == 1 + (node.left.size if node.left else 0) + (node.right.size if node.right else 0)
+    return node.height
+
+
+# ============================================================================
+# TEST 1: Root snapshots follow the live tree, old ones never change
+# ============================================================================
+
+def test_root_snapshots_track_tree():
+    tree, table = build()
+    publisher = SnapshotPublisher(tree, table)
+    rng = random.Random(7)
+    candidates = ["-".join(p) for p in itertools.permutations(LETTERS, 3)]
+
+    history = []
+    for step in range(300):
+        snap = publisher.current()
+        history.append((snap, list(tree.inorder())))
+        root = rng.choice(candidates)
+        if tree.search(root) is None:
+            tree.insert(root)
+        else:
+            tree.delete(root)
+        if step % 50 == 0:
+            tree.insert_many([r for r in rng.sample(candidates, 40) if tree.search(r) is None])
+
+    snap = publisher.current()
+    assert list(snap.roots.inorder()) == list(tree.inorder())
+    assert snap.roots.version() == tree.version()
+    check_avl(snap.roots._root)
+
+    for old, expected in history:
+        assert list(old.roots.inorder()) == expected
+        assert old.roots.size() == len(expected)
+
+    roots = list(tree.inorder())
+    assert snap.roots.select(10) == roots[10]
+    assert snap.roots.rank(roots[10]) == 10
+    assert snap.roots.search("ك-ت-ب").root == "كتب"
+    assert snap.roots.search("غ-ف-ر") is None
+    for old, expected in history[::30]:
+        assert [r for r in candidates if old.roots.search(r) is not None] == \
+            [r for r in candidates if r.replace("-", "") in expected]
+        assert old.roots.search_compact("xyz") is None
+
+    # Parsed roots work as bounds, like on the live tree.
+    parsed = parse_root(format_dashed(roots[10]))
+    assert snap.roots.rank(parsed) == tree.rank(parsed) == 10
+    assert list(snap.roots.roots_between(parsed, parse_root(format_dashed(roots[12])))) == roots[10:13]
+
+
+# ============================================================================
+# TEST 2: Pattern snapshots follow insert / update / remove
+# ============================================================================
+
+def test_pattern_snapshots_track_table():
+    tree, table = build()
+    publisher = SnapshotPublisher(tree, table)
+    before = publisher.current().patterns
+
+    table.insert("تفاعيل")
+    assert publisher.current().patterns.derive_compact("كتب", "تفاعيل") == "تكاتيب"
+    table.update("تفاعيل", "تفعيلة")
+    assert publisher.current().patterns.derive_compact("كتب", "تفاعيل") == "تكتيبة"
+    table.remove("تفاعيل")
+    assert not publisher.current().patterns.contains("تفاعيل")
+
+    assert not before.contains("تفاعيل")
+    assert before.size() == publisher.current().patterns.size() == table.size()
+    assert publisher.current().patterns.version() == table.version()
+
+
+# ============================================================================
+# TEST 3: Bound generator / validator read one consistent version
+# ============================================================================
+
+def test_bound_engine_sees_one_version():
+    tree, table = build()
+    publisher = SnapshotPublisher(tree, table)
+    gen = MorphologicalGenerator(tree, table)
+    val = MorphologicalValidator(gen, tree, table)
+
+    snap = publisher.current()
+    bound_gen, bound_val = gen.bind(snap), val.bind(snap)
+    tree.insert("غ-ف-ر")
+    table.remove("مفعول")
+
+    assert not bound_gen.generate_one("غ-ف-ر", "فاعل")["ok"]
+    assert bound_gen.generate_one("ك-ت-ب", "مفعول")["word"] == "مكتوب"
+    assert bound_val.validate("ك-ت-ب", "مكتوب") == {"result": "OUI", "pattern": "مفعول"}
+    assert gen.bind(publisher.current()).generate_one("غ-ف-ر", "فاعل")["ok"]
+
+    # Words recorded through a snapshot land on the live node.
+    assert "مكتوب" in tree.search("ك-ت-ب").derived.to_list()
+
+
+# ============================================================================
+# TEST 4: Records for a root deleted after the snapshot are dropped
+# ============================================================================
+
+def test_record_on_deleted_root_is_dropped():
+    tree, table = build()
+    engine = ConcurrentEngine(tree, table, DerivedWordIndex(tree, table), snapshots=True)
+    with engine.view() as view:
+        with engine.writing():
+            tree.delete("ح-م-د")
+        assert view.generator.generate_one("ح-م-د", "فاعل")["ok"]
+        assert view.roots.search("ح-م-د") is not None
+    engine.recorder.flush()
+    assert tree.search("ح-م-د") is None
+
+    with engine.view() as view:
+        assert view.roots.search("ح-م-د") is None
+        assert view.validator.validate("ك-ت-ب", "كاتب")["result"] == "OUI"
+    assert engine.stats()["derived_words"] == 1
+    assert [r for r in engine.iter_roots(after="كتب")] == list(tree.roots_between(lo="كتب"))[1:]
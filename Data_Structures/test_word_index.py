@@ -0,0 +1,86 @@
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Data_Structures.word_index import DerivedWordIndex
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def build(max_roots=None):
+    tree = AVLRootTree()
+    table = PatternHashTable()
+    tree.load_roots_from_file(ROOTS_PATH)
+    table.load_patterns_from_file(PATTERNS_PATH)
+    index = DerivedWordIndex(tree, table, max_roots=max_roots)
+    gen = MorphologicalGenerator(tree, table)
+    return tree, table, index, gen
+
+
+# ============================================================================
+# TEST 1: Indexed validation agrees with derivation
+# ============================================================================
+
+def test_indexed_validate_matches_scan():
+    tree, table, index, gen = build()
+    indexed = MorphologicalValidator(gen, tree, table, index)
+    scanning = MorphologicalValidator(gen, tree, table)
+
+    for root in tree.list_roots()[:10]:
+        for res in gen.generate_family(root):
+            fast = indexed.validate(root, res["word"])
+            slow = scanning.validate(root, res["word"])
+            assert fast["result"] == slow["result"] == "OUI"
+            assert table.derive(root, fast["pattern"]) is not None
+        assert indexed.validate(root, "غير_موجود")["result"] == "NON"
+
+    assert indexed.validate("ك-ت-ب", "مكتوب") == {"result": "OUI", "pattern": "مفعول"}
+    assert indexed.validate("ك-ت-ب", "مدروس")["result"] == "NON"
+
+
+# ============================================================================
+# TEST 2: Incremental maintenance
+# ============================================================================
+
+def test_index_follows_mutations():
+    tree, table, index, gen = build()
+    val = MorphologicalValidator(gen, tree, table, index)
+
+    tree.insert("غ-ف-ر")
+    assert val.validate("غ-ف-ر", "غافر")["result"] == "OUI"
+
+    table.insert("تفاعيل")
+    assert val.validate("غ-ف-ر", "تغافير")["pattern"] == "تفاعيل"
+    table.update("تفاعيل", "تفعيلة")
+    assert val.validate("غ-ف-ر", "تغافير")["result"] == "NON"
+    assert val.validate("غ-ف-ر", "تغفيرة")["pattern"] == "تفاعيل"
+    table.remove("تفاعيل")
+    assert val.validate("غ-ف-ر", "تغفيرة")["result"] == "NON"
+
+    tree.delete("غ-ف-ر")
+    assert index.lookup("غافر") == []
+    assert not index.covers("غفر")
+
+
+# ============================================================================
+# TEST 3: Bounded mode keeps the hottest roots
+# ============================================================================
+
+def test_bounded_index_promotes_hot_roots():
+    tree, table, index, gen = build(max_roots=2)
+    val = MorphologicalValidator(gen, tree, table, index)
+    assert index.indexed_roots() == 0
+
+    for _ in range(3):
+        val.validate("ك-ت-ب", "كاتب")
+        val.validate("د-ر-س", "دارس")
+    assert index.covers("كتب") and index.covers("درس")
+
+    assert val.validate("ح-م-د", "حامد")["result"] == "OUI"
+    assert not index.covers("حمد")
+
+    for _ in range(5):
+        assert val.validate("ح-م-د", "حامد")["result"] == "OUI"
+    assert index.covers("حمد")
+    assert index.indexed_roots() == 2
@@ -0,0 +1,219 @@
+import errno
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from Data_Structures.binary_snapshot import load_or_build, snapshot_log_generation
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import AVLRootTree
+from Data_Structures.write_ahead_log import WriteAheadLog, list_segments, open_log
+from Engine.generator import MorphologicalGenerator
+
+ROOTS_PATH = "Data/roots.txt"
+PATTERNS_PATH = "Data/patterns.txt"
+
+
+def start(tmp_path, **options):
+    """Load like server.py / main.py do: snapshot or text files, then the log."""
+    sources = (str(tmp_path / "roots.txt"), str(tmp_path / "patterns.txt"))
+    if not os.path.exists(sources[0]):
+        shutil.copy(ROOTS_PATH, sources[0])
+        shutil.copy(PATTERNS_PATH, sources[1])
+    snapshot = str(tmp_path / "engine.snap")
+    tree, table = AVLRootTree(), PatternHashTable()
+    base, _ = load_or_build(tree, table, *sources, snapshot)
+    log = open_log(str(tmp_path / "wal"), tree, table, snapshot, base, **options)
+    return tree, table, log
+
+
+def mutate(tree, table):
+    gen = MorphologicalGenerator(tree, table)
+    tree.insert("غ-ف-ر")
+    table.insert("تفاعيل", "تفعيلة")
+    table.update("مفعول", "مفعول")
+    table.remove("فاعل")
+    tree.delete("ح-م-د")
+    for _ in range(3):
+        gen.generate_one("غ-ف-ر", "تفاعيل")
+    gen.generate_family("ك-ت-ب")
+
+
+def state(tree, table):
+    # Tree shape may differ after a replay (bulk rebuild vs AVL inserts).
+    stats = {k: v for k, v in tree.stats().items() if k not in ("height", "balance")}
+    return stats, tree.get_all_derivatives(), sorted(table.iter_templates())
+
+
+# ============================================================================
+# TEST 1: Mutations and frequencies survive a restart without compaction
+# ============================================================================
+
+def test_replay_restores_runtime_changes(tmp_path):
+    tree, table, log = start(tmp_path, fsync="always")
+    mutate(tree, table)
+    expected = state(tree, table)
+    log.close(compact=False)  # as after a crash: only the log has the changes
+    assert snapshot_log_generation(str(tmp_path / "engine.snap")) < log.generation()
+
+    tree2, table2, log2 = start(tmp_path)
+    assert state(tree2, table2) == expected
+    assert tree2.search("غ-ف-ر").derived.top_k(1) == [("تغفيرة", 3)]
+    log2.close()
+
+    # After a compacting close the snapshot alone carries everything.
+    tree3, table3, log3 = start(tmp_path)
+    assert state(tree3, table3) == expected
+    assert list_segments(str(tmp_path / "wal")) == [(log3.generation(), log3._file.name)]
+    log3.close()
+
+
+# ============================================================================
+# TEST 2: A torn last record is ignored
+# ============================================================================
+
+def test_torn_tail_is_ignored(tmp_path):
+    tree, table, log = start(tmp_path, fsync="never")
+    tree.insert("غ-ف-ر")
+    log.flush()
+    log.close(compact=False)
+    (_, path), = list_segments(str(tmp_path / "wal"))
+    with open(path, "ab") as f:
+        f.write('["add_roots", ["علم'.encode("utf-8"))
+
+    tree2, _, log2 = start(tmp_path)
+    assert tree2.search("غ-ف-ر") is not None
+    assert tree2.search("ع-ل-م") is None
+    log2.close()
+
+
+# ============================================================================
+# TEST 3: Background compaction folds segments into the snapshot
+# ============================================================================
+
+def test_background_compaction(tmp_path):
+    lock = threading.Lock()  # stands in for ConcurrentEngine.writing
+    tree, table, log = start(tmp_path, compact_bytes=2000, guard=lambda: lock)
+    first = log.generation()
+    gen = MorphologicalGenerator(tree, table)
+    for root in tree.list_roots():
+        with lock:
+            gen.generate_family(root)
+    log.flush()
+    deadline = time.time() + 5
+    while log.generation() == first and time.time() < deadline:
+        time.sleep(0.01)
+    assert log.generation() > first
+    expected = state(tree, table)
+    log.close(compact=False)
+
+    tree2, table2, log2 = start(tmp_path)
+    assert state(tree2, table2) == expected  # nothing lost, nothing counted twice
+    log2.close()
+
+
+# ============================================================================
+# TEST 4: Runtime changes survive an edit of the text files
+# ============================================================================
+
+def test_runtime_changes_survive_text_edit(tmp_path):
+    tree, table, log = start(tmp_path, fsync="always")
+    mutate(tree, table)
+    counts = tree.get_all_derivatives()
+    log.close()  # compacted: the log segments are gone
+    assert list_segments(str(tmp_path / "wal")) == []
+
+    roots_path = str(tmp_path / "roots.txt")
+    with open(roots_path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and line.strip() != "ض-ر-ب"]
+    with open(roots_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines + ["ظ-ظ-ب"]) + "\n")
+
+    tree2, table2, log2 = start(tmp_path)
+    # The edit applies...
+    assert tree2.search("ظ-ظ-ب") is not None and tree2.search("ض-ر-ب") is None
+    # ...and so do the runtime changes, with their counts.
+    assert tree2.search("غ-ف-ر").derived.top_k(1) == [("تغفيرة", 3)]
+    assert tree2.search("ح-م-د") is None
+    assert table2.get_rule("تفاعيل") == "تفعيلة" and not table2.contains("فاعل")
+    del counts["ض-ر-ب"]
+    assert tree2.get_all_derivatives() == {**counts, "ظ-ظ-ب": []}
+    log2.close()
+
+    # The rebuilt snapshot is current, and keeps the runtime changes apart.
+    tree3, table3, log3 = start(tmp_path)
+    assert state(tree3, table3) == state(tree2, table2)
+    log3.close()
+
+
+# ============================================================================
+# TEST 5: A failed write or compaction is reported, then retried
+# ============================================================================
+
+class FullDisk:
+    """A segment file on a full disk."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def fileno(self):
+        return self.f.fileno()
+
+
+def wait_for_recovery(log):
+    deadline = time.time() + 5
+    while log._error is not None and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_failures_are_reported_and_retried(tmp_path):
+    tree, table, log = start(tmp_path, fsync="always", retry_interval=0.01)
+    segment = log._file
+    with log._io_lock:
+        log._file = FullDisk(segment)
+    tree.insert("غ-ف-ر")
+    with pytest.raises(OSError):
+        log.flush()
+    assert log._thread.is_alive()
+    with log._io_lock:
+        log._file = segment
+    wait_for_recovery(log)
+    log.flush()  # the queued record went out on a retry
+
+    compact = log._compact
+    disk = {"full": True, "attempts": 0}
+
+    def flaky_compact():
+        disk["attempts"] += 1
+        if disk["full"]:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        compact()
+
+    first = log.generation()
+    log._compact, log._compact_bytes = flaky_compact, 1
+    tree.insert("ظ-ظ-ب")
+    deadline = time.time() + 5
+    while not disk["attempts"] and time.time() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(OSError):
+        log.flush()
+    disk["full"] = False
+    wait_for_recovery(log)
+    log.flush()
+    assert log.generation() > first
+    expected = state(tree, table)
+    log.close(compact=False)
+
+    tree2, table2, log2 = start(tmp_path)
+    assert state(tree2, table2) == expected
+    log2.close()
+
+
+def test_rejects_unknown_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        WriteAheadLog(str(tmp_path), 1, fsync="sometimes")
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+
+from Data_Structures.hash_table import PatternHashTable, PatternTableListener, RuleTemplate
+from Data_Structures.normalization import normalize_common
+from Data_Structures.root_tree import RootBST, RootTreeListener
+
+
+class DerivedWordIndex(RootTreeListener, PatternTableListener):
+    """
+    Inverted index: normalized derived word -> [(compact root, pattern), ...].
+    Registered as a listener on the root tree and the pattern table, so it is
+    updated incrementally on every insert / update / delete.
+
+    With `max_roots`, only that many roots are indexed: the ones validated
+    most often (see `record_validation`). Other roots are simply not covered
+    and callers fall back to deriving.
+
+    `changes()` counts modifications, bumped before each one is made, so a
+    reader that sees the same count before and after a probe got an answer
+    from that unchanged state (see MorphologicalValidator.bind).
+    """
+
+    def __init__(
+        self,
+        root_tree: RootBST,
+        pattern_table: PatternHashTable,
+        max_roots: Optional[int] = None,
+    ) -> None:
+        if max_roots is not None and max_roots < 1:
+            raise ValueError("max_roots must be positive.")
+        self._patterns = pattern_table
+        self._max_roots = max_roots
+        self._words: Dict[str, List[Tuple[str, str]]] = {}
+        self._indexed: Set[str] = set()
+        # Validation hits per root, only tracked in bounded mode.
+        self._hits: Dict[str, int] = {}
+        self._coldest_hits = 0
+        self._changes = 0
+
+        if max_roots is None:
+            for compact in root_tree.inorder():
+                self._index_root(compact)
+        root_tree.add_listener(self)
+        pattern_table.add_listener(self)
+
+    # ---------- Queries ----------
+
+    def lookup(self, normalized_word: str) -> List[Tuple[str, str]]:
+        return list(self._words.get(normalized_word, ()))
+
+    def covers(self, compact_root: str) -> bool:
+        return compact_root in self._indexed
+
+    def find(self, compact_root: str, normalized_word: str) -> Optional[str]:
+        """Pattern deriving `normalized_word` from `compact_root`, if any."""
+        for compact, pattern in self._words.get(normalized_word, ()):
+            if compact == compact_root:
+                return pattern
+        return None
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def indexed_roots(self) -> int:
+        return len(self._indexed)
+
+    def is_bounded(self) -> bool:
+        return self._max_roots is not None
+
+    def changes(self) -> int:
+        return self._changes
+
+    # ---------- Bounded mode ----------
+
+    def record_validation(self, compact_root: str) -> None:
+        """Count a validation; in bounded mode, promote hot roots into the index."""
+        if self._max_roots is None:
+            return
+        hits = self._hits.get(compact_root, 0) + 1
+        self._hits[compact_root] = hits
+        if compact_root in self._indexed:
+            return
+        if len(self._indexed) < self._max_roots:
+            self._index_root(compact_root)
+            return
+        if hits <= self._coldest_hits:
+            return
+
+        coldest = min(self._indexed, key=lambda c: self._hits.get(c, 0))
+        coldest_hits = self._hits.get(coldest, 0)
+        if hits > coldest_hits:
+            self._unindex_root(coldest)
+            self._index_root(compact_root)
+            coldest_hits = min(self._hits.get(c, 0) for c in self._indexed)
+        self._coldest_hits = coldest_hits
+
+    # ---------- Maintenance ----------
+
+    def _add(self, compact: str, pattern: str, template: RuleTemplate) -> None:
+        self._changes += 1
+        key = normalize_common(template.fill(compact))
+        self._words.setdefault(key, []).append((compact, pattern))
+
+    def _discard(self, compact: str, pattern: str, template: RuleTemplate) -> None:
+        key = normalize_common(template.fill(compact))
+        entries = self._words.get(key)
+        if not entries:
+            return
+        self._changes += 1
+        try:
+            entries.remove((compact, pattern))
+        except ValueError:
+            return
+        if not entries:
+            del self._words[key]
+
+    def _index_root(self, compact: str) -> None:
+        self._changes += 1
+        self._indexed.add(compact)
+        for pattern, template in self._patterns.iter_templates():
+            self._add(compact, pattern, template)
+
+    def _unindex_root(self, compact: str) -> None:
+        self._changes += 1
+        self._indexed.discard(compact)
+        for pattern, template in self._patterns.iter_templates():
+            self._discard(compact, pattern, template)
+
+    def on_roots_inserted(self, compacts: List[str]) -> None:
+        if self._max_roots is not None:
+            return
+        for compact in compacts:
+            self._index_root(compact)
+
+    def on_roots_deleted(self, compacts: List[str]) -> None:
+        for compact in compacts:
+            self._hits.pop(compact, None)
+            if compact in self._indexed:
+                self._unindex_root(compact)
+
+    def on_patterns_inserted(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        for pattern, template in entries:
+            for compact in self._indexed:
+                self._add(compact, pattern, template)
+
+    def on_pattern_updated(self, pattern: str, old: RuleTemplate, new: RuleTemplate) -> None:
+        for compact in self._indexed:
+            self._discard(compact, pattern, old)
+            self._add(compact, pattern, new)
+
+    def on_patterns_removed(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        for pattern, template in entries:
+            for compact in self._indexed:
+                self._discard(compact, pattern, template)
@@ -0,0 +1,395 @@
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional, Tuple
+
+from Data_Structures.binary_snapshot import TextBase, fsync_directory, save_snapshot, snapshot_log_generation
+from Data_Structures.hash_table import PatternHashTable, PatternTableListener, RuleTemplate
+from Data_Structures.root_tree import RootBST, RootTreeListener, format_dashed
+
+FSYNC_POLICIES = ("always", "interval", "never")
+DEFAULT_FSYNC_INTERVAL = 1.0
+# A segment this large is compacted into a new snapshot.
+DEFAULT_COMPACT_BYTES = 4 << 20
+# Pause before the writer thread retries a failed write or compaction.
+DEFAULT_RETRY_INTERVAL = 1.0
+
+_SEGMENT = re.compile(r"^wal-(\d+)\.log$")
+
+
+def segment_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"wal-{generation:08d}.log")
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """(generation, path) of every log segment in `directory`, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    found = []
+    for name in names:
+        match = _SEGMENT.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+class WriteAheadLog(RootTreeListener, PatternTableListener):
+    """
+    Append-only log of runtime mutations: roots and patterns added, changed
+    or removed, and every derived word recorded (learned frequencies).
+
+    Attached as a listener, it turns each change into a record and queues
+    it; the caller never waits for I/O. A background thread group-commits
+    whatever queued up since its last pass with one write, then syncs per
+    `fsync`: "always" (every commit), "interval" (at most every
+    `fsync_interval` seconds) or "never" (left to the OS).
+
+    Records go to the segment wal-<generation>.log. When it outgrows
+    `compact_bytes`, the thread calls `compact` (see open_log), which
+    rotates to a new segment and folds the old ones into a snapshot.
+
+    A failed write or compaction (a full disk, ...) does not stop the
+    thread: the records stay queued, the segment is cut back to its last
+    complete record, and the work is retried every `retry_interval`
+    seconds. Until a pass succeeds, flush() and close() raise the failure.
+    A failed fsync is never retried (the kernel may have dropped the
+    unsynced pages): from then on every flush() and close() raises it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        generation: int,
+        fsync: str = "interval",
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+        compact_bytes: int = DEFAULT_COMPACT_BYTES,
+        compact: Optional[Callable[[], None]] = None,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}.")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._generation = generation
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._compact_bytes = compact_bytes
+        self._compact = compact
+        self._retry_interval = retry_interval
+        self._attached: List[object] = []
+
+        self._file = self._open_segment()
+        self._written = self._file.tell()
+        self._synced_at = time.monotonic()
+        self._dirty = False
+
+        self._cond = threading.Condition(threading.Lock())
+        self._pending: List[tuple] = []
+        self._appended = 0   # records queued so far
+        self._committed = 0  # records written so far
+        self._closing = False
+        # Set by the writer thread; see _fail.
+        self._error: Optional[Exception] = None
+        self._sync_error: Optional[OSError] = None
+        self._compact_due = False
+        self._io_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="wal-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- Recording ----------
+
+    def attach(self, root_tree: RootBST, pattern_table: PatternHashTable) -> None:
+        root_tree.add_listener(self)
+        root_tree.add_derived_listener(self)
+        pattern_table.add_listener(self)
+        self._attached = [root_tree, pattern_table]
+
+    def detach(self) -> None:
+        if self._attached:
+            root_tree, pattern_table = self._attached
+            root_tree.remove_listener(self)
+            root_tree.remove_derived_listener(self)
+            pattern_table.remove_listener(self)
+            self._attached = []
+
+    def append(self, record: tuple) -> None:
+        with self._cond:
+            self._pending.append(record)
+            self._appended += 1
+            self._cond.notify()
+
+    def on_roots_inserted(self, compacts: List[str]) -> None:
+        self.append(("add_roots", compacts))
+
+    def on_roots_deleted(self, compacts: List[str]) -> None:
+        self.append(("delete_roots", compacts))
+
+    def on_derived_recorded(self, compact: str, word: str, pattern: Optional[str]) -> None:
+        self.append(("word", compact, word, pattern))
+
+    def on_patterns_inserted(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        self.append(("add_patterns", [[pattern, template.rule] for pattern, template in entries]))
+
+    def on_pattern_updated(self, pattern: str, old: RuleTemplate, new: RuleTemplate) -> None:
+        self.append(("update_pattern", pattern, new.rule))
+
+    def on_patterns_removed(self, entries: List[Tuple[str, RuleTemplate]]) -> None:
+        self.append(("remove_patterns", [pattern for pattern, _ in entries]))
+
+    # ---------- Durability ----------
+
+    def generation(self) -> int:
+        return self._generation
+
+    def flush(self) -> None:
+        """
+        Block until every record appended so far is written, and synced
+        unless fsync is "never". Raises the writer thread's failure if its
+        last pass failed, or if an fsync ever did.
+        """
+        with self._cond:
+            target = self._appended
+            self._cond.notify()
+            while self._committed < target and self._thread.is_alive() and self._error is None:
+                self._cond.wait()
+            self._raise_failure()
+        with self._io_lock:
+            self._sync()
+
+    def rotate(self) -> int:
+        """
+        Write what is queued to the current segment, then continue in a new
+        one. Call it while no mutation can run, so the structures hold
+        exactly what the older segments describe. Returns the new generation.
+        """
+        with self._io_lock:
+            self._commit(self._take())
+            self._sync()
+            self._file.close()
+            self._generation += 1
+            self._file = self._open_segment()
+            self._written = 0
+            return self._generation
+
+    def _open_segment(self):
+        # Unbuffered: a failed write leaves nothing behind to be flushed later.
+        f = open(segment_path(self._directory, self._generation), "ab", buffering=0)
+        if self._fsync != "never":
+            fsync_directory(self._directory)  # so the new segment survives a crash
+        return f
+
+    def remove_before(self, generation: int) -> None:
+        for gen, path in list_segments(self._directory):
+            if gen < generation:
+                os.remove(path)
+
+    def close(self, compact: bool = True) -> None:
+        """
+        Stop recording, write everything, and (by default) compact: the
+        snapshot then holds all in-memory state, including anything recorded
+        after the detach. Raises if that final write or compaction fails,
+        or if an fsync ever did.
+        """
+        self.detach()
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        try:
+            with self._io_lock:
+                self._commit(self._take())
+                self._sync()
+            if compact and self._compact is not None and (self._written or self._compact_due):
+                self._compact()
+        finally:
+            with self._io_lock:
+                self._file.close()
+        with self._cond:
+            self._error = None
+            self._raise_failure()
+        if self._written == 0:
+            os.remove(segment_path(self._directory, self._generation))
+
+    # ---------- Writer thread ----------
+
+    def _take(self) -> List[tuple]:
+        with self._cond:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self) -> None:
+        timeout = self._fsync_interval if self._fsync == "interval" else None
+        while True:
+            with self._cond:
+                if not self._closing:
+                    if self._error is not None:
+                        self._cond.wait(self._retry_interval)  # back off, then retry
+                    elif not self._pending:
+                        self._cond.wait(timeout)
+                closing = self._closing
+            try:
+                with self._io_lock:
+                    self._commit(self._take())
+                    if self._fsync == "always" or (
+                        self._fsync == "interval"
+                        and time.monotonic() - self._synced_at >= self._fsync_interval
+                    ):
+                        self._sync()
+                if not closing and self._compact is not None and (
+                    self._compact_due or self._written >= self._compact_bytes
+                ):
+                    # Still due if it fails: retried on the next pass.
+                    self._compact_due = True
+                    self._compact()
+                    self._compact_due = False
+            except Exception as exc:
+                self._fail(exc)
+            else:
+                self._fail(None)
+            if closing:
+                return
+
+    def _fail(self, error: Optional[Exception]) -> None:
+        # The outcome of the writer thread's last pass; wakes flush().
+        with self._cond:
+            self._error = error
+            self._cond.notify_all()
+
+    def _raise_failure(self) -> None:
+        # Caller holds _cond.
+        error = self._sync_error or self._error
+        if error is not None:
+            raise error
+
+    def _commit(self, batch: List[tuple]) -> None:
+        # Caller holds _io_lock.
+        if batch:
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[self._file.write(view):]
+            except OSError:
+                # Drop a partial record so the retry doesn't follow a torn line.
+                try:
+                    os.ftruncate(self._file.fileno(), self._written)
+                except OSError:
+                    pass
+                with self._cond:
+                    self._pending[:0] = batch
+                raise
+            self._written += len(data)
+            self._dirty = True
+        with self._cond:
+            self._committed += len(batch)
+            self._cond.notify_all()
+
+    def _sync(self) -> None:
+        # Caller holds _io_lock.
+        if self._dirty and self._fsync != "never":
+            try:
+                os.fsync(self._file.fileno())
+            except OSError as exc:
+                self._sync_error = exc
+                raise
+        self._dirty = False
+        self._synced_at = time.monotonic()
+
+
+# ---------------------------
+# Recovery
+# ---------------------------
+
+def _apply(record: list, root_tree: RootBST, pattern_table: PatternHashTable) -> None:
+    op = record[0]
+    if op == "word":
+        _, compact, word, pattern = record
+        node = root_tree.search_compact(compact)
+        if node is not None:
+            root_tree.record_derived(node, word, pattern)
+    elif op == "add_roots":
+        root_tree.bulk_load(format_dashed(c) for c in record[1])
+    elif op == "delete_roots":
+        for compact in record[1]:
+            root_tree.delete(format_dashed(compact))
+    elif op == "add_patterns":
+        for pattern, rule in record[1]:
+            if not pattern_table.contains(pattern):
+                pattern_table.insert(pattern, rule)
+    elif op == "update_pattern":
+        if pattern_table.contains(record[1]):
+            pattern_table.update(record[1], record[2])
+    elif op == "remove_patterns":
+        for pattern in record[1]:
+            if pattern_table.contains(pattern):
+                pattern_table.remove(pattern)
+
+
+def replay(directory: str, root_tree: RootBST, pattern_table: PatternHashTable, from_generation: int = 0) -> int:
+    """
+    Re-apply the records of every segment from `from_generation` on, in
+    order. A torn last line (a crash mid-write) ends its segment. Changes
+    that no longer apply (a root that already exists, ...) are skipped.
+    Returns how many records were applied.
+    """
+    applied = 0
+    for generation, path in list_segments(directory):
+        if generation < from_generation:
+            continue
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                _apply(record, root_tree, pattern_table)
+                applied += 1
+    return applied
+
+
+def open_log(
+    directory: str,
+    root_tree: RootBST,
+    pattern_table: PatternHashTable,
+    snapshot_path: str,
+    base: Optional[TextBase] = None,
+    guard: Callable[[], ContextManager] = nullcontext,
+    **options,
+) -> WriteAheadLog:
+    """
+    Bring `root_tree`/`pattern_table` (already loaded with load_or_build
+    from `snapshot_path`) up to date with the log, and start logging.
+
+    Segments the snapshot does not include are replayed and folded into a
+    new snapshot; logging continues in a fresh segment. `base` is the text
+    base load_or_build returned (kept current by a DataReloader); every
+    snapshot records the difference from it. `guard` must keep mutations
+    (and frequency merges) out while compaction rotates the log and writes
+    the snapshot, e.g. ConcurrentEngine.writing. Segments are removed only
+    once the snapshot covering them is on disk.
+    """
+    covered = snapshot_log_generation(snapshot_path)
+    replayed = replay(directory, root_tree, pattern_table, covered)
+    segments = list_segments(directory)
+    generation = max([covered] + [gen for gen, _ in segments]) + 1
+
+    def compact() -> None:
+        with guard():
+            new_generation = log.rotate()
+            save_snapshot(snapshot_path, root_tree, pattern_table, base, log_generation=new_generation)
+        log.remove_before(new_generation)
+
+    if replayed or segments:
+        save_snapshot(snapshot_path, root_tree, pattern_table, base, log_generation=generation)
+    log = WriteAheadLog(directory, generation, compact=compact, **options)
+    log.remove_before(generation)
+    log.attach(root_tree, pattern_table)
+    return log
@@ -0,0 +1,313 @@
+from __future__ import annotations
+import itertools
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import RootBST, RootNode
+from Data_Structures.snapshots import Snapshot, SnapshotPublisher
+from Data_Structures.word_index import DerivedWordIndex
+from Engine.generator import MorphologicalGenerator
+from Engine.validator import MorphologicalValidator
+
+T = TypeVar("T")
+
+DEFAULT_STRIPES = 16
+DEFAULT_FLUSH_EVERY = 256
+# Seconds between background merges of whatever the stripes still hold.
+DEFAULT_FLUSH_INTERVAL = 1.0
+ROOTS_CHUNK = 256
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. Writer-preferring: once a writer waits, new
+    readers queue behind it, so a steady read load cannot starve mutations.
+    Not reentrant.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class StripedRecorder:
+    """
+    Buffers derived-word records (node, word, pattern) in lock-striped lists,
+    the stripe picked by thread, so concurrent readers rarely contend. A
+    stripe that reaches `flush_every` records is merged into the tree under
+    one merge lock; `flush` merges everything. `guard` wraps the merges a
+    full stripe triggers, for callers that don't already exclude writers.
+    """
+
+    def __init__(
+        self,
+        root_tree: RootBST,
+        stripes: int = DEFAULT_STRIPES,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        guard: Optional[Callable[[], ContextManager]] = None,
+    ) -> None:
+        if stripes < 1 or flush_every < 1:
+            raise ValueError("stripes and flush_every must be positive.")
+        self._tree = root_tree
+        self._flush_every = flush_every
+        self._stripes: List[Tuple[List[Tuple[RootNode, str, Optional[str]]], threading.Lock]] = [
+            ([], threading.Lock()) for _ in range(stripes)
+        ]
+        self._merge_lock = threading.Lock()
+        self._guard = guard or nullcontext
+
+    def _stripe(self) -> Tuple[list, threading.Lock]:
+        # Thread idents are aligned addresses: mix the bits before reducing.
+        ident = threading.get_ident()
+        return self._stripes[((ident * 0x9E3779B1) >> 16) % len(self._stripes)]
+
+    def record(self, node: RootNode, word: str, pattern: Optional[str] = None) -> None:
+        pending, lock = self._stripe()
+        with lock:
+            pending.append((node, word, pattern))
+            if len(pending) < self._flush_every:
+                return
+            batch = pending[:]
+            pending.clear()
+        with self._guard(), self._merge_lock:
+            self._apply(batch)
+
+    def pending(self) -> int:
+        return sum(len(pending) for pending, _ in self._stripes)
+
+    def flush(self) -> None:
+        with self._merge_lock:
+            self._flush_locked()
+
+    def merged(self, read: Callable[[], T]) -> T:
+        """Flush, then run `read` while no merge can interleave."""
+        with self._merge_lock:
+            self._flush_locked()
+            return read()
+
+    def _flush_locked(self) -> None:
+        for pending, lock in self._stripes:
+            with lock:
+                batch = pending[:]
+                pending.clear()
+            self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[RootNode, str, Optional[str]]]) -> None:
+        record = self._tree.record_derived
+        for node, word, pattern in batch:
+            record(node, word, pattern)
+
+
+class EngineView(NamedTuple):
+    generator: MorphologicalGenerator
+    validator: MorphologicalValidator
+    roots: object     # RootBST or RootSnapshot
+    patterns: object  # PatternHashTable or PatternSnapshot
+
+
+class ConcurrentEngine:
+    """
+    Thread-safe front for one root tree and pattern table.
+
+    Anything that only reads structure (search, derive, validate, analyze,
+    listings) runs inside `view()`, in parallel. Anything that changes roots
+    or patterns runs under `writing()`, which first merges the pending
+    frequency records so none refer to a node about to be removed. Words
+    stored by readers go through a StripedRecorder instead of mutating the
+    derived-word lists directly.
+
+    Stripes merge when full; `start_flusher()` also merges them on a timer,
+    so counts don't stay buffered through a quiet period.
+
+    By default a view holds the shared side of a ReadWriteLock. With
+    `snapshots=True`, a view is bound to the current immutable Snapshot
+    instead and takes no lock at all; the lock then only orders the writer
+    against frequency merges. A word index still serves those views: each
+    write records the index's change count next to the snapshot it
+    published, and a bound validator trusts the index only at that count.
+    """
+
+    def __init__(
+        self,
+        root_tree: RootBST,
+        pattern_table: PatternHashTable,
+        word_index: Optional[DerivedWordIndex] = None,
+        stripes: int = DEFAULT_STRIPES,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        snapshots: bool = False,
+    ) -> None:
+        if word_index is not None and word_index.is_bounded():
+            # Bounded mode promotes roots while validating, i.e. under the read lock.
+            raise ValueError("ConcurrentEngine needs an unbounded DerivedWordIndex.")
+        self.root_tree = root_tree
+        self.pattern_table = pattern_table
+        self.word_index = word_index
+        self.lock = ReadWriteLock()
+        # Lock-free readers don't exclude the writer, so their merges must.
+        guard = self.lock.write if snapshots else None
+        self.recorder = StripedRecorder(root_tree, stripes, flush_every, guard)
+        self.generator = MorphologicalGenerator(root_tree, pattern_table, recorder=self.recorder.record)
+        self.validator = MorphologicalValidator(self.generator, root_tree, pattern_table, word_index)
+        self.publisher = SnapshotPublisher(root_tree, pattern_table) if snapshots else None
+        self._live_view = EngineView(self.generator, self.validator, root_tree, pattern_table)
+        self._index_pin: Optional[Tuple[Snapshot, int]] = None
+        self._pin_index()
+        self._bound: Optional[Tuple[Snapshot, Optional[int], EngineView]] = None
+        self._flusher: Optional[Tuple[threading.Thread, threading.Event]] = None
+
+    def reading(self):
+        return self.lock.read()
+
+    @contextmanager
+    def view(self) -> Iterator[EngineView]:
+        """Generator, validator and structures that stay consistent for the block."""
+        if self.publisher is None:
+            with self.lock.read():
+                yield self._live_view
+            return
+        yield self._snapshot_view()
+
+    def _snapshot_view(self) -> EngineView:
+        snapshot = self.publisher.current()
+        pin = self._index_pin
+        # A snapshot published outside writing() has no pin: no index for it.
+        index_changes = pin[1] if pin is not None and pin[0] is snapshot else None
+        bound = self._bound
+        if bound is None or bound[0] is not snapshot or bound[1] != index_changes:
+            view = EngineView(
+                self.generator.bind(snapshot),
+                self.validator.bind(snapshot, index_changes),
+                snapshot.roots,
+                snapshot.patterns,
+            )
+            bound = self._bound = (snapshot, index_changes, view)
+        return bound[2]
+
+    def _pin_index(self) -> None:
+        # No mutation in flight: the index matches the published snapshot.
+        if self.publisher is not None and self.word_index is not None:
+            self._index_pin = (self.publisher.current(), self.word_index.changes())
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Exclusive access for mutations; in snapshot mode they are published together at the end."""
+        batch = self.publisher.batch() if self.publisher is not None else nullcontext()
+        with self.lock.write():
+            self.recorder.flush()
+            with batch:
+                yield
+            self._pin_index()
+
+    def read_frequencies(self, read: Callable[[], T]) -> T:
+        """Run `read` (stats, derived lists) over fully merged counts."""
+        with self._live_guard():
+            return self.recorder.merged(read)
+
+    def flush_frequencies(self) -> None:
+        """Merge every buffered derived-word record into the tree now."""
+        with self._live_guard():
+            self.recorder.flush()
+
+    def start_flusher(self, interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        """Merge buffered records every `interval` seconds from a daemon thread."""
+        if self._flusher is not None:
+            return
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._flush_periodically, args=(stop, interval), name="frequency-flusher", daemon=True
+        )
+        self._flusher = (thread, stop)
+        thread.start()
+
+    def stop_flusher(self) -> None:
+        if self._flusher is not None:
+            thread, stop = self._flusher
+            stop.set()
+            thread.join()
+            self._flusher = None
+
+    def _flush_periodically(self, stop: threading.Event, interval: float) -> None:
+        while not stop.wait(interval):
+            if self.recorder.pending():
+                self.flush_frequencies()
+
+    def changes_since(self, version: int) -> Tuple[int, Optional[Tuple[List[str], List[str]]]]:
+        """(current root version, RootBST.changes_since(version)), read consistently."""
+        with self._live_guard():
+            return self.root_tree.version(), self.root_tree.changes_since(version)
+
+    def _live_guard(self) -> ContextManager:
+        # Reads of live (non-snapshot) state: shared unless readers skip the lock.
+        return self.lock.write() if self.publisher is not None else self.lock.read()
+
+    def stats(self) -> dict:
+        return self.read_frequencies(self.root_tree.stats)
+
+    def iter_roots(self, after: Optional[str] = None, chunk: int = ROOTS_CHUNK) -> Iterator[str]:
+        """
+        Compact roots after `after`, in order. Read `chunk` at a time under
+        the shared lock and resumed from the last root, so a slow consumer
+        (a streamed response) never holds the lock.
+        """
+        if self.publisher is not None:
+            rows = self.publisher.current().roots.roots_between(lo=after)
+            if after is not None:
+                rows = itertools.dropwhile(lambda c: c <= after, rows)
+            yield from rows
+            return
+        cursor = after
+        while True:
+            with self.reading():
+                rows = self.root_tree.roots_between(lo=cursor)
+                if cursor is not None:
+                    rows = itertools.dropwhile(lambda c: c <= cursor, rows)
+                rows = list(itertools.islice(rows, chunk))
+            yield from rows
+            if len(rows) < chunk:
+                return
+            cursor = rows[-1]
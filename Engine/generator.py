@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import List, Optional, Iterable, TypedDict
+from typing import Callable, Dict, List, Optional, Iterable, Iterator, Tuple, TypedDict
 
-from Data_Structures.root_tree import RootBST
+from Data_Structures.root_tree import RootBST, RootNode
 from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.normalization import ParsedRoot, RootInput, normalize_pattern, parse_root
 
 
 class GenerationResult(TypedDict):
@@ -13,23 +14,69 @@ class GenerationResult(TypedDict):
     error: Optional[str]
 
 
+# Receives every derived word to store: (node, word, normalized pattern).
+Recorder = Callable[[RootNode, str, Optional[str]], object]
+
+
+def _echo(raw_root: RootInput) -> str:
+    """The root as the caller gave it, for the result dicts."""
+    return raw_root.raw if isinstance(raw_root, ParsedRoot) else raw_root
+
+
 class MorphologicalGenerator:
     """
     Generates derived words from (root, pattern).
     ONLY component allowed to derive.
+    Stored words go through `recorder` (RootBST.record_derived by default),
+    so a caller can buffer them instead, e.g. under concurrent serving.
     """
 
-    def __init__(self, root_tree: RootBST, pattern_table: PatternHashTable) -> None:
+    def __init__(
+        self,
+        root_tree: RootBST,
+        pattern_table: PatternHashTable,
+        recorder: Optional[Recorder] = None,
+    ) -> None:
         self._roots = root_tree
         self._patterns = pattern_table
+        self.record = recorder or root_tree.record_derived
 
     def generate_one(
         self,
-        raw_root: str,
+        raw_root: RootInput,
         raw_pattern: str,
         store: bool = True,
     ) -> GenerationResult:
-        if self._roots.search(raw_root) is None:
+        node = self._roots.search(parse_root(raw_root))
+        return self._generate_at(node, _echo(raw_root), raw_pattern, store)
+
+    def generate_batch(
+        self,
+        items: Iterable[Tuple[RootInput, str]],
+        store: bool = True,
+    ) -> Iterator[GenerationResult]:
+        """
+        generate_one over (root, pattern) pairs, lazily and in input order.
+        Each distinct root is parsed and looked up once per batch.
+        """
+        nodes: Dict[RootInput, Optional[RootNode]] = {}
+        for raw_root, raw_pattern in items:
+            try:
+                node = nodes[raw_root]
+            except KeyError:
+                node = nodes[raw_root] = self._roots.search(parse_root(raw_root))
+            except TypeError:  # unhashable input: not a root
+                node = None
+            yield self._generate_at(node, _echo(raw_root), raw_pattern, store)
+
+    def _generate_at(
+        self,
+        node: Optional[RootNode],
+        raw_root: str,
+        raw_pattern: str,
+        store: bool,
+    ) -> GenerationResult:
+        if node is None:
             return {
                 "ok": False,
                 "root": raw_root,
@@ -38,7 +85,8 @@ class MorphologicalGenerator:
                 "error": "ROOT_NOT_FOUND",
             }
 
-        if not self._patterns.contains(raw_pattern):
+        template = self._patterns.get_template(raw_pattern)
+        if template is None:
             return {
                 "ok": False,
                 "root": raw_root,
@@ -47,18 +95,9 @@ class MorphologicalGenerator:
                 "error": "PATTERN_NOT_FOUND",
             }
 
-        derived = self._patterns.derive(raw_root, raw_pattern)
-        if derived is None:
-            return {
-                "ok": False,
-                "root": raw_root,
-                "pattern": raw_pattern,
-                "word": None,
-                "error": "DERIVATION_FAILED",
-            }
-
+        derived = template.fill(node.root)
         if store:
-            self._roots.add_derived_word(raw_root, derived)
+            self.record(node, derived, normalize_pattern(raw_pattern))
 
         return {
             "ok": True,
@@ -68,8 +107,32 @@ class MorphologicalGenerator:
             "error": None,
         }
 
-    def generate_family(self, raw_root: str) -> List[GenerationResult]:
-        if self._roots.search(raw_root) is None:
+    def bind(self, snapshot) -> "MorphologicalGenerator":
+        """
+        The same generator over an immutable Snapshot: every call sees one
+        consistent root and pattern set. Words still go through `record`.
+        """
+        return MorphologicalGenerator(snapshot.roots, snapshot.patterns, recorder=self.record)
+
+    def derive_compact(self, compact_root: str, pattern: str) -> Optional[str]:
+        return self._patterns.derive_compact(compact_root, pattern)
+
+    def derive_all(self, compact_root: str) -> Iterator[Tuple[str, str]]:
+        """
+        (pattern, word) for every stored pattern, from an already-resolved
+        compact root: no root parsing, pattern hashing or rule scanning.
+        """
+        for pattern, template in self._patterns.iter_templates():
+            yield pattern, template.fill(compact_root)
+
+    def generate_family(self, raw_root: RootInput) -> List[GenerationResult]:
+        """
+        Resolve the root once, then fill every compiled template straight
+        from the table and store the words into that node's list.
+        """
+        node = self._roots.search(parse_root(raw_root))
+        raw_root = _echo(raw_root)
+        if node is None:
             return [{
                 "ok": False,
                 "root": raw_root,
@@ -79,6 +142,14 @@ class MorphologicalGenerator:
             }]
 
         results: List[GenerationResult] = []
-        for pattern in self._patterns.iter_patterns():
-            results.append(self.generate_one(raw_root, pattern, store=True))
-        return results
\ No newline at end of file
+        record = self.record
+        for pattern, word in self.derive_all(node.root):
+            record(node, word, pattern)
+            results.append({
+                "ok": True,
+                "root": raw_root,
+                "pattern": pattern,
+                "word": word,
+                "error": None,
+            })
+        return results
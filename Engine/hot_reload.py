@@ -0,0 +1,157 @@
+from __future__ import annotations
+import os
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from Data_Structures.binary_snapshot import TextBase
+from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.root_tree import RootBST, format_dashed
+from Engine.concurrency import ConcurrentEngine
+
+DEFAULT_POLL_INTERVAL = 1.0
+RELOAD_COUNTS = ("roots_added", "roots_removed", "patterns_added", "patterns_removed")
+
+
+class DataChanges(NamedTuple):
+    """Edits between two reads of the data files (compact roots, normalized patterns)."""
+    add_roots: List[str]
+    remove_roots: List[str]
+    add_patterns: List[str]
+    remove_patterns: List[str]
+
+    def is_empty(self) -> bool:
+        return not any(self)
+
+
+def diff_data(old_roots: Set[str], old_patterns: Set[str], roots: Set[str], patterns: Set[str]) -> DataChanges:
+    """
+    What was added to and removed from the files between an old read and a
+    new one. Only these edits are applied, so roots and patterns added or
+    removed at runtime are left alone.
+    """
+    return DataChanges(
+        sorted(roots - old_roots),
+        sorted(old_roots - roots),
+        sorted(patterns - old_patterns),
+        sorted(old_patterns - patterns),
+    )
+
+
+def apply_changes(changes: DataChanges, root_tree: RootBST, pattern_table: PatternHashTable) -> Dict[str, int]:
+    """
+    Apply `changes` with one rebuild per direction. Changes that no longer
+    apply (made by someone else since the diff) are skipped; roots that stay
+    keep their nodes, so their derived words and counts are untouched.
+    Call it under the writer lock. Returns how many of each were applied.
+    """
+    added = root_tree.bulk_load(format_dashed(c) for c in changes.add_roots)
+    removed = root_tree.delete_many(format_dashed(c) for c in changes.remove_roots)
+    new_patterns = [p for p in changes.add_patterns if not pattern_table.contains(p)]
+    pattern_table.insert_many(new_patterns)
+    removed_patterns = 0
+    for pattern in changes.remove_patterns:
+        if pattern_table.contains(pattern):
+            pattern_table.remove(pattern)
+            removed_patterns += 1
+    return dict(zip(RELOAD_COUNTS, (added, len(removed), len(new_patterns), removed_patterns)))
+
+
+class DataReloader:
+    """
+    Brings a running engine in line with Data/roots.txt and
+    Data/patterns.txt after they are edited.
+
+    The reloader remembers what the files held (the TextBase load_or_build
+    returned, else a fresh read), and moves it forward on every reload.
+    `reload()` parses both files and diffs them against that, without taking the writer lock, then hands only the edits to
+    `apply` (by default apply_changes under `engine.writing()`, which a
+    snapshot engine publishes as one new snapshot). Roots and patterns
+    added or removed at runtime stay as they are unless the edit itself
+    touches them. `start()` polls the files' size and mtime from a
+    background thread and reloads on change.
+    """
+
+    def __init__(
+        self,
+        engine: ConcurrentEngine,
+        roots_path: str,
+        patterns_path: str,
+        apply: Optional[Callable[[DataChanges], Dict[str, int]]] = None,
+        base: Optional[TextBase] = None,
+    ) -> None:
+        self._engine = engine
+        self._paths = (roots_path, patterns_path)
+        self._apply = apply or self._apply_locally
+        self._lock = threading.Lock()
+        self._seen = self._stamp()
+        self._base = base if base is not None else TextBase.read(roots_path, patterns_path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _apply_locally(self, changes: DataChanges) -> Dict[str, int]:
+        with self._engine.writing():
+            self.advance(changes)
+            return apply_changes(changes, self._engine.root_tree, self._engine.pattern_table)
+
+    def advance(self, changes: DataChanges) -> None:
+        """
+        Move the remembered file contents forward by `changes`; idempotent.
+        `apply` calls it under the writer lock, so a snapshot saved meanwhile
+        never pairs the new structures with the old base. A pre-forked worker
+        also calls it for reloads other workers applied.
+        """
+        self._base.advance(*changes)
+
+    def _stamp(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        stamps = []
+        for path in self._paths:
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_size, st.st_mtime_ns))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def reload(self) -> Dict[str, int]:
+        """Apply the files' edits since the last reload; returns the counts."""
+        with self._lock:
+            # Stamped before reading: an edit made while parsing triggers another pass.
+            self._seen = self._stamp()
+            try:
+                files = TextBase.read(*self._paths)
+                changes = diff_data(self._base.roots, self._base.patterns, files.roots, files.patterns)
+                counts = dict.fromkeys(RELOAD_COUNTS, 0)
+                if not changes.is_empty():
+                    counts = self._apply(changes)
+                # Only now: a snapshot with these fingerprints holds the edits.
+                self._base.fingerprints = files.fingerprints
+                return counts
+            except Exception:
+                self._seen = None  # retried on the next check
+                raise
+
+    def check(self) -> Optional[Dict[str, int]]:
+        """Reload if either file changed since the last reload; None otherwise."""
+        if self._stamp() == self._seen:
+            return None
+        return self.reload()
+
+    def start(self, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="data-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except (OSError, ValueError):
+                pass  # a file caught mid-save or briefly missing: the next poll retries
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import gc
+import json
+import multiprocessing
+import os
+import signal
+from typing import Callable, List
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+# Applies one journaled mutation: (op, args) -> result.
+Apply = Callable[[str, list], object]
+
+
+class MutationJournal:
+    """
+    Ordered log of mutations shared by forked worker processes: an
+    append-only file of JSON lines plus a version counter in shared memory.
+
+    Writes are serialized by one cross-process lock, so there is a single
+    writer at any time: it first replays what the others appended, applies
+    its own change locally, and only if that succeeds appends it and bumps
+    the version. Every other worker calls `sync` before serving a request;
+    when the shared version equals its own that is one memory read,
+    otherwise it replays the new entries in order. Workers apply the same
+    mutations in the same order, so their structures (and version counters,
+    hence ETags) stay identical.
+
+    Must be created before forking.
+    """
+
+    def __init__(self, path: str, apply: Apply) -> None:
+        self._path = path
+        self._apply = apply
+        self._lock = multiprocessing.Lock()
+        self._version = multiprocessing.Value("q", 0, lock=False)
+        self._applied = 0  # entries applied by this process
+        self._offset = 0   # bytes of the file replayed by this process
+        open(path, "wb").close()
+
+    def version(self) -> int:
+        return self._version.value
+
+    def sync(self) -> int:
+        """Replay entries appended by other workers; returns how many."""
+        if self._applied == self._version.value:
+            return 0
+        with self._lock:
+            return self._catch_up()
+
+    def write(self, op: str, args: list) -> object:
+        """
+        Apply a mutation here and publish it to the other workers. A
+        ValueError from `apply` propagates and nothing is published.
+        """
+        with self._lock:
+            self._catch_up()
+            result = self._apply(op, args)
+            line = json.dumps({"op": op, "args": args}, ensure_ascii=False).encode("utf-8") + b"\n"
+            with open(self._path, "ab") as f:
+                f.write(line)
+            self._offset += len(line)
+            self._applied += 1
+            self._version.value = self._applied
+            return result
+
+    def _catch_up(self) -> int:
+        # Caller holds the lock, so the file only contains whole lines.
+        replayed = 0
+        with open(self._path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                self._offset += len(line)
+                self._applied += 1
+                entry = json.loads(line)
+                self._apply(entry["op"], entry["args"])
+                replayed += 1
+        return replayed
+
+
+def _interrupt(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+class _PreforkServer(WSGIServer):
+    request_queue_size = 128
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve_prefork(app: Callable, host: str, port: int, workers: int) -> None:
+    """
+    Bind once, then fork `workers` processes that all accept on the shared
+    socket. Everything built before the call (trees, tables, indexes,
+    snapshots) is inherited copy-on-write instead of being rebuilt per
+    worker; gc.freeze() keeps the collector from writing to those objects
+    and un-sharing their pages. Blocks until interrupted (Ctrl-C or
+    SIGTERM), then stops the workers.
+    """
+    if workers < 1:
+        raise ValueError("workers must be positive.")
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork serving needs os.fork (Linux / macOS).")
+
+    server = make_server(host, port, app, server_class=_PreforkServer, handler_class=_QuietHandler)
+    gc.collect()
+    gc.freeze()
+
+    signal.signal(signal.SIGTERM, _interrupt)  # inherited: workers exit cleanly too
+    pids: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    server.server_close()
+    try:
+        for pid in pids:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import Optional, Iterable, TypedDict, Literal
+from typing import Dict, Optional, Iterable, Iterator, List, Tuple, TypedDict, Literal
 
-from Data_Structures.root_tree import RootBST
+from Data_Structures.root_tree import RootBST, RootNode, format_dashed
 from Data_Structures.hash_table import PatternHashTable
-from Data_Structures.normalization import normalize_common
+from Data_Structures.normalization import RootInput, normalize_common, parse_root
+from Data_Structures.pattern_trie import PatternTrie
+from Data_Structures.word_index import DerivedWordIndex
 from Engine.generator import MorphologicalGenerator
 
 
@@ -12,10 +14,18 @@ class ValidationResult(TypedDict):
     pattern: Optional[str]
 
 
+class AnalysisResult(TypedDict):
+    root: str
+    pattern: str
+
+
 class MorphologicalValidator:
     """
     Validates whether a word belongs to a root.
     MUST reuse MorphologicalGenerator.
+    With a DerivedWordIndex, a covered root is validated by one dict probe;
+    otherwise the word is walked through the pattern trie with the root's
+    letters in the slots, pruning on the first mismatch.
     """
 
     def __init__(
@@ -23,22 +33,89 @@ class MorphologicalValidator:
         generator: MorphologicalGenerator,
         root_tree: RootBST,
         pattern_table: PatternHashTable,
+        word_index: Optional[DerivedWordIndex] = None,
+        trie: Optional[PatternTrie] = None,
+        index_changes: Optional[int] = None,
     ) -> None:
         self._generator = generator
         self._roots = root_tree
         self._patterns = pattern_table
+        self._word_index = word_index
+        # Set when bound to a snapshot: the index answers only while unchanged.
+        self._index_changes = index_changes
+        self._trie = trie if trie is not None else PatternTrie(pattern_table)
+
+    def bind(self, snapshot, index_changes: Optional[int] = None) -> "MorphologicalValidator":
+        """
+        The same validator over an immutable Snapshot, using the snapshot's
+        own trie. The word index follows the live structures: it is used only
+        given `index_changes`, its change count when the snapshot was
+        published, and only while it still has that count; once the writer
+        moves on, validation takes the trie.
+        """
+        return MorphologicalValidator(
+            self._generator.bind(snapshot),
+            snapshot.roots,
+            snapshot.patterns,
+            self._word_index if index_changes is not None else None,
+            snapshot.patterns.trie(),
+            index_changes,
+        )
+
+    def validate(self, raw_root: RootInput, raw_word: str) -> ValidationResult:
+        return self._validate_at(self._roots.search(raw_root), raw_word)
+
+    def validate_batch(self, items: Iterable[Tuple[RootInput, str]]) -> Iterator[ValidationResult]:
+        """
+        validate over (root, word) pairs, lazily and in input order.
+        Each distinct root is parsed and looked up once per batch.
+        """
+        nodes: Dict[RootInput, Optional[RootNode]] = {}
+        for raw_root, raw_word in items:
+            try:
+                node = nodes[raw_root]
+            except KeyError:
+                node = nodes[raw_root] = self._roots.search(parse_root(raw_root))
+            except TypeError:  # unhashable input: not a root
+                node = None
+            yield self._validate_at(node, raw_word)
 
-    def validate(self, raw_root: str, raw_word: str) -> ValidationResult:
-        if self._roots.search(raw_root) is None:
+    def _validate_at(self, node: Optional[RootNode], raw_word: str) -> ValidationResult:
+        if node is None or not isinstance(raw_word, str):
             return {"result": "NON", "pattern": None}
 
         normalized_word = normalize_common(raw_word)
 
-        for pattern in self._patterns.iter_patterns():
-            gen = self._generator.generate_one(raw_root, pattern, store=False)
-            if gen["ok"] and gen["word"] is not None:
-                if normalize_common(gen["word"]) == normalized_word:
-                    self._roots.add_derived_word(raw_root, gen["word"])
-                    return {"result": "OUI", "pattern": pattern}
+        index = self._word_index
+        if index is not None and self._index_current():
+            index.record_validation(node.root)
+            if index.covers(node.root):
+                pattern = index.find(node.root, normalized_word)
+                if self._index_current():
+                    return self._accept(node, pattern)
 
-        return {"result": "NON", "pattern": None}
\ No newline at end of file
+        pattern = next(self._trie.match_root(normalized_word, node.root), None)
+        return self._accept(node, pattern)
+
+    def _index_current(self) -> bool:
+        expected = self._index_changes
+        return expected is None or self._word_index.changes() == expected
+
+    def _accept(self, node: RootNode, pattern: Optional[str]) -> ValidationResult:
+        if pattern is None:
+            return {"result": "NON", "pattern": None}
+        word = self._generator.derive_compact(node.root, pattern)
+        self._generator.record(node, word, pattern)
+        return {"result": "OUI", "pattern": pattern}
+
+    def analyze(self, raw_word: str) -> List[AnalysisResult]:
+        """
+        Root-less analysis: match the word against every pattern skeleton in
+        one trie walk, then keep the candidate roots that exist in the tree.
+        """
+        normalized_word = normalize_common(raw_word)
+        results: List[AnalysisResult] = []
+        for pattern, compact in self._trie.match(normalized_word):
+            if self._roots.search_compact(compact) is not None:
+                results.append({"root": format_dashed(compact), "pattern": pattern})
+        return results
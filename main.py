@@ -3,10 +3,13 @@ from __future__ import annotations
 import webbrowser, os, pathlib
 webbrowser.open(pathlib.Path('UI/interface.html').resolve().as_uri())
 
+import atexit
 import os
 
-from Data_Structures.root_tree import RootBST, format_dashed
+from Data_Structures.root_tree import AVLRootTree, RootBST, format_dashed
 from Data_Structures.hash_table import PatternHashTable
+from Data_Structures.binary_snapshot import load_or_build
+from Data_Structures.write_ahead_log import WriteAheadLog, open_log
 from Engine.generator import MorphologicalGenerator
 from Engine.validator import MorphologicalValidator
 
@@ -48,16 +51,23 @@ def _select_pattern(table: PatternHashTable) -> str | None:
     return None
 
 
-def _load_data(root_tree: RootBST, pattern_table: PatternHashTable):
-    base_dir = os.path.dirname(__file__)
-    roots_path = os.path.join(base_dir, "Data", "roots.txt")
-    patterns_path = os.path.join(base_dir, "Data", "patterns.txt")
+BASE_DIR = os.path.dirname(__file__)
+ROOTS_PATH = os.path.join(BASE_DIR, "Data", "roots.txt")
+PATTERNS_PATH = os.path.join(BASE_DIR, "Data", "patterns.txt")
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "Data", "engine.snap")
+WAL_DIR = os.path.join(BASE_DIR, "Data", "wal")
 
-    roots_loaded = root_tree.load_roots_from_file(roots_path)
-    patterns_loaded = pattern_table.load_patterns_from_file(patterns_path)
 
-    print(f"Loaded roots: {roots_loaded}")
-    print(f"Loaded patterns: {patterns_loaded}")
+def _load_data(root_tree: RootBST, pattern_table: PatternHashTable) -> WriteAheadLog:
+    text_base, from_snapshot = load_or_build(root_tree, pattern_table, ROOTS_PATH, PATTERNS_PATH, SNAPSHOT_PATH)
+    # Replays changes made after the snapshot, then logs this session's.
+    log = open_log(WAL_DIR, root_tree, pattern_table, SNAPSHOT_PATH, text_base)
+
+    print(f"Loaded roots: {root_tree.size()}")
+    print(f"Loaded patterns: {pattern_table.size()}")
+    if from_snapshot:
+        print("(restored from the binary snapshot, with saved frequencies)")
+    return log
 
 
 def _show_validated_derivatives(root_tree: RootBST):
@@ -67,29 +77,20 @@ def _show_validated_derivatives(root_tree: RootBST):
         print("Root not found.")
         return
 
-    if hasattr(node.derived, "to_items"):
-        items = node.derived.to_items()
-        if not items:
-            print("No validated derivatives for this root.")
-            return
-        print(f"Validated derivatives for {raw_root}:")
-        for word, count in items:
-            print(f"- {word} (freq: {count})")
-        return
-
-    words = node.derived.to_list()
-    if not words:
+    items = node.derived.top_k(len(node.derived))
+    if not items:
         print("No validated derivatives for this root.")
         return
-    print(f"Validated derivatives for {raw_root}:")
-    for word in words:
-        print(f"- {word}")
+    print(f"Validated derivatives for {raw_root} (most frequent first):")
+    for word, count in items:
+        print(f"- {word} (freq: {count})")
 
 
 def main():
-    root_tree = RootBST()
+    root_tree = AVLRootTree()
     pattern_table = PatternHashTable()
-    _load_data(root_tree, pattern_table)
+    log = _load_data(root_tree, pattern_table)
+    atexit.register(log.close)
 
     generator = MorphologicalGenerator(root_tree, pattern_table)
     validator = MorphologicalValidator(generator, root_tree, pattern_table)
@@ -1,27 +1,122 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
+import argparse
+import atexit
+import bisect
+import itertools
+import json
 import os
+import tempfile
+import time
 
 # Use the correct class names from your project
-from Data_Structures.root_tree import RootBST, format_dashed
+from Data_Structures.root_tree import AVLRootTree, format_dashed, pack_root
 from Data_Structures.hash_table import PatternHashTable
-from Engine.generator import MorphologicalGenerator
-from Engine.validator import MorphologicalValidator
+from Data_Structures.word_index import DerivedWordIndex
+from Data_Structures.binary_snapshot import load_or_build, refresh_snapshot
+from Data_Structures.write_ahead_log import FSYNC_POLICIES, open_log
+from Data_Structures.normalization import BulkInsertError, normalize_root, parse_root
+from Engine.concurrency import ConcurrentEngine
+from Engine.hot_reload import DataChanges, DataReloader, apply_changes
+from Engine.prefork import MutationJournal, serve_prefork
 
 app = Flask(__name__, static_folder='UI', static_url_path='')
 
 # ===== Load data once =====
-root_tree = RootBST()
+root_tree = AVLRootTree()
 pattern_table = PatternHashTable()
 
 ROOTS_PATH = os.path.join("Data", "roots.txt")
 PATTERNS_PATH = os.path.join("Data", "patterns.txt")
 
-root_tree.load_roots_from_file(ROOTS_PATH)
-pattern_table.load_patterns_from_file(PATTERNS_PATH)
+SNAPSHOT_PATH = os.path.join("Data", "engine.snap")
+WAL_DIR = os.path.join("Data", "wal")
 
-# Initialize generator and validator
-generator = MorphologicalGenerator(root_tree, pattern_table)
-validator = MorphologicalValidator(generator, root_tree, pattern_table)
+# The binary snapshot when it is current for the text files, else the text files
+# (with a stale snapshot's runtime changes and counts carried over). Importing
+# only reads: serve() writes the refreshed snapshot.
+text_base, snapshot_current = load_or_build(
+    root_tree, pattern_table, ROOTS_PATH, PATTERNS_PATH, SNAPSHOT_PATH, save=False
+)
+
+# Initialize generator and validator behind the thread-safe engine:
+# read-only routes work on engine.view() (an immutable snapshot, no lock),
+# mutations run under engine.writing(). The word index answers /validate
+# with one probe while it matches the snapshot being read.
+word_index = DerivedWordIndex(root_tree, pattern_table)
+engine = ConcurrentEngine(root_tree, pattern_table, word_index, snapshots=True)
+
+# Versions restart at 0 with the process; the epoch keeps an ETag or a
+# `since` token from a previous run from matching this one.
+EPOCH = format(int(time.time()), "x")
+
+
+def _version_token(version):
+    return f"{EPOCH}.{version}"
+
+
+def _conditional(etag, build):
+    """304 when the client already holds `etag`, otherwise build() tagged with it."""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    return response
+
+
+# ===== Mutations =====
+# Every change goes through _mutate. Under `--workers N` the journal hands
+# it to a single writer and replays it in the other worker processes.
+def _insert_root(raw_root):
+    return format_dashed(root_tree.insert(raw_root).root)
+
+
+def _insert_patterns(patterns):
+    # [pattern, rule] pairs arrive as JSON arrays.
+    items = [tuple(p) if isinstance(p, list) and len(p) == 2 else p for p in patterns]
+    return pattern_table.insert_many(items)
+
+
+def _sync_data(changes):
+    # A DataChanges (a plain list once it went through the journal). Every
+    # worker's reloader moves on, so its next diff starts from the same files.
+    changes = DataChanges(*changes)
+    reloader.advance(changes)
+    return apply_changes(changes, root_tree, pattern_table)
+
+
+MUTATIONS = {
+    "add_root": _insert_root,
+    "add_pattern": pattern_table.insert,
+    "add_roots": lambda raw_roots: len(root_tree.insert_many(raw_roots)),
+    "add_patterns": _insert_patterns,
+    "sync_data": _sync_data,
+}
+
+journal = None  # MutationJournal when pre-forked
+
+
+def _apply(op, args):
+    with engine.writing():
+        return MUTATIONS[op](*args)
+
+
+def _mutate(op, *args):
+    if journal is None:
+        return _apply(op, args)
+    return journal.write(op, list(args))
+
+
+@app.before_request
+def _catch_up():
+    if journal is not None:
+        journal.sync()
+
+
+# Diffs Data/*.txt against their last read off-lock; only the edits are a mutation.
+reloader = DataReloader(
+    engine, ROOTS_PATH, PATTERNS_PATH, apply=lambda changes: _mutate("sync_data", changes), base=text_base
+)
 
 
 # ===== Serve UI =====
@@ -34,10 +129,12 @@ def index():
 @app.route("/generate", methods=["POST"])
 def generate():
     data = request.json
+    # Passed as given: the result echoes it (null when missing).
     raw_root = data.get("root")
     pattern = data.get("pattern")
 
-    result = generator.generate_one(raw_root, pattern)
+    with engine.view() as view:
+        result = view.generator.generate_one(raw_root, pattern)
     return jsonify(result)
 
 
@@ -47,29 +144,118 @@ def generate_family():
     data = request.json
     raw_root = data.get("root")
 
-    results = generator.generate_family(raw_root)
-    return jsonify(results)
+    with engine.view() as view:
+        results = view.generator.generate_family(raw_root)
+        patterns_version = view.patterns.version()
+    if not results or not results[0]["ok"]:
+        return jsonify(results)
+    # A family only depends on the root and the pattern set. The words are
+    # still generated (and counted) on a 304; only the payload is skipped.
+    etag = f"family-{EPOCH}-{patterns_version}-{pack_root(parse_root(raw_root).compact)}"
+    return _conditional(etag, lambda: jsonify(results))
 
 
 # ===== Validate word =====
 @app.route("/validate", methods=["POST"])
 def validate():
     data = request.json
-    raw_root = data.get("root")
+    raw_root = parse_root(data.get("root"))
     raw_word = data.get("word")
 
-    result = validator.validate(raw_root, raw_word)
+    with engine.view() as view:
+        result = view.validator.validate(raw_root, raw_word)
     return jsonify(result)
 
 
+# ===== Batch endpoints =====
+def _batch_items():
+    """
+    Items from a JSON array body, or an NDJSON body (one object per line).
+    A line that is not valid JSON becomes None, reported as a bad item.
+    """
+    body = request.get_data(as_text=True)
+    if body.lstrip().startswith("["):
+        return json.loads(body)
+    items = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(None)
+    return items
+
+
+def _stream_batch(items, keys, run, bad_item):
+    """
+    Feed the well-formed items through `run(view)` (one engine batch over
+    one view) and stream one NDJSON result per input item, in input order,
+    each line sent as soon as it is computed.
+    """
+    def well_formed(item):
+        return isinstance(item, dict) and all(isinstance(item.get(k), str) for k in keys)
+
+    # The view is an immutable snapshot that holds no lock, so the batch
+    # can run lazily while the response streams.
+    with engine.view() as view:
+        pairs = ((item[keys[0]], item[keys[1]]) for item in items if well_formed(item))
+        results = run(view)(pairs)
+
+    def lines():
+        for item in items:
+            row = next(results) if well_formed(item) else bad_item
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+
+def _parse_batch():
+    try:
+        items = _batch_items()
+    except ValueError as e:
+        return None, (jsonify({"status": "error", "error": f"Invalid JSON: {e}"}), 400)
+    if not isinstance(items, list):
+        return None, (jsonify({"status": "error", "error": "Expected a JSON array or NDJSON."}), 400)
+    return items, None
+
+
+@app.route("/generate_batch", methods=["POST"])
+def generate_batch():
+    items, error = _parse_batch()
+    if error:
+        return error
+    bad_item = {"ok": False, "root": None, "pattern": None, "word": None, "error": "INVALID_ITEM"}
+    return _stream_batch(items, ("root", "pattern"), lambda view: view.generator.generate_batch, bad_item)
+
+
+@app.route("/validate_batch", methods=["POST"])
+def validate_batch():
+    items, error = _parse_batch()
+    if error:
+        return error
+    bad_item = {"result": "NON", "pattern": None, "error": "INVALID_ITEM"}
+    return _stream_batch(items, ("root", "word"), lambda view: view.validator.validate_batch, bad_item)
+
+
+# ===== Analyze word (root unknown) =====
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    data = request.json
+    raw_word = data.get("word")
+
+    with engine.view() as view:
+        results = view.validator.analyze(raw_word)
+    return jsonify(results)
+
+
 # ===== Add root =====
 @app.route("/add_root", methods=["POST"])
 def add_root():
     data = request.json
-    raw_root = data.get("root")
     try:
-        canonical = root_tree.insert(raw_root)
-        return jsonify({"status": "ok", "root": format_dashed(canonical.root)})
+        root = _mutate("add_root", data.get("root"))
+        return jsonify({"status": "ok", "root": root})
     except ValueError as e:
         return jsonify({"status": "error", "error": str(e)})
 
@@ -80,25 +266,241 @@ def add_pattern():
     data = request.json
     pattern = data.get("pattern")
     try:
-        pattern_table.insert(pattern)
+        _mutate("add_pattern", pattern)
         return jsonify({"status": "ok", "pattern": pattern})
     except ValueError as e:
         return jsonify({"status": "error", "error": str(e)})
 
 
+# ===== Bulk add (all or nothing) =====
+def _bulk_error(e):
+    errors = [
+        {"index": i, "item": item if not isinstance(item, tuple) else list(item), "error": msg}
+        for i, item, msg in e.errors
+    ]
+    return jsonify({"status": "error", "error": str(e), "errors": errors})
+
+
+@app.route("/add_roots", methods=["POST"])
+def add_roots():
+    data = request.json
+    raw_roots = data.get("roots")
+    if not isinstance(raw_roots, list):
+        return jsonify({"status": "error", "error": "Expected a list of roots."})
+    try:
+        added = _mutate("add_roots", raw_roots)
+    except BulkInsertError as e:
+        return _bulk_error(e)
+    return jsonify({"status": "ok", "added": added})
+
+
+@app.route("/add_patterns", methods=["POST"])
+def add_patterns():
+    data = request.json
+    patterns = data.get("patterns")
+    if not isinstance(patterns, list):
+        return jsonify({"status": "error", "error": "Expected a list of patterns."})
+    try:
+        added = _mutate("add_patterns", patterns)
+    except BulkInsertError as e:
+        return _bulk_error(e)
+    return jsonify({"status": "ok", "added": added})
+
+
+# ===== Reload data files =====
+@app.route("/reload", methods=["POST"])
+def reload_data():
+    try:
+        counts = reloader.reload()
+    except OSError as e:
+        return jsonify({"status": "error", "error": f"Cannot read data files: {e.strerror}."})
+    return jsonify({"status": "ok", **counts})
+
+
+# ===== Monitoring =====
+@app.route("/api/stats", methods=["GET"])
+def stats():
+    return jsonify(engine.stats())
+
+
+# ===== Paging helpers =====
+MAX_PAGE_SIZE = 1000
+
+
+def _page_args():
+    """(limit, after, ndjson) from the query string; limit is None when absent."""
+    limit = request.args.get("limit")
+    if limit is not None:
+        limit = int(limit)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return limit, request.args.get("after"), request.args.get("format") == "ndjson"
+
+
+def _listing(rows, limit, ndjson):
+    """
+    Serve an ordered row iterator. NDJSON streams one JSON value per line
+    as rows are produced; a limit gives {"items", "next"} where `next` is the
+    cursor for the following page; otherwise the plain array.
+    """
+    if ndjson:
+        if limit is not None:
+            rows = itertools.islice(rows, limit)
+        lines = (json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+    if limit is None:
+        return jsonify(list(rows))
+    items = list(itertools.islice(rows, limit + 1))
+    more = len(items) > limit
+    items = items[:limit]
+    return jsonify({"items": items, "next": items[-1] if more else None})
+
+
 # ===== List all roots =====
 @app.route("/api/roots", methods=["GET"])
 def list_roots():
-    all_roots = [format_dashed(r) for r in root_tree.inorder()]
-    return jsonify(all_roots)
+    since = request.args.get("since")
+    if since is not None:
+        return _roots_delta(since)
+    try:
+        limit, after, ndjson = _page_args()
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+
+    with engine.view() as view:
+        roots = view.roots
+    version = roots.version()
+
+    def build():
+        # The snapshot never changes, so streaming it needs no lock.
+        cursor = normalize_root(after) if after else None
+        compacts = roots.roots_between(lo=cursor)
+        if cursor is not None:
+            compacts = itertools.dropwhile(lambda c: c <= cursor, compacts)
+        return _listing((format_dashed(c) for c in compacts), limit, ndjson)
+
+    response = _conditional(f"roots-{EPOCH}-{version}", build)
+    response.headers["X-Data-Version"] = _version_token(version)
+    return response
+
+
+def _roots_delta(since):
+    """Roots added / removed since a version token; 410 when it can't be served."""
+    epoch, _, version = since.partition(".")
+    changes = None
+    if epoch == EPOCH and version.isdigit():
+        current, changes = engine.changes_since(int(version))
+    if changes is None:
+        error = "Version is unknown or too old; reload the full list."
+        return jsonify({"status": "error", "error": error}), 410
+    added, removed = changes
+    return jsonify({
+        "version": _version_token(current),
+        "added": [format_dashed(c) for c in added],
+        "removed": [format_dashed(c) for c in removed],
+    })
 
 
 # ===== List all patterns =====
 @app.route("/api/patterns", methods=["GET"])
 def list_patterns():
-    all_patterns = [p for p in pattern_table.iter_patterns()]
-    return jsonify(all_patterns)
+    try:
+        limit, after, ndjson = _page_args()
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+
+    with engine.view() as view:
+        snapshot = view.patterns
+    version = snapshot.version()
+
+    def build():
+        patterns = list(snapshot.iter_patterns())
+        if limit is None and after is None and not ndjson:
+            return jsonify(patterns)
+        # The table has no order of its own; sort so the cursor is stable.
+        ordered = sorted(patterns)
+        start = bisect.bisect_right(ordered, after) if after else 0
+        return _listing(iter(ordered[start:]), limit, ndjson)
+
+    response = _conditional(f"patterns-{EPOCH}-{version}", build)
+    response.headers["X-Data-Version"] = _version_token(version)
+    return response
+
+
+def _open_log(fsync):
+    """
+    Replay the write-ahead log over the loaded data and keep logging new
+    roots, patterns and derived-word counts; closing it compacts the log
+    into the snapshot.
+    """
+    if not snapshot_current:
+        refresh_snapshot(SNAPSHOT_PATH, root_tree, pattern_table, text_base)
+    log = open_log(
+        WAL_DIR, root_tree, pattern_table, SNAPSHOT_PATH, text_base,
+        guard=engine.writing, fsync=fsync,
+    )
+
+    def close():
+        # Counts still buffered in the recorder are logged before the close.
+        engine.stop_flusher()
+        engine.flush_frequencies()
+        log.close()
+
+    atexit.register(close)
+
+
+def serve(host="127.0.0.1", port=5000, workers=None, fsync="interval", watch=None, wal=True):
+    """
+    No worker count: the Flask development server, with a write-ahead log
+    (unless `wal` is False) and, given `watch` seconds, polling of the data
+    files for changes. Otherwise a pre-forked pool that inherits the loaded
+    index and shares mutations through a journal.
+
+    A pool can't keep the log: each worker holds its own derived-word
+    counts and replays the others' mutations, so no process has the state
+    to log or to compact into a snapshot. It only starts with `wal=False`,
+    i.e. when losing runtime changes and counts on exit is acceptable.
+    """
+    global journal
+    if workers is not None and wal:
+        raise ValueError(
+            "Pre-forked workers don't write the write-ahead log: runtime changes "
+            "and counts would be lost on exit. Pass --no-wal to accept that."
+        )
+    if workers is None:
+        # Only the serving process (the reloader's child) owns the log.
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            if wal:
+                _open_log(fsync)
+            elif not snapshot_current:
+                refresh_snapshot(SNAPSHOT_PATH, root_tree, pattern_table, text_base)
+            engine.start_flusher()
+            if watch:
+                reloader.start(watch)
+        app.run(host=host, port=port, debug=True)
+        return
+    if not snapshot_current:
+        refresh_snapshot(SNAPSHOT_PATH, root_tree, pattern_table, text_base)
+    with tempfile.TemporaryDirectory(prefix="morpho-") as tmp:
+        journal = MutationJournal(os.path.join(tmp, "mutations.log"), _apply)
+        # Threads don't survive a fork: each worker starts its own.
+        os.register_at_fork(after_in_child=engine.start_flusher)
+        print(f"Serving on http://{host}:{port} with {workers} worker processes (no write-ahead log)")
+        serve_prefork(app, host, port, workers)
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Arabic morphology web server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, help="serve with N pre-forked worker processes (Linux/macOS)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="interval", help="write-ahead log sync policy")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="poll Data/*.txt and apply edits (single process)")
+    parser.add_argument(
+        "--no-wal", dest="wal", action="store_false",
+        help="no write-ahead log: runtime changes and counts are lost on exit (required with --workers)",
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.wal:
+        parser.error("--workers needs --no-wal: pre-forked workers don't persist runtime changes")
+    serve(args.host, args.port, args.workers, args.fsync, args.watch, args.wal)
\ No newline at end of file